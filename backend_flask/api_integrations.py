@@ -2,9 +2,15 @@
 # Iteration 4 - External API Integrations
 # ChatGPT conversation reference: https://chatgpt.com/share/6984a96d-f0cc-8008-abdc-dc3fe4261951
 
+import html
 import os
+import threading
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from pathlib import Path
+from string import Template
 import requests
 from config import (
     ENABLE_GOOGLE_CALENDAR,
@@ -15,110 +21,217 @@ from config import (
     GOOGLE_CALENDAR_CREDENTIALS_FILE,
     GOOGLE_CALENDAR_TOKEN_FILE,
 )
+from circuit_breaker import get_breaker
+
+# Iteration 6 - Each external service sits behind a circuit breaker (circuit_breaker.py)
+# INTEGRATION_TIMEOUT is the per-call deadline, passed to the HTTP clients as their timeout
+INTEGRATION_TIMEOUT = float(os.environ.get('INTEGRATION_TIMEOUT', 10))
+calendar_breaker = get_breaker('google_calendar', INTEGRATION_TIMEOUT)
+email_breaker = get_breaker('email', INTEGRATION_TIMEOUT)
+timezone_breaker = get_breaker('timezone', INTEGRATION_TIMEOUT)
 
 ###################
 # GOOGLE CALENDAR API
 # Reference: https://chatgpt.com/share/6984a96d-f0cc-8008-abdc-dc3fe4261951
 ###################
 
-def create_google_calendar_event(booking_data, learner_email, tutor_email, learner_name, tutor_name):
-    # Creates a Google Calendar event for a booking
-    # Returns dict with success status and event details or error message
-    if not ENABLE_GOOGLE_CALENDAR:
-        return {"success": False, "message": "Google Calendar API is disabled"}
-    
-    try:
+# Iteration 6 - One calendar client per process
+# Building the discovery service and reading token.json used to happen on every booking; now the
+# service is built once, the credentials live in memory and are refreshed shortly before they
+# expire, and each thread gets its own authorised HTTP connection (httplib2 is not thread-safe).
+# references
+# https://googleapis.github.io/google-api-python-client/docs/thread_safety.html
+# https://googleapis.github.io/google-api-python-client/docs/batch.html
+
+CALENDAR_SCOPES = ['https://www.googleapis.com/auth/calendar']
+CALENDAR_REFRESH_AHEAD = timedelta(minutes=5)  # refresh the access token this long before it expires
+CALENDAR_BATCH_SIZE = 50  # Google's limit on requests per batch call
+
+
+class CalendarCredentialsMissing(Exception):
+    """Raised when there is no token.json and no credentials.json to authorise with."""
+    pass
+
+
+class CalendarClient:
+    """
+    Process-wide Google Calendar client, safe to share between threads.
+    Use get_calendar_client() rather than creating one directly.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._creds = None
+        self._service = None
+        self._base_dir = Path(__file__).resolve().parent
+
+    def _load_credentials(self):
         from google.auth.transport.requests import Request
         from google.oauth2.credentials import Credentials
         from google_auth_oauthlib.flow import InstalledAppFlow
-        from googleapiclient.discovery import build
-        import pickle
-        
-        # Google Calendar API scopes
-        SCOPES = ['https://www.googleapis.com/auth/calendar']
-        
+
         creds = None
-        BASE_DIR = Path(__file__).resolve().parent
-        
         # Check if token.json exists (user has already authorized)
-        token_path = BASE_DIR / GOOGLE_CALENDAR_TOKEN_FILE
+        token_path = self._base_dir / GOOGLE_CALENDAR_TOKEN_FILE
         if token_path.exists():
-            creds = Credentials.from_authorized_user_file(str(token_path), SCOPES)
-        
+            creds = Credentials.from_authorized_user_file(str(token_path), CALENDAR_SCOPES)
+
         # If there are no valid credentials, prompt user to log in
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
             else:
-                credentials_path = BASE_DIR / GOOGLE_CALENDAR_CREDENTIALS_FILE
+                credentials_path = self._base_dir / GOOGLE_CALENDAR_CREDENTIALS_FILE
                 if not credentials_path.exists():
-                    return {
-                        "success": False,
-                        "message": "Google Calendar credentials not found. Please set up credentials.json"
-                    }
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    str(credentials_path), SCOPES)
+                    raise CalendarCredentialsMissing(
+                        "Google Calendar credentials not found. Please set up credentials.json"
+                    )
+                flow = InstalledAppFlow.from_client_secrets_file(str(credentials_path), CALENDAR_SCOPES)
                 creds = flow.run_local_server(port=0)
-            
-            # Save credentials for next time
-            with open(token_path, 'w') as token:
-                token.write(creds.to_json())
-        
-        # Build the Calendar service
-        service = build('calendar', 'v3', credentials=creds)
-        
+            self._save_token(creds)
+        return creds
+
+    def _save_token(self, creds):
+        # Save credentials for next time (and for other processes)
+        with open(self._base_dir / GOOGLE_CALENDAR_TOKEN_FILE, 'w') as token:
+            token.write(creds.to_json())
+
+    def _ensure_ready(self):
+        # Builds the service on first use and refreshes the token ahead of expiry
+        with self._lock:
+            if self._creds is None:
+                from googleapiclient.discovery import build
+                self._creds = self._load_credentials()
+                # cache_discovery=False - the discovery document is bundled with the client library
+                self._service = build('calendar', 'v3', credentials=self._creds, cache_discovery=False)
+            elif self._needs_refresh():
+                from google.auth.transport.requests import Request
+                self._creds.refresh(Request())
+                self._save_token(self._creds)
+            return self._service
+
+    def _needs_refresh(self):
+        creds = self._creds
+        if not creds.valid:
+            return True
+        # google-auth keeps expiry as a naive UTC datetime
+        return creds.expiry is not None and creds.expiry - datetime.utcnow() < CALENDAR_REFRESH_AHEAD
+
+    def _http(self):
+        # One AuthorizedHttp per thread, all sharing the same credentials object
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            import google_auth_httplib2
+            import httplib2
+            http = google_auth_httplib2.AuthorizedHttp(self._creds, http=httplib2.Http(timeout=calendar_breaker.deadline))
+            self._local.http = http
+        return http
+
+    def insert_event(self, event):
+        service = self._ensure_ready()
+        return service.events().insert(calendarId='primary', body=event).execute(http=self._http())
+
+    def insert_events(self, events):
+        """
+        Inserts several events using the batch API (one HTTP round trip per CALENDAR_BATCH_SIZE events).
+        Returns a list of (created_event, exception) pairs in the same order as `events`.
+        """
+        service = self._ensure_ready()
+        results = [(None, None)] * len(events)
+
+        def callback(request_id, response, exception):
+            results[int(request_id)] = (response, exception)
+
+        for start in range(0, len(events), CALENDAR_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=callback)
+            for index in range(start, min(start + CALENDAR_BATCH_SIZE, len(events))):
+                batch.add(service.events().insert(calendarId='primary', body=events[index]), request_id=str(index))
+            batch.execute(http=self._http())
+        return results
+
+
+_calendar_client = None
+_calendar_client_lock = threading.Lock()
+
+
+def get_calendar_client():
+    global _calendar_client
+    with _calendar_client_lock:
+        if _calendar_client is None:
+            _calendar_client = CalendarClient()
+        return _calendar_client
+
+
+def build_calendar_event(booking_data, learner_email, tutor_email, learner_name, tutor_name):
+    # Builds the Calendar API event body for a booking
+    # Parse date and time
+    session_date = booking_data.get('session_date')
+    session_time = booking_data.get('session_time')
+    duration = booking_data.get('duration', 60)
+    
+    # Combine date and time
+    datetime_str = f"{session_date} {session_time}"
+    try:
+        start_datetime = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
+    except ValueError:
+        start_datetime = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S")
+    
+    end_datetime = start_datetime + timedelta(minutes=duration)
+    
+    # Create event
+    return {
+        'summary': f'Tutoring Session: {learner_name} with {tutor_name}',
+        'description': f'Tutoring session between {learner_name} and {tutor_name}.\nDuration: {duration} minutes',
+        'start': {
+            'dateTime': start_datetime.isoformat(),
+            'timeZone': 'UTC',
+        },
+        'end': {
+            'dateTime': end_datetime.isoformat(),
+            'timeZone': 'UTC',
+        },
+        'attendees': [
+            {'email': learner_email},
+            {'email': tutor_email},
+        ],
+        'reminders': {
+            'useDefault': False,
+            'overrides': [
+                {'method': 'email', 'minutes': 24 * 60},  # 1 day before
+                {'method': 'popup', 'minutes': 30},  # 30 minutes before
+            ],
+        },
+    }
+
+
+def _calendar_result(event):
+    return {
+        "success": True,
+        "message": "Event created successfully",
+        "event_id": event.get('id'),
+        "event_link": event.get('htmlLink')
+    }
+
+
+def create_google_calendar_event(booking_data, learner_email, tutor_email, learner_name, tutor_name):
+    # Creates a Google Calendar event for a booking
+    # Returns dict with success status and event details or error message
+    if not ENABLE_GOOGLE_CALENDAR:
+        return {"success": False, "message": "Google Calendar API is disabled"}
+    return calendar_breaker.call(
+        _create_google_calendar_event, booking_data, learner_email, tutor_email, learner_name, tutor_name
+    )
+
+
+def _create_google_calendar_event(booking_data, learner_email, tutor_email, learner_name, tutor_name):
+    try:
+        event = build_calendar_event(booking_data, learner_email, tutor_email, learner_name, tutor_name)
         # Iteration 4 - Log calendar event creation
         print(f"[INFO] Creating calendar event in Google Calendar")
-        
-        # Parse date and time
-        session_date = booking_data.get('session_date')
-        session_time = booking_data.get('session_time')
-        duration = booking_data.get('duration', 60)
-        
-        # Combine date and time
-        datetime_str = f"{session_date} {session_time}"
-        try:
-            start_datetime = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
-        except ValueError:
-            start_datetime = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S")
-        
-        end_datetime = start_datetime + timedelta(minutes=duration)
-        
-        # Create event
-        event = {
-            'summary': f'Tutoring Session: {learner_name} with {tutor_name}',
-            'description': f'Tutoring session between {learner_name} and {tutor_name}.\nDuration: {duration} minutes',
-            'start': {
-                'dateTime': start_datetime.isoformat(),
-                'timeZone': 'UTC',
-            },
-            'end': {
-                'dateTime': end_datetime.isoformat(),
-                'timeZone': 'UTC',
-            },
-            'attendees': [
-                {'email': learner_email},
-                {'email': tutor_email},
-            ],
-            'reminders': {
-                'useDefault': False,
-                'overrides': [
-                    {'method': 'email', 'minutes': 24 * 60},  # 1 day before
-                    {'method': 'popup', 'minutes': 30},  # 30 minutes before
-                ],
-            },
-        }
-        
-        # Insert event
-        event = service.events().insert(calendarId='primary', body=event).execute()
-        
-        return {
-            "success": True,
-            "message": "Event created successfully",
-            "event_id": event.get('id'),
-            "event_link": event.get('htmlLink')
-        }
-    
+        return _calendar_result(get_calendar_client().insert_event(event))
+    except CalendarCredentialsMissing as e:
+        return {"success": False, "message": str(e)}
     except Exception as e:
         return {
             "success": False,
@@ -126,76 +239,213 @@ def create_google_calendar_event(booking_data, learner_email, tutor_email, learn
         }
 
 
+def create_google_calendar_events(bookings):
+    """
+    Iteration 6 - Creates calendar events for several bookings in one batch request.
+    `bookings` is a list of dicts with the create_google_calendar_event arguments as keys.
+    Returns one result dict per booking, in order.
+    """
+    if not ENABLE_GOOGLE_CALENDAR:
+        return [{"success": False, "message": "Google Calendar API is disabled"} for _ in bookings]
+
+    results = [None] * len(bookings)
+    events = []
+    positions = []
+    for index, booking in enumerate(bookings):
+        try:
+            events.append(build_calendar_event(
+                booking['booking_data'], booking['learner_email'], booking['tutor_email'],
+                booking['learner_name'], booking['tutor_name']
+            ))
+            positions.append(index)
+        except (KeyError, ValueError) as e:
+            results[index] = {"success": False, "message": f"Failed to create calendar event: {str(e)}"}
+
+    ticket = calendar_breaker.allow() if events else False
+    if events and not ticket:
+        for index in positions:
+            results[index] = calendar_breaker.rejection()
+    elif events:
+        # The whole batch is one call as far as the breaker is concerned
+        start = time.monotonic()
+        ok = False
+        try:
+            print(f"[INFO] Creating {len(events)} calendar event(s) in one batch")
+            for index, (event, error) in zip(positions, get_calendar_client().insert_events(events)):
+                if error is not None:
+                    results[index] = {"success": False, "message": f"Failed to create calendar event: {str(error)}"}
+                else:
+                    results[index] = _calendar_result(event)
+                    ok = True
+        except CalendarCredentialsMissing as e:
+            for index in positions:
+                results[index] = {"success": False, "message": str(e)}
+        except Exception as e:
+            for index in positions:
+                results[index] = {"success": False, "message": f"Failed to create calendar event: {str(e)}"}
+        finally:
+            calendar_breaker.record(ticket, ok, time.monotonic() - start)
+    return results
+
+
 ###################
 # EMAIL API (SendGrid)
 # Reference: https://chatgpt.com/share/6984a96d-f0cc-8008-abdc-dc3fe4261951
 ###################
 
-def send_booking_confirmation_email(learner_email, tutor_email, learner_name, tutor_name, booking_data):
-    # Sends booking confirmation emails to both learner and tutor
-    # Returns dict with success status and message
-    if not ENABLE_EMAIL_NOTIFICATIONS:
-        return {"success": False, "message": "Email notifications are disabled"}
-
-    if not SENDGRID_API_KEY:
-        return {"success": False, "message": "SendGrid API key not configured"}
-
-    try:
-        from sendgrid import SendGridAPIClient
-        from sendgrid.helpers.mail import Mail
+# Iteration 6 - One SendGrid client per process
+# Emails go straight to the v3 mail/send endpoint over a keep-alive requests.Session (one per
+# thread), and the learner and tutor emails travel in a single request as two personalizations,
+# so a booking costs one HTTPS round trip instead of two fresh handshakes.
+# Each personalization carries its own subject and body through substitutions.
+# references
+# https://docs.sendgrid.com/api-reference/mail-send/mail-send
+# https://docs.sendgrid.com/for-developers/sending-email/personalizations
+# https://requests.readthedocs.io/en/latest/user/advanced/#session-objects
 
-        session_date = booking_data.get('session_date')
-        session_time = booking_data.get('session_time')
-        duration = booking_data.get('duration', 60)
+SENDGRID_SEND_URL = "https://api.sendgrid.com/v3/mail/send"
 
-        learner_subject = f"Booking Confirmed: Tutoring Session with {tutor_name}"
-        learner_content = f"""
+# Templates are parsed once at import; values are HTML-escaped when substituted
+LEARNER_EMAIL_SUBJECT = Template("Booking Confirmed: Tutoring Session with $tutor_name")
+LEARNER_EMAIL_TEMPLATE = Template("""
         <html>
         <body>
             <h2>Booking Confirmation</h2>
-            <p>Hello {learner_name},</p>
+            <p>Hello $learner_name,</p>
             <p>Your tutoring session has been confirmed!</p>
             <p><strong>Details:</strong></p>
             <ul>
-                <li><strong>Tutor:</strong> {tutor_name}</li>
-                <li><strong>Date:</strong> {session_date}</li>
-                <li><strong>Time:</strong> {session_time}</li>
-                <li><strong>Duration:</strong> {duration} minutes</li>
+                <li><strong>Tutor:</strong> $tutor_name</li>
+                <li><strong>Date:</strong> $session_date</li>
+                <li><strong>Time:</strong> $session_time</li>
+                <li><strong>Duration:</strong> $duration minutes</li>
             </ul>
             <p>We look forward to your session!</p>
             <p>Best regards,<br>StudyHive Team</p>
         </body>
         </html>
-        """
+        """)
 
-        tutor_subject = f"New Booking: Tutoring Session with {learner_name}"
-        tutor_content = f"""
+TUTOR_EMAIL_SUBJECT = Template("New Booking: Tutoring Session with $learner_name")
+TUTOR_EMAIL_TEMPLATE = Template("""
         <html>
         <body>
             <h2>New Booking Received</h2>
-            <p>Hello {tutor_name},</p>
+            <p>Hello $tutor_name,</p>
             <p>You have a new tutoring session booking!</p>
             <p><strong>Details:</strong></p>
             <ul>
-                <li><strong>Learner:</strong> {learner_name}</li>
-                <li><strong>Date:</strong> {session_date}</li>
-                <li><strong>Time:</strong> {session_time}</li>
-                <li><strong>Duration:</strong> {duration} minutes</li>
+                <li><strong>Learner:</strong> $learner_name</li>
+                <li><strong>Date:</strong> $session_date</li>
+                <li><strong>Time:</strong> $session_time</li>
+                <li><strong>Duration:</strong> $duration minutes</li>
             </ul>
             <p>Please confirm your availability.</p>
             <p>Best regards,<br>StudyHive Team</p>
         </body>
         </html>
+        """)
+
+# The shared message body is just this tag; each personalization substitutes its own HTML
+EMAIL_BODY_TAG = "-booking_body-"
+
+
+class SendGridClient:
+    """
+    Minimal SendGrid v3 client that keeps its HTTPS connections open between sends.
+    Use get_sendgrid_client() rather than creating one directly.
+    """
+
+    def __init__(self, api_key, timeout):
+        self.api_key = api_key
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        # requests.Session isn't documented as thread-safe, so each thread gets its own
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            })
+            self._local.session = session
+        return session
+
+    def send(self, from_email, messages):
+        """
+        Sends several emails in one API request.
+        messages: list of dicts with to_email, subject and html.
         """
+        payload = {
+            "from": {"email": from_email},
+            "personalizations": [
+                {
+                    "to": [{"email": message["to_email"]}],
+                    "subject": message["subject"],
+                    "substitutions": {EMAIL_BODY_TAG: message["html"]}
+                }
+                for message in messages
+            ],
+            "content": [{"type": "text/html", "value": EMAIL_BODY_TAG}]
+        }
+        response = self._session().post(SENDGRID_SEND_URL, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+
+_sendgrid_client = None
+_sendgrid_client_lock = threading.Lock()
+
+
+def get_sendgrid_client():
+    global _sendgrid_client
+    with _sendgrid_client_lock:
+        if _sendgrid_client is None:
+            _sendgrid_client = SendGridClient(SENDGRID_API_KEY, email_breaker.deadline)
+        return _sendgrid_client
+
+
+def send_booking_confirmation_email(learner_email, tutor_email, learner_name, tutor_name, booking_data):
+    # Sends booking confirmation emails to both learner and tutor
+    # Returns dict with success status and message
+    if not ENABLE_EMAIL_NOTIFICATIONS:
+        return {"success": False, "message": "Email notifications are disabled"}
+
+    if not SENDGRID_API_KEY:
+        return {"success": False, "message": "SendGrid API key not configured"}
+    return email_breaker.call(
+        _send_booking_confirmation_email, learner_email, tutor_email, learner_name, tutor_name, booking_data
+    )
+
 
-        message_learner = Mail(from_email=SENDGRID_FROM_EMAIL, to_emails=learner_email, subject=learner_subject, html_content=learner_content)
-        message_tutor = Mail(from_email=SENDGRID_FROM_EMAIL, to_emails=tutor_email, subject=tutor_subject, html_content=tutor_content)
+def _send_booking_confirmation_email(learner_email, tutor_email, learner_name, tutor_name, booking_data):
+    try:
+        values = {
+            "learner_name": html.escape(str(learner_name)),
+            "tutor_name": html.escape(str(tutor_name)),
+            "session_date": html.escape(str(booking_data.get('session_date'))),
+            "session_time": html.escape(str(booking_data.get('session_time'))),
+            "duration": html.escape(str(booking_data.get('duration', 60)))
+        }
+        # Subjects are plain text, so they use the unescaped names
+        subject_values = dict(values, learner_name=learner_name, tutor_name=tutor_name)
 
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
         print(f"[INFO] Attempting to send emails to learner ({learner_email}) and tutor ({tutor_email})")
-        response_learner = sg.send(message_learner)
-        response_tutor = sg.send(message_tutor)
-        print(f"[SUCCESS] Emails sent successfully - Learner status: {response_learner.status_code}, Tutor status: {response_tutor.status_code}")
+        response = get_sendgrid_client().send(SENDGRID_FROM_EMAIL, [
+            {
+                "to_email": learner_email,
+                "subject": LEARNER_EMAIL_SUBJECT.substitute(subject_values),
+                "html": LEARNER_EMAIL_TEMPLATE.substitute(values)
+            },
+            {
+                "to_email": tutor_email,
+                "subject": TUTOR_EMAIL_SUBJECT.substitute(subject_values),
+                "html": TUTOR_EMAIL_TEMPLATE.substitute(values)
+            }
+        ])
+        print(f"[SUCCESS] Emails sent successfully - status: {response.status_code}")
 
         return {"success": True, "message": "Confirmation emails sent successfully"}
 
@@ -208,37 +458,122 @@ def send_booking_confirmation_email(learner_email, tutor_email, learner_name, tu
 # Reference: https://chatgpt.com/share/6984a96d-f0cc-8008-abdc-dc3fe4261951
 ###################
 
-def get_timezone_info(latitude=None, longitude=None, timezone_name=None):
-    # Gets timezone info using WorldTimeAPI (free, no API key needed)
+# Iteration 6 - Timezones are answered from the IANA database bundled with Python (zoneinfo)
+# instead of calling WorldTimeAPI on every booking. Only looking up a zone we can't know
+# locally (from coordinates or an IP address) goes over the network, and those answers are
+# cached per key for TIMEZONE_CACHE_TTL seconds.
+# references
+# https://docs.python.org/3/library/zoneinfo.html
+# https://docs.python.org/3/library/functools.html#functools.lru_cache
+
+TIMEZONE_CACHE_TTL = float(os.environ.get('TIMEZONE_CACHE_TTL', 24 * 60 * 60))
+TIMEZONE_CACHE_MAX = 1024
+
+_timezone_cache = {}  # lookup key -> (zone name, fetched at)
+_timezone_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _zone(timezone_name):
+    # ZoneInfo objects are immutable, so one per zone name is kept for the life of the process
+    return ZoneInfo(timezone_name)
+
+
+@lru_cache(maxsize=1)
+def server_timezone_name():
+    """The server's own IANA zone name (TZ variable, then /etc/localtime), falling back to UTC."""
+    name = os.environ.get('TZ', '').lstrip(':')
+    if name:
+        return name
+    try:
+        # /etc/localtime -> /usr/share/zoneinfo/Europe/Dublin
+        target = os.path.realpath('/etc/localtime')
+        if '/zoneinfo/' in target:
+            return target.split('/zoneinfo/', 1)[1]
+    except OSError:
+        pass
+    return 'UTC'
+
+
+def _zone_details(timezone_name):
+    # Same fields WorldTimeAPI returned, computed locally
+    now = datetime.now(_zone(timezone_name))
+    offset = now.strftime('%z')  # +0100
+    return {
+        "success": True,
+        "timezone": timezone_name,
+        "datetime": now.isoformat(),
+        "utc_offset": f"{offset[:3]}:{offset[3:]}",
+        "day_of_week": now.isoweekday() % 7,  # 0 = Sunday, as WorldTimeAPI numbers them
+        "day_of_year": now.timetuple().tm_yday
+    }
+
+
+def _lookup_zone_name(key, url):
+    # Network lookup of a zone name, cached by key with a TTL
+    # Returns None without calling out while the timezone breaker is open
+    now = time.monotonic()
+    with _timezone_cache_lock:
+        cached = _timezone_cache.get(key)
+        if cached and now - cached[1] < TIMEZONE_CACHE_TTL:
+            return cached[0]
+
+    # Cache miss - the network call goes through the breaker; None means it is open
+    ticket = timezone_breaker.allow()
+    if not ticket:
+        return None
+    start = time.monotonic()
+    ok = False
+    try:
+        # Iteration 4 - Increased timeout and better error handling for timezone API
+        response = requests.get(url, timeout=timezone_breaker.deadline)
+        response.raise_for_status()
+        timezone_name = response.json().get('timezone')
+        if not timezone_name:
+            raise ValueError("No timezone in WorldTimeAPI response")
+        ok = True
+    finally:
+        timezone_breaker.record(ticket, ok, time.monotonic() - start)
+
+    with _timezone_cache_lock:
+        if len(_timezone_cache) >= TIMEZONE_CACHE_MAX:
+            # Drop expired entries first, then the oldest if still full
+            for stale in [k for k, (_, fetched) in _timezone_cache.items() if now - fetched >= TIMEZONE_CACHE_TTL]:
+                del _timezone_cache[stale]
+            if len(_timezone_cache) >= TIMEZONE_CACHE_MAX:
+                del _timezone_cache[min(_timezone_cache, key=lambda k: _timezone_cache[k][1])]
+        _timezone_cache[key] = (timezone_name, now)
+    return timezone_name
+
+
+def get_timezone_info(latitude=None, longitude=None, timezone_name=None, ip_address=None):
+    # Gets timezone info for a zone name, coordinates or IP address (the server's own zone by default)
     # Returns dict with timezone information
     if not ENABLE_TIMEZONE_API:
         return {"success": False, "message": "Timezone API is disabled"}
     
     try:
         if timezone_name:
-            # Get timezone by name
-            url = f"http://worldtimeapi.org/api/timezone/{timezone_name}"
-        elif latitude and longitude:
-            # Get timezone by coordinates
-            url = f"http://worldtimeapi.org/api/timezone/{latitude},{longitude}"
+            return _zone_details(timezone_name)
+        if latitude and longitude:
+            # Zone has to be inferred - WorldTimeAPI (free, no API key needed), cached
+            timezone_name = _lookup_zone_name(
+                f"coords:{round(float(latitude), 2)},{round(float(longitude), 2)}",
+                f"http://worldtimeapi.org/api/timezone/{latitude},{longitude}"
+            )
+        elif ip_address:
+            timezone_name = _lookup_zone_name(f"ip:{ip_address}", f"http://worldtimeapi.org/api/ip/{ip_address}")
         else:
-            # Get IP-based timezone (default)
-            url = "http://worldtimeapi.org/api/ip"
-        
-        # Iteration 4 - Increased timeout and better error handling for timezone API
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
+            timezone_name = server_timezone_name()
+        if timezone_name is None:
+            return timezone_breaker.rejection()
+        return _zone_details(timezone_name)
+    
+    except ZoneInfoNotFoundError:
         return {
-            "success": True,
-            "timezone": data.get('timezone'),
-            "datetime": data.get('datetime'),
-            "utc_offset": data.get('utc_offset'),
-            "day_of_week": data.get('day_of_week'),
-            "day_of_year": data.get('day_of_year')
+            "success": False,
+            "message": f"Unknown timezone '{timezone_name}'"
         }
-    
     except requests.exceptions.Timeout:
         print(f"[WARNING] Timezone API timeout - service may be slow")
         return {
@@ -4,16 +4,31 @@
 #author : Arran Bearman
 
 #Imports and flask setup
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, has_app_context, Response
 import psycopg2
 import psycopg2.extras
+import psycopg2.errors
 from flask_cors import CORS  #import and flask setup   # https://flask-cors.readthedocs.io/en/latest/
 # Iteration 2 additions
 from datetime import datetime, timedelta
+import base64
+import binascii
+import json
 import os
+import queue
 import re
+import secrets
+import threading
+import time
 from pathlib import Path
 from dotenv import load_dotenv
+from db import get_connection, get_pool, PoolTimeout
+from blob_store import (
+    LocalBlobStore, BlobTooLarge, store_from_env, DatabaseCopyReader, has_database_copy,
+    save_database_copy, delete_database_copy
+)
+from message_events import get_message_hub, notify_message_event
+from message_sync import parse_message_cursor, fetch_message_changes, format_message
 
 # Load .env file from backend_flask directory
 load_dotenv(Path(__file__).resolve().parent / ".env")
@@ -22,9 +37,18 @@ load_dotenv(Path(__file__).resolve().parent / ".env")
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
 # Uploads directory for proof documents
-UPLOADS_DIR = os.path.join(os.path.dirname(__file__), "uploads")
+# Iteration 6 - can point at a mounted/persistent disk via UPLOADS_DIR
+UPLOADS_DIR = os.environ.get('UPLOADS_DIR', os.path.join(os.path.dirname(__file__), "uploads"))
 os.makedirs(UPLOADS_DIR, exist_ok=True)
 
+# Iteration 6 - Proof documents are stored by their SHA-256 (see blob_store.py) - on local disk by
+# default, or in an object storage bucket with BLOB_STORE=s3. Until the store is durable the
+# database keeps a copy of every document and the disk is only a cache.
+MAX_PROOF_DOC_SIZE = 10 * 1024 * 1024
+proof_doc_store = store_from_env("proof_docs", UPLOADS_DIR, max_size=MAX_PROOF_DOC_SIZE)
+PROOF_UPLOAD_TTL_HOURS = float(os.environ.get('PROOF_UPLOAD_TTL_HOURS', 24))  # unclaimed uploads are removed after this
+PROOF_DOC_LOCK_ID = 741852003  # advisory lock class for one proof document file (second key: hash of its sha256)
+
 from flask.json.provider import DefaultJSONProvider
 from datetime import date, time as time_type
 
@@ -42,8 +66,8 @@ CORS(app, resources={
     r"/*": {
         "origins": "*",
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"],
-        "expose_headers": ["Content-Type"]
+        "allow_headers": ["Content-Type", "Authorization", "Range", "If-None-Match"],
+        "expose_headers": ["Content-Type", "ETag", "Accept-Ranges", "Content-Range", "Content-Length"]
     }
 })
 # Story 15 -  max file size to 10MB
@@ -53,11 +77,28 @@ app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB max file size
 #references
 #https://www.psycopg.org/docs/ - psycopg2 PostgreSQL adapter for Python
 #every time i run an sql query it calls this function
+# Connections come from a per-worker pool (see db.py) instead of a new psycopg2.connect each time
+# conn.close() returns the connection to the pool
 def get_db_connection():
-    conn = psycopg2.connect(DATABASE_URL)
+    conn = get_connection()
+    # Bind the checkout to the current request so teardown can return it if a handler forgets
+    if has_app_context():
+        g.setdefault('_db_connections', []).append(conn)
     return conn
 
 
+@app.teardown_appcontext
+def release_db_connections(exception=None):
+    # Runs after every request - returns any connection the handler didn't close (early returns etc.)
+    for conn in g.pop('_db_connections', []):
+        conn.close()
+
+
+@app.errorhandler(PoolTimeout)
+def handle_pool_timeout(e):
+    return jsonify({"error": "Server is busy, please try again shortly"}), 503
+
+
 ###################
 ###################
 # START OF ITERATION 1 CODE
@@ -71,133 +112,37 @@ def get_db_connection():
 #IS2208 and IS2209 , Simon woodworth
 # from line 34 to 250~
 
+# Iteration 6 - Table creation moved to versioned migrations (migrations.py)
+# Each migration is applied once (schema_migrations) under an advisory lock, so every gunicorn
+# worker can run this at startup safely - the first applies anything pending, the rest find the
+# schema up to date. Hosts with a pre-deploy/release step can run `python migrations.py` there
+# and set AUTO_MIGRATE=false.
 def init_database():
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS students (
-            id SERIAL PRIMARY KEY,
-            first_name TEXT,
-            last_name TEXT,
-            college_email TEXT,
-            modules TEXT DEFAULT '',
-            created_at TIMESTAMP,
-            updated_at TIMESTAMP
-        );
-        """)
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tutors (
-            tutor_id SERIAL PRIMARY KEY,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            college_email TEXT UNIQUE NOT NULL,
-            modules TEXT NOT NULL,
-            hourly_rate REAL NOT NULL,
-            rating REAL DEFAULT 0,
-            bio TEXT,
-            profile_pic TEXT,
-            verified INTEGER DEFAULT 0,
-            proof_doc BYTEA,
-            created_at TIMESTAMP,
-            updated_at TIMESTAMP
-        );
-        """)
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS bookings (
-            booking_id SERIAL PRIMARY KEY,
-            learner_id INTEGER NOT NULL,
-            tutor_id INTEGER NOT NULL,
-            session_date DATE NOT NULL,
-            session_time TIME NOT NULL,
-            duration INTEGER NOT NULL DEFAULT 60,
-            status TEXT NOT NULL DEFAULT 'pending',
-            module TEXT,
-            created_at TIMESTAMP,
-            updated_at TIMESTAMP,
-            FOREIGN KEY (learner_id) REFERENCES students(id),
-            FOREIGN KEY (tutor_id) REFERENCES tutors(tutor_id)
-        );
-        """)
+    from migrations import run_migrations
+    run_migrations()
 
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS reviews (
-            review_id SERIAL PRIMARY KEY,
-            booking_id INTEGER NOT NULL,
-            learner_id INTEGER NOT NULL,
-            tutor_id INTEGER NOT NULL,
-            rating INTEGER NOT NULL CHECK (rating >= 1 AND rating <= 5),
-            comment TEXT,
-            created_at TIMESTAMP,
-            FOREIGN KEY (booking_id) REFERENCES bookings(booking_id),
-            FOREIGN KEY (learner_id) REFERENCES students(id),
-            FOREIGN KEY (tutor_id) REFERENCES tutors(tutor_id)
-        );
-        """)
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            user_id SERIAL PRIMARY KEY,
-            email TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            role TEXT NOT NULL DEFAULT 'learner',
-            student_id INTEGER,
-            tutor_id INTEGER,
-            is_active INTEGER DEFAULT 1,
-            created_at TIMESTAMP,
-            updated_at TIMESTAMP,
-            FOREIGN KEY (student_id) REFERENCES students(id),
-            FOREIGN KEY (tutor_id) REFERENCES tutors(tutor_id)
-        );
-        """)
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tutor_availability (
-            availability_id SERIAL PRIMARY KEY,
-            tutor_id INTEGER NOT NULL,
-            day_of_week INTEGER NOT NULL CHECK (day_of_week >= 0 AND day_of_week <= 6),
-            start_time TIME NOT NULL,
-            end_time TIME NOT NULL,
-            is_available INTEGER DEFAULT 1,
-            created_at TIMESTAMP,
-            updated_at TIMESTAMP,
-            FOREIGN KEY (tutor_id) REFERENCES tutors(tutor_id)
-        );
-        """)
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS messages (
-            message_id SERIAL PRIMARY KEY,
-            booking_id INTEGER NOT NULL,
-            sender_id INTEGER NOT NULL,
-            sender_role TEXT NOT NULL,
-            message_text TEXT NOT NULL,
-            read_at TIMESTAMP,
-            created_at TIMESTAMP,
-            FOREIGN KEY (booking_id) REFERENCES bookings(booking_id)
-        );
-        """)
-
-        conn.commit()
-        conn.close()
-        print("Database initialized successfully")
+AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', 'true').lower() == 'true'
+if AUTO_MIGRATE:
+    try:
+        init_database()
     except Exception as e:
         print(f"Error initializing database: {e}")
-        if conn:
-            try:
-                conn.close()
-            except Exception:
-                pass
-        raise
 
-try:
-    init_database()
-except Exception as e:
-    print(f"Error initializing database: {e}")
+# Iteration 6 - Booking completion runs in lifecycle_worker.py. Where that process isn't deployed
+# each web worker runs it on a background thread instead; the advisory lock keeps one leader.
+# The Procfile's web line sets LIFECYCLE_IN_WEB=false because it also runs the "lifecycle" process;
+# a web service started without the Procfile (a single Render web service) keeps the default.
+if os.environ.get('LIFECYCLE_IN_WEB', 'true').lower() == 'true':
+    import lifecycle_worker
+    lifecycle_worker.start_in_background()
+
+# Iteration 6 - Calendar events and confirmation emails are sent by outbox_dispatcher.py. Where that
+# process isn't deployed each web worker runs the dispatcher on a background thread instead; jobs
+# are leased with FOR UPDATE SKIP LOCKED, so each one is still sent by a single worker.
+# Set OUTBOX_IN_WEB=false when the Procfile "outbox" process is running.
+if os.environ.get('OUTBOX_IN_WEB', 'true').lower() == 'true':
+    import outbox_dispatcher
+    outbox_dispatcher.start_in_background()
 
 
 @app.route('/students', methods=['GET'])
@@ -331,7 +276,8 @@ def delete_student(id):
 def upload_proof_document():
     """
     Handles file upload for tutor proof documents.
-    Returns file data as base64 for storage in database.
+    Iteration 6 - streams the file into the proof document store and returns a one-time
+    upload token (document_id), which the signup form then sends to POST /api/tutors.
     """
     # Handle preflight OPTIONS request
     if request.method == 'OPTIONS':
@@ -350,30 +296,174 @@ def upload_proof_document():
     if file_ext not in allowed_extensions:
         return jsonify({"error": f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}"}), 400
     
-    # Read file into memory
+    # Copy to the store in chunks (10MB limit enforced while copying)
     try:
-        file_data = file.read()
-        file_size = len(file_data)
-        
-        # Check file size (10MB limit)
-        if file_size > 10 * 1024 * 1024:
-            return jsonify({"error": "File size exceeds 10MB limit"}), 400
-        
-        # Store file data as base64 for JSON response (or return success with size info)
-        import base64
-        file_base64 = base64.b64encode(file_data).decode('utf-8')
-        
-        return jsonify({
-            "file_data": file_base64,
-            "file_size": file_size,
-            "file_ext": file_ext,
-            "message": "File ready to be stored in database"
-        }), 200
+        sha256, file_size, first_bytes = proof_doc_store.save_stream(file.stream)
+    except BlobTooLarge:
+        return jsonify({"error": "File size exceeds 10MB limit"}), 400
     except Exception as e:
-        print(f"Error reading file: {e}")
-        return jsonify({"error": f"Failed to read file: {str(e)}"}), 500
+        print(f"Error storing file: {e}")
+        return jsonify({"error": f"Failed to store file: {str(e)}"}), 500
+    content_type = detect_content_type(first_bytes)
+
+    # The signup claims the upload with this token - the SHA-256 alone could be guessed from the file
+    token = secrets.token_urlsafe(32)
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        lock_proof_doc(cursor, sha256)
+        if not proof_doc_store.exists(sha256):
+            # save_stream found the file already stored, but a purge removed it before this lock -
+            # store it again from the request (held until the upload row commits)
+            file.stream.seek(0)
+            proof_doc_store.save_stream(file.stream)
+        if not proof_doc_store.durable:
+            # The disk may be wiped by a redeploy or belong to another instance - keep a copy in the
+            # database, written a chunk at a time (once per file, however many uploads share it)
+            save_database_copy(cursor, proof_doc_store, sha256)
+        cursor.execute("""
+            INSERT INTO proof_doc_uploads (token, sha256, content_type, size_bytes, created_at)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (token, sha256, content_type, file_size, datetime.now()))
+        conn.commit()
+        # Separate transaction - purging takes other documents' locks, which must not be
+        # waited for while this one's is held
+        try:
+            purge_expired_proof_uploads(cursor)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"[WARNING] Could not purge expired proof document uploads: {e}")
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        if conn:
+            conn.close()
+
+    return jsonify({
+        "document_id": token,
+        "file_size": file_size,
+        "file_ext": file_ext,
+        "content_type": content_type,
+        "message": "File uploaded"
+    }), 200
 # End Story 15 - File upload endpoint
 
+# Iteration 6 - Proof document metadata lives in tutor_proof_docs (migration 8), not on the tutors row,
+# and the files themselves in proof_doc_store (tutor_proof_docs.sha256 is the handle)
+# Tutor read paths select these columns explicitly so a document is only loaded when it is served
+TUTOR_COLUMNS = """tutor_id, first_name, last_name, college_email, modules, hourly_rate, rating, bio,
+    profile_pic, verified, has_proof_doc, proof_doc_size, created_at, updated_at"""
+
+
+def detect_content_type(file_data):
+    # Determine content type based on file signature (first few bytes)
+    content_type = "application/octet-stream"
+    if len(file_data) >= 4:
+        if file_data[:4] == b'\x89PNG':
+            content_type = "image/png"
+        elif file_data[:4] == b'%PDF':
+            content_type = "application/pdf"
+        elif file_data[:2] == b'\xff\xd8':
+            content_type = "image/jpeg"
+        elif file_data[:4] == b'GIF8':
+            content_type = "image/gif"
+        elif file_data[:2] == b'PK' and file_data[2:4] in [b'\x03\x04', b'\x05\x06']:
+            # ZIP file (could be .docx)
+            content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    return content_type
+
+
+def save_proof_doc(cursor, tutor_id, upload_token):
+    """
+    Claims an upload (proof_doc_uploads token) for the tutor - same transaction as the caller.
+    Size and type were recorded from the stored file, not from the client. The file (and its
+    database copy, if the store isn't durable) is shared by SHA-256, so nothing is copied.
+    Returns False if the token is unknown, already used or expired.
+    """
+    now = datetime.now()
+    cursor.execute("""
+        WITH claimed AS (
+            DELETE FROM proof_doc_uploads
+            WHERE token = %s AND created_at >= %s
+            RETURNING sha256, content_type, size_bytes
+        )
+        INSERT INTO tutor_proof_docs (tutor_id, content_type, size_bytes, sha256, created_at)
+        SELECT %s, content_type, size_bytes, sha256, %s FROM claimed
+        ON CONFLICT (tutor_id) DO UPDATE
+            SET content_type = EXCLUDED.content_type, size_bytes = EXCLUDED.size_bytes,
+                sha256 = EXCLUDED.sha256, created_at = EXCLUDED.created_at
+        RETURNING size_bytes, sha256
+    """, (upload_token, now - timedelta(hours=PROOF_UPLOAD_TTL_HOURS), tutor_id, now))
+    doc = cursor.fetchone()
+    if doc is None:
+        return False
+    cursor.execute("""
+        UPDATE tutors SET has_proof_doc = 1, proof_doc_size = %s, proof_doc_sha256 = %s WHERE tutor_id = %s
+    """, (doc["size_bytes"], doc["sha256"], tutor_id))
+    return True
+
+
+def lock_proof_doc(cursor, sha256):
+    # Transaction-level lock on one stored file - an upload that reuses the file and a purge that
+    # removes it take turns, so the file can't be deleted between the dedupe and the upload row committing
+    cursor.execute("SELECT pg_advisory_xact_lock(%s, hashtext(%s))", (PROOF_DOC_LOCK_ID, sha256))
+
+
+def purge_expired_proof_uploads(cursor):
+    """
+    Deletes uploads no signup claimed within PROOF_UPLOAD_TTL_HOURS, and their files (and
+    database copies) if nothing else uses them. Run in its own transaction: each file is re-checked and removed while its
+    lock is held, and the locks are released by the caller's commit.
+    """
+    cursor.execute("DELETE FROM proof_doc_uploads WHERE created_at < %s RETURNING sha256",
+                   (datetime.now() - timedelta(hours=PROOF_UPLOAD_TTL_HOURS),))
+    # Sorted, so concurrent purges take the locks in the same order
+    expired = sorted({row[0] for row in cursor.fetchall()})
+    for sha256 in expired:
+        lock_proof_doc(cursor, sha256)
+        # The same file may belong to a tutor or to a newer upload (uploads are deduplicated by SHA-256).
+        # One statement, so a signup claiming an upload is seen either as the upload or as the tutor's document
+        cursor.execute("""
+            SELECT EXISTS (SELECT 1 FROM tutor_proof_docs WHERE sha256 = %s)
+                OR EXISTS (SELECT 1 FROM proof_doc_uploads WHERE sha256 = %s)
+        """, (sha256, sha256))
+        if cursor.fetchone()[0]:
+            continue
+        delete_database_copy(cursor, sha256)
+        try:
+            proof_doc_store.delete(sha256)
+        except Exception as e:
+            print(f"[WARNING] Could not delete unused proof document {sha256}: {e}")
+
+
+# Iteration 6 - Normalized tutor modules (tutor_modules table, migration 6)
+# Module codes are stored upper-case, one row per tutor per code, so search is an indexed equality lookup
+def normalize_module_codes(module_list):
+    # Upper-cases and de-duplicates already validated codes, keeping the order they were entered in
+    codes = []
+    for module in module_list:
+        code = module.strip().upper()
+        if code and code not in codes:
+            codes.append(code)
+    return codes
+
+
+def sync_tutor_modules(cursor, tutor_id, module_list):
+    # Makes tutor_modules match the tutor's module list - call in the same transaction as the tutors write
+    codes = normalize_module_codes(module_list)
+    cursor.execute("DELETE FROM tutor_modules WHERE tutor_id = %s AND NOT (module_code = ANY(%s))", (tutor_id, codes))
+    if codes:
+        psycopg2.extras.execute_values(
+            cursor,
+            "INSERT INTO tutor_modules (module_code, tutor_id) VALUES %s ON CONFLICT DO NOTHING",
+            [(code, tutor_id) for code in codes]
+        )
+
+
 # ADD A NEW TUTOR- unverfied by default 
 ###https://www.youtube.com/watch?v=KO0FufpqC7c#### - Video used to help create route
 @app.route('/api/tutors', methods=['POST', 'OPTIONS'])
@@ -395,17 +485,9 @@ def add_tutor():
     profile_pic = data.get('profile_pic', '')
     verified = data.get('verified', 0)
     
-    # Story 15 - Store file as BLOB in database
-    # proof_doc is base64 encoded string that gets decoded to binary for storage
-    # file reference: https://docs.python.org/3/library/base64.html (lines 446-455)
-    proof_doc_base64 = data.get('proof_doc', '')
-    proof_doc_binary = None
-    if proof_doc_base64:
-        try:
-            import base64
-            proof_doc_binary = base64.b64decode(proof_doc_base64)
-        except Exception as e:
-            return jsonify({"error": "Invalid proof document format. Must be base64 encoded."}), 400
+    # Story 15 - Proof document
+    # Iteration 6 - the file is uploaded first (/api/tutors/upload-proof); only its upload token is sent here
+    proof_doc_id = data.get('proof_doc_id') or None
     #validate required fields
     if not all([first_name, last_name, college_email, modules, hourly_rate]):
         return jsonify({"error": "Missing required fields"}), 400
@@ -426,11 +508,15 @@ def add_tutor():
         # Timestamps track when tutor signed up and when their info was last changed
         now = datetime.now()
         cursor.execute("""
-            INSERT INTO tutors (first_name, last_name, college_email, modules, hourly_rate, rating, bio, profile_pic, verified, proof_doc, created_at, updated_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            INSERT INTO tutors (first_name, last_name, college_email, modules, hourly_rate, rating, bio, profile_pic, verified, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             RETURNING tutor_id
-        """, (first_name, last_name, college_email, modules, hourly_rate, rating, bio, profile_pic, verified, proof_doc_binary, now, now))
+        """, (first_name, last_name, college_email, modules, hourly_rate, rating, bio, profile_pic, verified, now, now))
         new_id = cursor.fetchone()["tutor_id"]
+        if proof_doc_id and not save_proof_doc(cursor, new_id, proof_doc_id):
+            conn.rollback()
+            return jsonify({"error": "Proof document not found. Please upload it again."}), 400
+        sync_tutor_modules(cursor, new_id, module_list)
         conn.commit()
         
         # Story 11 - If user account exists with this email and role is tutor, link them
@@ -462,32 +548,65 @@ def add_tutor():
             conn.close()
 # End Story 15 - Tutor creation with file upload
 
+# Iteration 6 - number of results for ?q= text search
+TUTOR_SEARCH_LIMIT = 20
+TUTOR_SEARCH_MAX = 50
+# A full (IS3312) or partial (IS33) module code - TutorSearch.js uses the same pattern to choose
+# between ?module= and ?q=
+MODULE_SEARCH_PATTERN = re.compile(r'^[A-Z]{2}\d{1,4}$')
+
 # GET VERIFIED TUTORS (for learners search)
 ###https://www.youtube.com/watch?v=KO0FufpqC7c#### - Video used to help create route
 # Iteration 4 - Added search filters (price range, rating, sorting)
 # : SQL WHERE clause - https://www.w3schools.com/sql/sql_where.asp
+# Iteration 6 - Added ?q= full-text search - https://www.postgresql.org/docs/current/textsearch-controls.html
 @app.route('/api/tutors', methods=['GET'])
 def get_tutor_list():
     #returns verified tutors when searched for module
     module_query = request.args.get("module", "").strip() ##looks for query eg if frontend sends is3319 , this will store that
+    # Iteration 6 - Free-text search (e.g. "statistics python") over name, modules and bio
+    text_query = request.args.get("q", "").strip()
+    limit = min(max(request.args.get("limit", TUTOR_SEARCH_LIMIT, type=int), 1), TUTOR_SEARCH_MAX)
     
     # Iteration 4 - Get filter parameters
     min_price = request.args.get("min_price", type=float)
     max_price = request.args.get("max_price", type=float)
     min_rating = request.args.get("min_rating", type=float)
     sort_by = request.args.get("sort_by", "default")  # default, price_low, price_high, rating_high, rating_low
+
+    # Iteration 6 - Something that isn't a module code is searched as text instead
+    module_code = module_query.upper()
+    if module_query and not MODULE_SEARCH_PATTERN.match(module_code):
+        text_query = text_query or module_query
+        module_query = ""
     
     conn = get_db_connection()#db conn
     cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
     # Iteration 4 - Build query with filters
-    query = "SELECT * FROM tutors WHERE verified = 1"
+    query = f"SELECT {TUTOR_COLUMNS} FROM tutors WHERE verified = 1"
     params = []
+
+    # Iteration 6 - Full-text search uses the GIN index on search_vector (migration 7),
+    # so only matching tutors are read and ranked
+    if text_query:
+        query = f"""
+            SELECT {TUTOR_COLUMNS}, ts_rank(search_vector, search_query) AS search_rank
+            FROM tutors, websearch_to_tsquery('english', %s) AS search_query
+            WHERE verified = 1 AND search_vector @@ search_query
+        """
+        params.append(text_query)
     
     # Module filter
+    # Iteration 6 - Looked up in tutor_modules: a full code (IS3312) is an exact match,
+    # a partial code (IS33) matches codes starting with it. Both use the primary key index
     if module_query:
-        query += " AND modules ILIKE %s"
-        params.append('%' + module_query + '%')
+        if len(module_code) == 6:
+            query += " AND tutor_id IN (SELECT tutor_id FROM tutor_modules WHERE module_code = %s)"
+            params.append(module_code)
+        else:
+            query += " AND tutor_id IN (SELECT tutor_id FROM tutor_modules WHERE module_code LIKE %s)"
+            params.append(module_code + '%')
     
     # Price range filters
     if min_price is not None:
@@ -512,10 +631,18 @@ def get_tutor_list():
         query += " ORDER BY rating DESC, hourly_rate ASC"
     elif sort_by == "rating_low":
         query += " ORDER BY rating ASC, hourly_rate ASC"
+    elif text_query:
+        # Best matches first
+        query += " ORDER BY search_rank DESC, rating DESC, hourly_rate ASC"
     else:
         # Default: sort by rating (high to low), then by price (low to high)
         query += " ORDER BY rating DESC, hourly_rate ASC"
 
+    # Text search returns the top matches only
+    if text_query:
+        query += " LIMIT %s"
+        params.append(limit)
+
     cursor.execute(query, tuple(params) if params else None)
     tutors = cursor.fetchall()  #fetches 
     conn.close()  #closes connection
@@ -533,7 +660,8 @@ def get_tutor_list():
             "bio": t["bio"],
             "profile_pic": t["profile_pic"],
             "verified": t["verified"],
-            "proof_doc": "exists" if t["proof_doc"] else None  # Don't return BLOB in list, just flag
+            "proof_doc": "exists" if t["has_proof_doc"] else None,  # Don't return BLOB in list, just flag
+            **({"search_rank": round(t["search_rank"], 4)} if text_query else {})
         }
         for t in tutors
     ]
@@ -547,7 +675,7 @@ def get_unverified_tutors():
     #shows unverified tutors on admin dashboard
     conn = get_db_connection()
     cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cursor.execute("SELECT * FROM tutors WHERE verified = 0")
+    cursor.execute(f"SELECT {TUTOR_COLUMNS} FROM tutors WHERE verified = 0")
     tutors = cursor.fetchall()
     conn.close()
 
@@ -563,7 +691,8 @@ def get_unverified_tutors():
             "bio": t["bio"],
             "profile_pic": t["profile_pic"],
             "verified": t["verified"],
-            "proof_doc": "exists" if t["proof_doc"] else None  # Don't return BLOB in list, just flag
+            "proof_doc": "exists" if t["has_proof_doc"] else None,  # Don't return BLOB in list, just flag
+            "proof_doc_size": t["proof_doc_size"]
         }
         for t in tutors
     ]
@@ -614,6 +743,31 @@ def reject_tutor(tutor_id):
 # Iteration 2 - BOOKING ROUTES
 # 
 
+# Iteration 6 - Booking side effects (calendar event, confirmation emails) are written to
+# booking_outbox in the booking's transaction and delivered by outbox_dispatcher.py
+# The timezone is looked up locally (api_integrations.get_timezone_info) so it isn't queued
+BOOKING_INTEGRATIONS = ('google_calendar', 'email')
+
+
+def enqueue_booking_integrations(cursor, booking_id, payload, now, results=None):
+    """
+    Queues one outbox job per integration for a booking and marks each as pending on the booking.
+    `results` are integration results already known (e.g. timezone), stored alongside.
+    Must run in the same transaction as the booking change so a job exists only if the booking does.
+    """
+    psycopg2.extras.execute_values(cursor, """
+        INSERT INTO booking_outbox (booking_id, integration, payload, status, next_attempt_at, created_at, updated_at)
+        VALUES %s
+    """, [(booking_id, name, psycopg2.extras.Json(payload), 'pending', now, now, now) for name in BOOKING_INTEGRATIONS])
+    pending = dict(results or {})
+    pending.update({name: {"success": False, "status": "pending", "message": "Queued"} for name in BOOKING_INTEGRATIONS})
+    cursor.execute("UPDATE bookings SET integration_status = %s WHERE booking_id = %s",
+                   (psycopg2.extras.Json(pending), booking_id))
+    # Wakes the dispatcher as soon as this transaction commits
+    cursor.execute("NOTIFY booking_outbox")
+    return pending
+
+
 # create booking endpoint
 # Creates a new booking when learner books a session
 # Iteration 4 - Added API integrations (Google Calendar, Email, Timezone)
@@ -624,7 +778,7 @@ def create_booking():
     """
     Creates a new booking in the database.
     Links a learner with a tutor for a specific date and time.
-    Integrates with Google Calendar API, Email API, and Timezone API.
+    Queues the Google Calendar and Email API calls for outbox_dispatcher.py.
     """
     # Get booking data from request
     data = request.get_json()
@@ -661,62 +815,31 @@ def create_booking():
         # Iteration 4 - Check tutor availability for the requested time
         # ref: SQL date time validation - https://www.sqlitetutorial.net/sqlite-date/
         # ref: Python datetime - https://docs.python.org/3/library/datetime.html
+        # Iteration 6 - checked against every availability window for the day with slot_engine.py
         try:
+            from slot_engine import to_minutes, format_minutes, merge_intervals, contains
             booking_date = datetime.strptime(session_date, "%Y-%m-%d")
             day_of_week = booking_date.weekday()  # 0=Monday, 6=Sunday
+            requested_start = to_minutes(datetime.strptime(session_time[:5], "%H:%M").time())
+            requested_end = requested_start + int(duration)
             
-            # Check if tutor has availability set for this day
+            # Tutor's availability windows for this day
             cursor.execute("""
                 SELECT start_time, end_time FROM tutor_availability 
                 WHERE tutor_id = %s AND day_of_week = %s AND is_available = 1
             """, (tutor_id, day_of_week))
-            availability = cursor.fetchone()
+            windows = merge_intervals(
+                (to_minutes(a["start_time"]), to_minutes(a["end_time"])) for a in cursor.fetchall()
+            )
             
-            if availability:
-                # Check if requested time is within available hours
-                start_time = availability["start_time"]
-                end_time = availability["end_time"]
-                session_time_obj = datetime.strptime(session_time, "%H:%M").time()
-                start_time_obj = datetime.strptime(start_time, "%H:%M:%S").time()
-                end_time_obj = datetime.strptime(end_time, "%H:%M:%S").time()
-                
-                # Check if session time is within available window
-                if session_time_obj < start_time_obj or session_time_obj >= end_time_obj:
-                    return jsonify({
-                        "error": f"Tutor is only available between {start_time[:5]} and {end_time[:5]} on this day"
-                    }), 400
-                
-                # Check if session end time exceeds available window
-                session_end_time = (datetime.combine(booking_date.date(), session_time_obj) + timedelta(minutes=duration)).time()
-                if session_end_time > end_time_obj:
+            if windows:
+                # Check the whole session fits inside one available window
+                if not contains(windows, requested_start, requested_end):
+                    hours = ", ".join(f"{format_minutes(w_start)}-{format_minutes(w_end)}" for w_start, w_end in windows)
                     return jsonify({
-                        "error": f"Session duration would exceed tutor's available time. Tutor available until {end_time[:5]}"
+                        "error": f"Tutor is only available {hours} on this day, and the whole session must fit in one of those times"
                     }), 400
-                
-                # Check for conflicts with existing bookings
-                cursor.execute("""
-                    SELECT session_time, duration FROM bookings 
-                    WHERE tutor_id = %s AND session_date = %s 
-                    AND status IN ('pending', 'confirmed')
-                """, (tutor_id, session_date))
-                existing_bookings = cursor.fetchall()
-                
-                for booking in existing_bookings:
-                    existing_time_str = booking["session_time"]
-                    if isinstance(existing_time_str, str):
-                        existing_hour, existing_min = map(int, existing_time_str.split(':')[:2])
-                        existing_datetime = datetime.combine(booking_date.date(), datetime.strptime(f"{existing_hour:02d}:{existing_min:02d}", "%H:%M").time())
-                        existing_duration = booking["duration"] or 60
-                        existing_end = existing_datetime + timedelta(minutes=existing_duration)
-                        
-                        requested_datetime = datetime.combine(booking_date.date(), session_time_obj)
-                        requested_end = requested_datetime + timedelta(minutes=duration)
-                        
-                        # Check for overlap
-                        if not (requested_end <= existing_datetime or requested_datetime >= existing_end):
-                            return jsonify({
-                                "error": "This time slot is already booked. Please select another time."
-                            }), 400
+                # Clashes with other bookings are rejected by the bookings_no_overlap constraint on insert
             else:
                 # Tutor hasn't set availability for this day - allow booking but warn
                 print(f"[WARNING] Tutor {tutor_id} has no availability set for {day_of_week}, allowing booking anyway")
@@ -732,75 +855,45 @@ def create_booking():
         # Timestamps: created_at and updated_at both set to now when booking is first created
         # This lets me track when bookings were made and when they were last changed
         # Iteration 4 - Insert booking with module
-        cursor.execute("""
-            INSERT INTO bookings (learner_id, tutor_id, session_date, session_time, duration, status, module, created_at, updated_at)
-            VALUES (%s, %s, %s, %s, %s, 'pending', %s, %s, %s)
-            RETURNING booking_id
-        """, (learner_id, tutor_id, session_date, session_time, duration, module, now, now))
+        # Iteration 6 - The exclusion constraint (migration 11) makes the overlap check and the insert one
+        # atomic step, so two learners can't both book the same slot
+        try:
+            cursor.execute("""
+                INSERT INTO bookings (learner_id, tutor_id, session_date, session_time, duration, status, module, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, 'pending', %s, %s, %s)
+                RETURNING booking_id
+            """, (learner_id, tutor_id, session_date, session_time, duration, module, now, now))
+        except psycopg2.errors.ExclusionViolation:
+            conn.rollback()
+            return jsonify({
+                "error": "This time slot is already booked. Please select another time."
+            }), 400
         new_id = cursor.fetchone()["booking_id"]
-        conn.commit()
-        
-        # Prepare booking data for API calls
-        booking_data = {
-            'session_date': session_date,
-            'session_time': session_time,
-            'duration': duration
-        }
-        
+
         # Iteration 4 - API Integrations
-        api_results = {}
-        
-        # 1. Google Calendar API - Create calendar event
-        # Reference: https://chatgpt.com/share/6984a96d-f0cc-8008-abdc-dc3fe4261951
-        try:
-            from api_integrations import create_google_calendar_event
-            print(f"[INFO] Attempting to create Google Calendar event for booking {new_id}")
-            calendar_result = create_google_calendar_event(
-                booking_data, learner_email, tutor_email, learner_name, tutor_name
-            )
-            api_results['google_calendar'] = calendar_result
-            if calendar_result.get('success'):
-                print(f"[SUCCESS] Google Calendar event created: {calendar_result.get('event_id')}")
-            else:
-                print(f"[INFO] Google Calendar: {calendar_result.get('message')}")
-        except ImportError as e:
-            print(f"[WARNING] Google Calendar API dependencies not installed: {e}")
-            print(f"[INFO] Install with: pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib")
-            api_results['google_calendar'] = {"success": False, "message": f"Dependencies not installed: {str(e)}"}
-        except Exception as e:
-            print(f"[WARNING] Google Calendar integration failed: {e}")
-            import traceback
-            traceback.print_exc()
-            api_results['google_calendar'] = {"success": False, "message": str(e)}
-        
-        # 2. Email API - Send confirmation emails
-        # Reference: https://chatgpt.com/share/6984a96d-f0cc-8008-abdc-dc3fe4261951
-        try:
-            from api_integrations import send_booking_confirmation_email
-            print(f"[INFO] Attempting to send booking confirmation emails")
-            email_result = send_booking_confirmation_email(
-                learner_email, tutor_email, learner_name, tutor_name, booking_data
-            )
-            api_results['email'] = email_result
-            if email_result.get('success'):
-                print(f"[SUCCESS] Email API: {email_result.get('message')}")
-            else:
-                print(f"[WARNING] Email API failed: {email_result.get('message')}")
-        except Exception as e:
-            print(f"[ERROR] Email integration failed: {e}")
-            traceback.print_exc()
-            api_results['email'] = {"success": False, "message": str(e)}
-        
-        # 3. Timezone API - Get timezone information (optional)
-        # Reference: https://chatgpt.com/share/6984a96d-f0cc-8008-abdc-dc3fe4261951
+        # Iteration 6 - Timezone comes from the local IANA database - no network call
         try:
             from api_integrations import get_timezone_info
-            timezone_result = get_timezone_info()
-            api_results['timezone'] = timezone_result
+            timezone_result = dict(get_timezone_info(), status="done")
         except Exception as e:
             print(f"[WARNING] Timezone API integration failed: {e}")
-            api_results['timezone'] = {"success": False, "message": str(e)}
-        
+            timezone_result = {"success": False, "status": "failed", "message": str(e)}
+
+        # Iteration 6 - Calendar event and emails are queued in this transaction and sent by
+        # outbox_dispatcher.py, so the response no longer waits on Google or SendGrid
+        # Reference: https://chatgpt.com/share/6984a96d-f0cc-8008-abdc-dc3fe4261951
+        api_results = enqueue_booking_integrations(cursor, new_id, {
+            "booking_data": {
+                "session_date": session_date,
+                "session_time": session_time,
+                "duration": duration
+            },
+            "learner_email": learner_email,
+            "tutor_email": tutor_email,
+            "learner_name": learner_name,
+            "tutor_name": tutor_name
+        }, now, results={"timezone": timezone_result})
+        conn.commit()
         conn.close()
         
         return jsonify({
@@ -814,80 +907,48 @@ def create_booking():
         return jsonify({"error": str(e)}), 500
 
 
+# Iteration 6 - Integration results for a booking
+# Filled in by outbox_dispatcher.py after create_booking has returned; the booking form polls this
+@app.route('/api/bookings/<int:booking_id>/integrations', methods=['GET'])
+def get_booking_integrations(booking_id):
+    """
+    Returns the latest Google Calendar / Email / Timezone result for a booking.
+    Each entry has a status of pending, done, retrying, failed or skipped.
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cursor.execute("SELECT integration_status FROM bookings WHERE booking_id = %s", (booking_id,))
+        booking = cursor.fetchone()
+        if not booking:
+            return jsonify({"error": "Booking not found"}), 404
+        status = booking["integration_status"] or {}
+        return jsonify({
+            "booking_id": booking_id,
+            "api_integrations": status,
+            "pending": any(entry.get("status") in ("pending", "retrying") for entry in status.values())
+        }), 200
+    except Exception as e:
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        if conn:
+            conn.close()
+
+
 # Gets all bookings for a specific tutor
 @app.route('/api/bookings/tutor/<int:tutor_id>', methods=['GET'])
 def get_tutor_bookings(tutor_id):
     """
     Gets all bookings for a tutor.
     Includes learner names and emails using SQL JOIN.
-    Automatically marks bookings as 'completed' if session time has passed.
+    Past sessions are marked 'completed' by the lifecycle worker (lifecycle_worker.py).
     """
     conn = get_db_connection()
     cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    # Join bookings with students table to get learner info
-    cursor.execute("""
-        SELECT b.*, s.first_name as learner_first_name, s.last_name as learner_last_name, s.college_email as learner_email
-        FROM bookings b
-        JOIN students s ON b.learner_id = s.id
-        WHERE b.tutor_id = %s
-        ORDER BY b.session_date DESC, b.session_time DESC
-    """, (tutor_id,))
-    bookings = cursor.fetchall()
-    
-    # Auto-complete bookings where session time has passed
+
     now = datetime.now()
-    for booking in bookings:
-        if booking["status"] in ["pending", "confirmed"]:
-            # Check if session time has passed
-            session_date = booking["session_date"]
-            session_time = booking["session_time"]
-            
-            if session_date and session_time:
-                try:
-                    # Parse session date and time - handle different formats
-                    session_date_str = str(session_date)
-                    session_time_str = str(session_time)
-                    
-                    # Extract date part (remove time if present)
-                    if ' ' in session_date_str:
-                        date_part = session_date_str.split(' ')[0]
-                    else:
-                        date_part = session_date_str
-                    
-                    # Extract time part (handle different formats)
-                    if ':' in session_time_str:
-                        # Time might be "HH:MM:SS" or "HH:MM"
-                        time_parts = session_time_str.split(':')
-                        if len(time_parts) >= 2:
-                            time_str = f"{time_parts[0].zfill(2)}:{time_parts[1].zfill(2)}:00"
-                        else:
-                            time_str = session_time_str
-                    else:
-                        time_str = "00:00:00"
-                    
-                    # Combine date and time
-                    try:
-                        session_datetime = datetime.strptime(f"{date_part} {time_str}", "%Y-%m-%d %H:%M:%S")
-                    except ValueError:
-                        # Try alternative format
-                        session_datetime = datetime.strptime(f"{date_part} {time_str}", "%Y-%m-%d %H:%M")
-                    
-                    # Add duration to session end time
-                    duration_minutes = booking["duration"] if booking["duration"] is not None else 60
-                    session_end = session_datetime + timedelta(minutes=duration_minutes)
-                    
-                    # If session end time has passed, mark as completed
-                    if now > session_end:
-                        cursor.execute("""
-                            UPDATE bookings 
-                            SET status = 'completed', updated_at = %s 
-                            WHERE booking_id = %s AND status IN ('pending', 'confirmed')
-                        """, (now, booking["booking_id"]))
-                        conn.commit()
-                except Exception as e:
-                    pass
-    
-    # Re-fetch bookings to get updated statuses
+    # Join bookings with students table to get learner info
     # Iteration 5 - Filter out cancelled bookings older than 24 hours
     twenty_four_hours_ago = now - timedelta(hours=24)
     twenty_four_hours_ago_str = twenty_four_hours_ago.strftime("%Y-%m-%d %H:%M:%S")
@@ -936,81 +997,26 @@ def get_learner_bookings(learner_id):
     """
     Gets all bookings for a learner.
     Includes tutor names, modules, and rates using SQL JOIN.
-    Automatically marks bookings as 'completed' if session time has passed.
+    Iteration 6 - Also whether each booking has been reviewed (has_review, review_id, review_rating).
+    Past sessions are marked 'completed' by the lifecycle worker (lifecycle_worker.py).
     """
     conn = get_db_connection()
     cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    # Join bookings with tutors table to get tutor info
-    cursor.execute("""
-        SELECT b.*, t.first_name as tutor_first_name, t.last_name as tutor_last_name, t.modules, t.hourly_rate
-        FROM bookings b
-        JOIN tutors t ON b.tutor_id = t.tutor_id
-        WHERE b.learner_id = %s
-        ORDER BY b.session_date DESC, b.session_time DESC
-    """, (learner_id,))
-    bookings = cursor.fetchall()
-    
-    # Auto-complete bookings where session time has passed
+
     now = datetime.now()
-    for booking in bookings:
-        if booking["status"] in ["pending", "confirmed"]:
-            # Check if session time has passed
-            session_date = booking["session_date"]
-            session_time = booking["session_time"]
-            
-            if session_date and session_time:
-                try:
-                    # Parse session date and time - handle different formats
-                    session_date_str = str(session_date)
-                    session_time_str = str(session_time)
-                    
-                    # Extract date part (remove time if present)
-                    if ' ' in session_date_str:
-                        date_part = session_date_str.split(' ')[0]
-                    else:
-                        date_part = session_date_str
-                    
-                    # Extract time part (handle different formats)
-                    if ':' in session_time_str:
-                        # Time might be "HH:MM:SS" or "HH:MM"
-                        time_parts = session_time_str.split(':')
-                        if len(time_parts) >= 2:
-                            time_str = f"{time_parts[0].zfill(2)}:{time_parts[1].zfill(2)}:00"
-                        else:
-                            time_str = session_time_str
-                    else:
-                        time_str = "00:00:00"
-                    
-                    # Combine date and time
-                    try:
-                        session_datetime = datetime.strptime(f"{date_part} {time_str}", "%Y-%m-%d %H:%M:%S")
-                    except ValueError:
-                        # Try alternative format
-                        session_datetime = datetime.strptime(f"{date_part} {time_str}", "%Y-%m-%d %H:%M")
-                    
-                    # Add duration to session end time
-                    duration_minutes = booking["duration"] if booking["duration"] is not None else 60
-                    session_end = session_datetime + timedelta(minutes=duration_minutes)
-                    
-                    # If session end time has passed, mark as completed
-                    if now > session_end:
-                        cursor.execute("""
-                            UPDATE bookings 
-                            SET status = 'completed', updated_at = %s 
-                            WHERE booking_id = %s AND status IN ('pending', 'confirmed')
-                        """, (now, booking["booking_id"]))
-                        conn.commit()
-                except Exception as e:
-                    pass
-    
-    # Re-fetch bookings to get updated statuses
+    # Join bookings with tutors table to get tutor info
     # Iteration 5 - Filter out cancelled bookings older than 24 hours
+    # Iteration 6 - The review is joined in (idx_reviews_booking) so the page doesn't look each one up
     twenty_four_hours_ago = now - timedelta(hours=24)
     twenty_four_hours_ago_str = twenty_four_hours_ago.strftime("%Y-%m-%d %H:%M:%S")
     cursor.execute("""
-        SELECT b.*, t.first_name as tutor_first_name, t.last_name as tutor_last_name, t.modules, t.hourly_rate
+        SELECT b.*, t.first_name as tutor_first_name, t.last_name as tutor_last_name, t.modules, t.hourly_rate,
+               r.review_id, r.rating AS review_rating
         FROM bookings b
         JOIN tutors t ON b.tutor_id = t.tutor_id
+        LEFT JOIN LATERAL (
+            SELECT review_id, rating FROM reviews WHERE reviews.booking_id = b.booking_id LIMIT 1
+        ) r ON TRUE
         WHERE b.learner_id = %s
           AND NOT (b.status = 'cancelled' AND b.updated_at < %s)
         ORDER BY b.session_date DESC, b.session_time DESC
@@ -1040,7 +1046,10 @@ def get_learner_bookings(learner_id):
             "duration": b["duration"],
             "status": b["status"],
             "created_at": b["created_at"],
-            "updated_at": b["updated_at"]
+            "updated_at": b["updated_at"],
+            "has_review": b["review_id"] is not None,
+            "review_id": b["review_id"],
+            "review_rating": b["review_rating"]
         }
         for b in bookings
     ]
@@ -1172,6 +1181,13 @@ def reschedule_booking(booking_id):
         conn.commit()
         conn.close()
         return jsonify({"message": "Booking rescheduled successfully!"}), 200
+    except psycopg2.errors.ExclusionViolation:
+        # Iteration 6 - the new time overlaps another of the tutor's sessions (bookings_no_overlap)
+        conn.rollback()
+        conn.close()
+        return jsonify({
+            "error": "This time slot is already booked. Please select another time."
+        }), 400
     except Exception as e:
         return jsonify({"error": f"Database error: {str(e)}"}), 500
 
@@ -1185,91 +1201,87 @@ def reschedule_booking(booking_id):
 # file references: https://docs.python.org/3/library/sqlite3.html (lines 1019-1145, 1293-1336)
 # file references: https://flask.palletsprojects.com/en/3.0.x/api/#flask.json.jsonify (lines 1016-1415)
 
+# Iteration 6 - Keyset pagination for the admin list endpoints
+# Pages are ordered newest first on (created_at, id). The cursor is the last row's (created_at, id),
+# so the next page is "WHERE (created_at, id) < cursor" - an index range scan whatever the page depth.
+# created_at is wrapped in COALESCE so legacy rows without a timestamp still page correctly;
+# the same expression is indexed in migration 4.
+ADMIN_PAGE_DEFAULT = 50
+ADMIN_PAGE_MAX = 200
+
+
+def keyset_expr(alias, id_column):
+    return f"(COALESCE({alias}.created_at, TIMESTAMP '1970-01-01'), {alias}.{id_column})"
+
+
+def encode_cursor(created_at, row_id):
+    raw = json.dumps([(created_at or datetime(1970, 1, 1)).isoformat(), row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor_str):
+    # Raises ValueError for anything that isn't a cursor we issued - the routes answer that with a 400
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor_str.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        # bad base64 / JSON / timestamp, or JSON that isn't a [timestamp, id] pair
+        raise ValueError("Invalid cursor")
+
+
+def parse_page_args():
+    # Returns (limit, cursor) from the query string
+    limit = request.args.get('limit', ADMIN_PAGE_DEFAULT, type=int)
+    limit = max(1, min(limit, ADMIN_PAGE_MAX))
+    cursor_str = request.args.get('cursor')
+    return limit, decode_cursor(cursor_str) if cursor_str else None
+
+
+def page_response(rows, limit, id_column, format_row):
+    # rows holds up to limit + 1 results - the extra row only tells us another page exists
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1][id_column])
+    return jsonify({
+        "items": [format_row(r) for r in rows],
+        "next_cursor": next_cursor,
+        "limit": limit
+    })
+
+
 # Story 9 - admin view all bookings
 @app.route('/api/admin/bookings', methods=['GET'])
 def get_all_bookings():
     """
-    Gets all bookings in the system for admin oversight.
+    Gets bookings in the system for admin oversight, newest first, one page at a time.
     Includes learner names, tutor names, and booking details.
-    Automatically marks bookings as 'completed' if session time has passed.
+    Query params: limit, cursor (next_cursor from the previous page),
+    status, tutor_id, learner_id, from / to (session date range, YYYY-MM-DD).
+    Past sessions are marked 'completed' by the lifecycle worker (lifecycle_worker.py).
     """
+    conn = None
+    try:
+        limit, after = parse_page_args()
+        status = request.args.get('status')
+        tutor_id = request.args.get('tutor_id', type=int)
+        learner_id = request.args.get('learner_id', type=int)
+        date_from = request.args.get('from')
+        date_to = request.args.get('to')
+        for value in (date_from, date_to):
+            if value:
+                datetime.strptime(value, "%Y-%m-%d")
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameter: {str(e)}"}), 400
+
     try:
         conn = get_db_connection()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        # Join bookings with both students and tutors tables to get all information
-        cursor.execute("""
-            SELECT b.*, 
-                   s.first_name as learner_first_name, s.last_name as learner_last_name, s.college_email as learner_email,
-                   t.first_name as tutor_first_name, t.last_name as tutor_last_name, t.modules, t.hourly_rate
-            FROM bookings b
-            JOIN students s ON b.learner_id = s.id
-            JOIN tutors t ON b.tutor_id = t.tutor_id
-            ORDER BY b.created_at DESC
-        """)
-        bookings = cursor.fetchall()
-        
-        # Auto-complete bookings where session time has passed
-        now = datetime.now()
-        for booking in bookings:
-            if booking["status"] in ["pending", "confirmed"]:
-                # Check if session time has passed
-                session_date = booking["session_date"]
-                session_time = booking["session_time"]
-                
-                if session_date and session_time:
-                    try:
-                        # Parse session date and time - handle different formats
-                        session_date_str = str(session_date)
-                        session_time_str = str(session_time)
-                        
-                        # Extract date part (remove time if present)
-                        if ' ' in session_date_str:
-                            date_part = session_date_str.split(' ')[0]
-                        else:
-                            date_part = session_date_str
-                        
-                        # Extract time part (handle different formats)
-                        if ':' in session_time_str:
-                            # Time might be "HH:MM:SS" or "HH:MM"
-                            time_parts = session_time_str.split(':')
-                            if len(time_parts) >= 2:
-                                time_str = f"{time_parts[0].zfill(2)}:{time_parts[1].zfill(2)}:00"
-                            else:
-                                time_str = session_time_str
-                        else:
-                            time_str = "00:00:00"
-                        
-                        # Combine date and time
-                        try:
-                            session_datetime = datetime.strptime(f"{date_part} {time_str}", "%Y-%m-%d %H:%M:%S")
-                        except ValueError:
-                            try:
-                                # Try alternative format without seconds
-                                session_datetime = datetime.strptime(f"{date_part} {time_str}", "%Y-%m-%d %H:%M")
-                            except ValueError:
-                                # Try with just date and time parts separately
-                                time_obj = datetime.strptime(time_str, "%H:%M:%S").time()
-                                session_datetime = datetime.combine(datetime.strptime(date_part, "%Y-%m-%d").date(), time_obj)
-                        
-                        # Add duration to session end time
-                        duration_minutes = booking["duration"] if booking["duration"] is not None else 60
-                        session_end = session_datetime + timedelta(minutes=duration_minutes)
-                        
-                        # If session end time has passed, mark as completed
-                        if now > session_end:
-                            cursor.execute("""
-                                UPDATE bookings 
-                                SET status = 'completed', updated_at = %s 
-                                WHERE booking_id = %s AND status IN ('pending', 'confirmed')
-                            """, (now, booking["booking_id"]))
-                            conn.commit()
-                    except Exception as e:
-                        pass
-        # Re-fetch bookings to get updated statuses
+
         # Iteration 5 - Filter out cancelled bookings older than 24 hours
-        twenty_four_hours_ago = now - timedelta(hours=24)
-        twenty_four_hours_ago_str = twenty_four_hours_ago.strftime("%Y-%m-%d %H:%M:%S")
-        cursor.execute("""
+        twenty_four_hours_ago = datetime.now() - timedelta(hours=24)
+        query = """
             SELECT b.*,
                    s.first_name as learner_first_name, s.last_name as learner_last_name, s.college_email as learner_email,
                    t.first_name as tutor_first_name, t.last_name as tutor_last_name, t.modules, t.hourly_rate
@@ -1277,21 +1289,34 @@ def get_all_bookings():
             JOIN students s ON b.learner_id = s.id
             JOIN tutors t ON b.tutor_id = t.tutor_id
             WHERE NOT (b.status = 'cancelled' AND b.updated_at < %s)
-            ORDER BY b.created_at DESC
-        """, (twenty_four_hours_ago_str,))
+        """
+        params = [twenty_four_hours_ago]
+        if after:
+            query += f" AND {keyset_expr('b', 'booking_id')} < (%s, %s)"
+            params.extend(after)
+        if status:
+            query += " AND b.status = %s"
+            params.append(status)
+        if tutor_id:
+            query += " AND b.tutor_id = %s"
+            params.append(tutor_id)
+        if learner_id:
+            query += " AND b.learner_id = %s"
+            params.append(learner_id)
+        if date_from:
+            query += " AND b.session_date >= %s"
+            params.append(date_from)
+        if date_to:
+            query += " AND b.session_date <= %s"
+            params.append(date_to)
+        query += " ORDER BY COALESCE(b.created_at, TIMESTAMP '1970-01-01') DESC, b.booking_id DESC LIMIT %s"
+        params.append(limit + 1)
+
+        cursor.execute(query, tuple(params))
         bookings = cursor.fetchall()
-        conn.close()
 
-        # Convert to list of dictionaries
-        # Helper function to safely get module
-        def get_module_safe(booking_row):
-            try:
-                return booking_row["module"]
-            except (KeyError, IndexError):
-                return ""
-        
-        booking_list = [
-            {
+        def format_booking(b):
+            return {
                 "booking_id": b["booking_id"],
                 "learner_id": b["learner_id"],
                 "learner_name": f"{b['learner_first_name']} {b['learner_last_name']}",
@@ -1299,7 +1324,7 @@ def get_all_bookings():
                 "tutor_id": b["tutor_id"],
                 "tutor_name": f"{b['tutor_first_name']} {b['tutor_last_name']}",
                 "tutor_modules": b["modules"],  # All modules tutor teaches
-                "module": get_module_safe(b),  # Iteration 4 - Specific module for this booking
+                "module": b["module"] or "",  # Iteration 4 - Specific module for this booking
                 "tutor_hourly_rate": b["hourly_rate"],
                 "session_date": b["session_date"],
                 "session_time": b["session_time"],
@@ -1308,24 +1333,32 @@ def get_all_bookings():
                 "created_at": b["created_at"],
                 "updated_at": b["updated_at"]
             }
-            for b in bookings
-        ]
-        return jsonify(booking_list)
+
+        return page_response(bookings, limit, "booking_id", format_booking)
     except Exception as e:
         return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        if conn:
+            conn.close()
 # End Story 9 - Admin view all bookings
 
 # Iteration 4 - Admin platform report endpoint
 # ref: SQL aggregation functions - https://www.w3schools.com/sql/sql_count_avg_sum.asp
-@app.route('/api/admin/report', methods=['GET'])
-def generate_platform_report():
+def build_platform_report():
     """
-    Generates a comprehensive platform report with statistics.
+    Computes the platform report with statistics.
     Includes user counts, booking statistics, tutor metrics, and more.
+    Iteration 6 - counts, revenue and module totals come from the platform_stats table (kept
+    current by database triggers, migrations 5 and 20); the rest are small index range reads, so
+    no query scans the whole bookings table.
+    Returns (generation, report). The generation is read first, so a write that lands mid-build
+    leaves the result marked stale.
     """
+    conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        generation = current_report_generation(cursor)
         
         report = {
             "generated_at": datetime.now().isoformat(),
@@ -1337,28 +1370,22 @@ def generate_platform_report():
             "reviews": {},
             "recent_activity": {}
         }
+
+        # Maintained counters - one primary key scan of a small table
+        cursor.execute("SELECT stat_key, value FROM platform_stats")
+        stats = {row["stat_key"]: row["value"] for row in cursor.fetchall()}
+
+        def stat(key):
+            return int(stats.get(key) or 0)
         
         # User Statistics
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'learner'")
-        learner_count = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'tutor'")
-        tutor_user_count = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'admin'")
-        admin_count = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM students")
-        student_count = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM tutors")
-        tutor_record_count = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM tutors WHERE verified = 1")
-        verified_tutor_count = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM tutors WHERE verified = 0")
-        unverified_tutor_count = cursor.fetchone()["count"]
+        learner_count = stat("users.role.learner")
+        tutor_user_count = stat("users.role.tutor")
+        admin_count = stat("users.role.admin")
+        student_count = stat("students.total")
+        tutor_record_count = stat("tutors.total")
+        verified_tutor_count = stat("tutors.verified.1")
+        unverified_tutor_count = stat("tutors.verified.0")
         
         report["users"] = {
             "total_learners": learner_count,
@@ -1372,103 +1399,86 @@ def generate_platform_report():
         }
         
         # Booking Statistics
-        cursor.execute("SELECT COUNT(*) as count FROM bookings")
-        total_bookings = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM bookings WHERE status = 'pending'")
-        pending_bookings = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM bookings WHERE status = 'confirmed'")
-        confirmed_bookings = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM bookings WHERE status = 'accepted'")
-        accepted_bookings = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM bookings WHERE status = 'completed'")
-        completed_bookings = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM bookings WHERE status = 'cancelled'")
-        cancelled_bookings = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM bookings WHERE status = 'denied'")
-        denied_bookings = cursor.fetchone()["count"]
-        
-        cursor.execute("SELECT COUNT(*) as count FROM bookings WHERE status = 'missed'")
-        missed_bookings = cursor.fetchone()["count"]
-        
-        # Booking trends (last 30 days)
+        total_bookings = stat("bookings.total")
+        completed_bookings = stat("bookings.status.completed")
+        cancelled_bookings = stat("bookings.status.cancelled")
+        denied_bookings = stat("bookings.status.denied")
+        avg_duration = round(float(stats["bookings.duration_sum"]) / total_bookings, 2) if total_bookings and stats.get("bookings.duration_sum") else 0
+
+        # Revenue (sum of all completed bookings) is a maintained counter too (migration 20)
+        total_revenue = round(float(stats.get("bookings.completed_revenue") or 0), 2)
+
+        # Time-dependent booking figures - each reads only the rows in its date range
+        # Trends (last 7 / 30 days): range scan on idx_bookings_created_at
+        seven_days_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
         thirty_days_ago = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
         cursor.execute("""
-            SELECT COUNT(*) as count FROM bookings 
+            SELECT
+                COUNT(*) FILTER (WHERE created_at >= %s) as last_7_days,
+                COUNT(*) as last_30_days
+            FROM bookings
             WHERE created_at >= %s
-        """, (thirty_days_ago,))
-        bookings_last_30_days = cursor.fetchone()["count"]
-        
-        # Booking trends (last 7 days)
-        seven_days_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+        """, (seven_days_ago, thirty_days_ago))
+        booking_figures = cursor.fetchone()
+        # Active bookings: upcoming sessions only, on the partial idx_bookings_upcoming_session
         cursor.execute("""
-            SELECT COUNT(*) as count FROM bookings 
-            WHERE created_at >= %s
-        """, (seven_days_ago,))
-        bookings_last_7_days = cursor.fetchone()["count"]
-        
-        # Average booking duration
-        cursor.execute("SELECT AVG(duration) as avg_duration FROM bookings")
-        avg_duration_result = cursor.fetchone()
-        avg_duration = round(avg_duration_result["avg_duration"], 2) if avg_duration_result["avg_duration"] else 0
+            SELECT COUNT(*) as active_bookings
+            FROM bookings
+            WHERE status IN ('pending', 'confirmed', 'accepted') AND session_date >= CURRENT_DATE
+        """)
+        active_bookings = cursor.fetchone()["active_bookings"]
         
         report["bookings"] = {
             "total": total_bookings,
             "by_status": {
-                "pending": pending_bookings,
-                "confirmed": confirmed_bookings,
-                "accepted": accepted_bookings,
+                "pending": stat("bookings.status.pending"),
+                "confirmed": stat("bookings.status.confirmed"),
+                "accepted": stat("bookings.status.accepted"),
                 "completed": completed_bookings,
                 "cancelled": cancelled_bookings,
                 "denied": denied_bookings,
-                "missed": missed_bookings
+                "missed": stat("bookings.status.missed")
             },
             "trends": {
-                "last_7_days": bookings_last_7_days,
-                "last_30_days": bookings_last_30_days
+                "last_7_days": booking_figures["last_7_days"],
+                "last_30_days": booking_figures["last_30_days"]
             },
             "average_duration_minutes": avg_duration
         }
         
         # Tutor Statistics
-        # Calculate average rating from reviews (more accurate than tutors table)
-        cursor.execute("SELECT AVG(rating) as avg_rating FROM reviews")
-        avg_rating_result = cursor.fetchone()
-        avg_rating = round(avg_rating_result["avg_rating"], 2) if avg_rating_result["avg_rating"] else 0
-        
-        # Also get average from tutors table for tutor-specific stats
-        cursor.execute("SELECT AVG(rating) as avg_tutor_rating FROM tutors WHERE rating > 0")
-        avg_tutor_rating_result = cursor.fetchone()
-        avg_tutor_rating = round(avg_tutor_rating_result["avg_tutor_rating"], 2) if avg_tutor_rating_result["avg_tutor_rating"] else 0
+        # Review average comes from the maintained counters (more accurate than tutors table)
+        total_reviews = stat("reviews.total")
+        avg_review_rating = round(stat("reviews.rating_sum") / total_reviews, 2) if total_reviews else 0
+        avg_rating = avg_review_rating
+
+        # Rate range and tutor-table rating average in one aggregate
+        cursor.execute("""
+            SELECT
+                AVG(rating) FILTER (WHERE rating > 0) as avg_tutor_rating,
+                AVG(hourly_rate) FILTER (WHERE verified = 1) as avg_rate,
+                MIN(hourly_rate) FILTER (WHERE verified = 1) as min_rate,
+                MAX(hourly_rate) FILTER (WHERE verified = 1) as max_rate
+            FROM tutors
+        """)
+        tutor_figures = cursor.fetchone()
+        avg_tutor_rating = round(tutor_figures["avg_tutor_rating"], 2) if tutor_figures["avg_tutor_rating"] else 0
         
         # Use reviews average if available, otherwise use tutors average
         if avg_rating == 0 and avg_tutor_rating > 0:
             avg_rating = avg_tutor_rating
         
-        cursor.execute("SELECT AVG(hourly_rate) as avg_rate FROM tutors WHERE verified = 1")
-        avg_rate_result = cursor.fetchone()
-        avg_rate = round(avg_rate_result["avg_rate"], 2) if avg_rate_result["avg_rate"] else 0
-        
-        cursor.execute("SELECT MIN(hourly_rate) as min_rate FROM tutors WHERE verified = 1")
-        min_rate_result = cursor.fetchone()
-        min_rate = round(min_rate_result["min_rate"], 2) if min_rate_result["min_rate"] else 0
+        avg_rate = round(tutor_figures["avg_rate"], 2) if tutor_figures["avg_rate"] else 0
+        min_rate = round(tutor_figures["min_rate"], 2) if tutor_figures["min_rate"] else 0
+        max_rate = round(tutor_figures["max_rate"], 2) if tutor_figures["max_rate"] else 0
         
-        cursor.execute("SELECT MAX(hourly_rate) as max_rate FROM tutors WHERE verified = 1")
-        max_rate_result = cursor.fetchone()
-        max_rate = round(max_rate_result["max_rate"], 2) if max_rate_result["max_rate"] else 0
-        
-        # Top tutors by rating
+        # Top tutors by rating - completed session counts are kept on the tutor row by the
+        # bookings trigger (migration 20), so this reads five index entries instead of joining bookings
         cursor.execute("""
-            SELECT tutor_id, first_name, last_name, rating, hourly_rate, 
-                   (SELECT COUNT(*) FROM bookings WHERE tutor_id = tutors.tutor_id) as booking_count
-            FROM tutors 
+            SELECT tutor_id, first_name, last_name, rating, hourly_rate, completed_bookings
+            FROM tutors
             WHERE verified = 1 AND rating > 0
-            ORDER BY rating DESC, booking_count DESC
+            ORDER BY rating DESC, completed_bookings DESC
             LIMIT 5
         """)
         top_tutors = [
@@ -1477,7 +1487,7 @@ def generate_platform_report():
                 "name": f"{t['first_name']} {t['last_name']}",
                 "rating": round(t["rating"], 2),
                 "hourly_rate": t["hourly_rate"],
-                "total_bookings": t["booking_count"]
+                "completed_bookings": t["completed_bookings"]
             }
             for t in cursor.fetchall()
         ]
@@ -1492,21 +1502,19 @@ def generate_platform_report():
             "top_tutors": top_tutors
         }
         
-        # Module Popularity
-        cursor.execute("""
-            SELECT module, COUNT(*) as count 
-            FROM bookings 
-            WHERE module IS NOT NULL AND module != ''
-            GROUP BY module 
-            ORDER BY count DESC 
-            LIMIT 10
-        """)
+        # Module Popularity - from the bookings.module.<code> counters (migration 20)
+        module_counts = [
+            (key[len("bookings.module."):], int(value))
+            for key, value in stats.items()
+            if key.startswith("bookings.module.") and value > 0
+        ]
+        module_counts.sort(key=lambda m: (-m[1], m[0]))
         popular_modules = [
             {
-                "module": m["module"],
-                "booking_count": m["count"]
+                "module": module,
+                "booking_count": count
             }
-            for m in cursor.fetchall()
+            for module, count in module_counts[:10]
         ]
         
         report["modules"] = {
@@ -1514,24 +1522,10 @@ def generate_platform_report():
         }
         
         # Review Statistics
-        cursor.execute("SELECT COUNT(*) as count FROM reviews")
-        total_reviews = cursor.fetchone()["count"]
-        
-        # Calculate average rating from reviews - use COALESCE to handle NULL when no reviews exist
-        cursor.execute("SELECT COALESCE(AVG(CAST(rating AS REAL)), 0) as avg_rating FROM reviews")
-        avg_review_rating_result = cursor.fetchone()
-        avg_review_rating_value = avg_review_rating_result["avg_rating"] if avg_review_rating_result["avg_rating"] is not None else 0
-        avg_review_rating = round(float(avg_review_rating_value), 2) if avg_review_rating_value else 0
-        
-        cursor.execute("""
-            SELECT rating, COUNT(*) as count 
-            FROM reviews 
-            GROUP BY rating 
-            ORDER BY rating DESC
-        """)
         rating_distribution = {
-            str(r["rating"]): r["count"]
-            for r in cursor.fetchall()
+            str(rating): stat(f"reviews.rating.{rating}")
+            for rating in range(5, 0, -1)
+            if stat(f"reviews.rating.{rating}")
         }
         
         report["reviews"] = {
@@ -1542,7 +1536,7 @@ def generate_platform_report():
         
         # Recent Activity (last 10 bookings)
         cursor.execute("""
-            SELECT b.*, 
+            SELECT b.booking_id, b.session_date, b.status, b.created_at,
                    s.first_name as learner_first_name, s.last_name as learner_last_name,
                    t.first_name as tutor_first_name, t.last_name as tutor_last_name
             FROM bookings b
@@ -1571,26 +1565,7 @@ def generate_platform_report():
         completion_rate = (completed_bookings / total_bookings * 100) if total_bookings > 0 else 0
         cancellation_rate = ((cancelled_bookings + denied_bookings) / total_bookings * 100) if total_bookings > 0 else 0
         
-        # Calculate active bookings (confirmed or accepted bookings that haven't happened yet)
-        cursor.execute("""
-            SELECT COUNT(*) as count FROM bookings 
-            WHERE status IN ('confirmed', 'accepted', 'pending')
-            AND session_date >= CURRENT_DATE
-        """)
-        active_bookings = cursor.fetchone()["count"]
-        
-        # Calculate total revenue (sum of all completed bookings)
-        cursor.execute("""
-            SELECT COALESCE(SUM(CAST(duration AS REAL) * (SELECT hourly_rate FROM tutors WHERE tutor_id = bookings.tutor_id) / 60), 0) as revenue
-            FROM bookings 
-            WHERE status = 'completed'
-        """)
-        revenue_result = cursor.fetchone()
-        total_revenue = round(revenue_result["revenue"] or 0, 2)
-        
         # Use avg_review_rating from reviews section if available, otherwise use avg_rating from tutors section
-        # avg_review_rating is calculated from reviews table (more accurate)
-        # Check if we have reviews first, then use that average, otherwise fall back to tutors table average
         if total_reviews > 0 and avg_review_rating and avg_review_rating > 0:
             final_avg_rating = avg_review_rating
         elif avg_rating and avg_rating > 0:
@@ -1614,11 +1589,108 @@ def generate_platform_report():
             "active_bookings": active_bookings
         }
         
+        return generation, report
+    finally:
+        if conn:
+            conn.close()
+
+
+# Iteration 6 - Report cache
+# The report is cached per worker and keyed by the report generation, which triggers on every
+# table the report reads bump in the writing transaction (migration 17).
+# A snapshot is fresh while the generation is unchanged and it is younger than REPORT_CACHE_TTL.
+# A stale snapshot is still served straight away while one background thread rebuilds it,
+# unless it is older than REPORT_CACHE_MAX_STALE or the caller asks for ?refresh=true.
+REPORT_CACHE_TTL = float(os.environ.get('REPORT_CACHE_TTL', 300))
+REPORT_CACHE_MAX_STALE = float(os.environ.get('REPORT_CACHE_MAX_STALE', 3600))
+
+_report_cache = {"report": None, "generation": None, "built_at": 0.0, "refreshing": False}
+_report_cache_lock = threading.Lock()
+_report_build_lock = threading.Lock()  # only one rebuild at a time per worker
+
+
+def current_report_generation(cursor):
+    # Sum of the generation counters (migration 17) - every committed write adds to one of them
+    cursor.execute("SELECT COALESCE(SUM(value), 0) AS generation FROM platform_stats WHERE stat_key LIKE 'report.generation%'")
+    return int(cursor.fetchone()["generation"])
+
+
+def refresh_report_cache(requested_at=None):
+    # Rebuilds the cached report and returns the new snapshot
+    with _report_build_lock:
+        # Another request may have rebuilt it while this one waited for the lock
+        with _report_cache_lock:
+            snapshot = dict(_report_cache)
+        if requested_at is not None and snapshot["report"] is not None and snapshot["built_at"] >= requested_at:
+            return snapshot
+
+        generation, report = build_platform_report()
+
+        with _report_cache_lock:
+            _report_cache.update(report=report, generation=generation, built_at=time.monotonic())
+            return dict(_report_cache)
+
+
+def _refresh_report_in_background():
+    try:
+        refresh_report_cache()
+    except Exception as e:
+        print(f"[WARNING] Background report refresh failed: {e}")
+    finally:
+        with _report_cache_lock:
+            _report_cache["refreshing"] = False
+
+
+@app.route('/api/admin/report', methods=['GET'])
+def generate_platform_report():
+    """
+    Returns the platform report, served from the report cache where possible.
+    The "cache" field says how old the snapshot is and whether it is being refreshed.
+    """
+    force = request.args.get('refresh', 'false').lower() == 'true'
+    requested_at = time.monotonic()
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        generation = current_report_generation(cursor)
+        # Hand the connection back before a rebuild checks out its own
         conn.close()
+        conn = None
+
+        with _report_cache_lock:
+            snapshot = dict(_report_cache)
+        age = requested_at - snapshot["built_at"]
+        has_report = snapshot["report"] is not None
+        stale = not has_report or snapshot["generation"] != generation or age >= REPORT_CACHE_TTL
+
+        if force or not has_report or (stale and age >= REPORT_CACHE_MAX_STALE):
+            snapshot = refresh_report_cache(requested_at)
+            stale = snapshot["generation"] != generation
+        elif stale:
+            # Serve what we have and rebuild in the background (single flight per worker)
+            with _report_cache_lock:
+                start_refresh = not _report_cache["refreshing"]
+                _report_cache["refreshing"] = True
+            if start_refresh:
+                threading.Thread(target=_refresh_report_in_background, daemon=True).start()
+
+        with _report_cache_lock:
+            refreshing = _report_cache["refreshing"]
+        report = dict(snapshot["report"])
+        report["cache"] = {
+            "generation": snapshot["generation"],
+            "age_seconds": round(max(0.0, time.monotonic() - snapshot["built_at"]), 1),
+            "stale": stale,
+            "refreshing": refreshing
+        }
         return jsonify(report), 200
-        
+
     except Exception as e:
         return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        if conn:
+            conn.close()
 # End Iteration 4 - Admin platform report
 
 # Story 12 - Create review endpoint
@@ -1782,15 +1854,24 @@ def get_review_for_booking(booking_id):
 @app.route('/api/admin/users', methods=['GET'])
 def get_all_users():
     """
-    Gets all users in the system for admin management.
+    Gets users in the system for admin management, newest first, one page at a time.
     Includes user email, role, account status, and linked records.
+    Query params: limit, cursor, role, is_active (0 or 1).
     """
+    conn = None
+    try:
+        limit, after = parse_page_args()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameter: {str(e)}"}), 400
+    role = request.args.get('role')
+    is_active_filter = request.args.get('is_active', type=int)
+
     try:
         conn = get_db_connection()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
-        # Get all users with their linked student/tutor information
-        cursor.execute("""
+        # Get users with their linked student/tutor information
+        query = """
             SELECT 
                 u.user_id,
                 u.email,
@@ -1808,23 +1889,29 @@ def get_all_users():
             FROM users u
             LEFT JOIN students s ON u.student_id = s.id
             LEFT JOIN tutors t ON u.tutor_id = t.tutor_id
-            ORDER BY u.created_at DESC
-        """)
+            WHERE TRUE
+        """
+        params = []
+        if after:
+            query += f" AND {keyset_expr('u', 'user_id')} < (%s, %s)"
+            params.extend(after)
+        if role:
+            query += " AND u.role = %s"
+            params.append(role)
+        if is_active_filter is not None:
+            # Legacy accounts with NULL is_active count as active
+            query += " AND COALESCE(u.is_active, 1) = %s"
+            params.append(is_active_filter)
+        query += " ORDER BY COALESCE(u.created_at, TIMESTAMP '1970-01-01') DESC, u.user_id DESC LIMIT %s"
+        params.append(limit + 1)
+
+        cursor.execute(query, tuple(params))
         users = cursor.fetchall()
-        conn.close()
-        
-        # Convert to list of dictionaries
-        user_list = []
-        for u in users:
-            # Iteration 4 - Safely get is_active (handle legacy accounts)
-            try:
-                is_active = u["is_active"]
-                if is_active is None:
-                    is_active = 1  # Default to active for legacy accounts
-            except (KeyError, IndexError):
-                is_active = 1  # Default to active if column doesn't exist
-            
-            user_list.append({
+
+        def format_user(u):
+            # Iteration 4 - Default to active for legacy accounts
+            is_active = u["is_active"] if u["is_active"] is not None else 1
+            return {
                 "user_id": u["user_id"],
                 "email": u["email"],
                 "role": u["role"],
@@ -1836,13 +1923,14 @@ def get_all_users():
                 "student_name": f"{u['student_first_name']} {u['student_last_name']}".strip() if u["student_first_name"] else None,
                 "tutor_name": f"{u['tutor_first_name']} {u['tutor_last_name']}".strip() if u["tutor_first_name"] else None,
                 "tutor_verified": u["tutor_verified"] if u["tutor_verified"] is not None else None
-            })
+            }
         
-        return jsonify(user_list), 200
+        return page_response(users, limit, "user_id", format_user), 200
     except Exception as e:
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
         if conn:
             conn.close()
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
 
 @app.route('/api/admin/change-password', methods=['PUT'])
 def change_admin_password():
@@ -2024,28 +2112,61 @@ def create_admin():
 @app.route('/api/admin/reviews', methods=['GET'])
 def get_all_reviews():
     """
-    Gets all reviews in the system for admin oversight.
+    Gets reviews in the system for admin oversight, newest first, one page at a time.
     Includes learner names, tutor names, ratings, and comments.
+    Query params: limit, cursor, tutor_id, rating, from / to (review date range, YYYY-MM-DD).
     """
+    conn = None
+    try:
+        limit, after = parse_page_args()
+        tutor_id = request.args.get('tutor_id', type=int)
+        rating = request.args.get('rating', type=int)
+        date_from = request.args.get('from')
+        date_to = request.args.get('to')
+        if date_from:
+            date_from = datetime.strptime(date_from, "%Y-%m-%d")
+        if date_to:
+            date_to = datetime.strptime(date_to, "%Y-%m-%d") + timedelta(days=1)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameter: {str(e)}"}), 400
+
     try:
         conn = get_db_connection()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        # Join reviews with bookings, students, and tutors tables to get all information
-        cursor.execute("""
+        # Join reviews with students and tutors tables to get all information
+        query = """
             SELECT r.*, 
                    s.first_name as learner_first_name, s.last_name as learner_last_name,
                    t.first_name as tutor_first_name, t.last_name as tutor_last_name, t.modules
             FROM reviews r
             JOIN students s ON r.learner_id = s.id
             JOIN tutors t ON r.tutor_id = t.tutor_id
-            ORDER BY r.created_at DESC
-        """)
+            WHERE TRUE
+        """
+        params = []
+        if after:
+            query += f" AND {keyset_expr('r', 'review_id')} < (%s, %s)"
+            params.extend(after)
+        if tutor_id:
+            query += " AND r.tutor_id = %s"
+            params.append(tutor_id)
+        if rating:
+            query += " AND r.rating = %s"
+            params.append(rating)
+        if date_from:
+            query += " AND r.created_at >= %s"
+            params.append(date_from)
+        if date_to:
+            query += " AND r.created_at < %s"
+            params.append(date_to)
+        query += " ORDER BY COALESCE(r.created_at, TIMESTAMP '1970-01-01') DESC, r.review_id DESC LIMIT %s"
+        params.append(limit + 1)
+
+        cursor.execute(query, tuple(params))
         reviews = cursor.fetchall()
-        conn.close()
 
-        # Convert to list of dictionaries
-        review_list = [
-            {
+        def format_review(r):
+            return {
                 "review_id": r["review_id"],
                 "booking_id": r["booking_id"],
                 "learner_id": r["learner_id"],
@@ -2057,11 +2178,13 @@ def get_all_reviews():
                 "comment": r["comment"],
                 "created_at": r["created_at"]
             }
-            for r in reviews
-        ]
-        return jsonify(review_list)
+
+        return page_response(reviews, limit, "review_id", format_review)
     except Exception as e:
         return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        if conn:
+            conn.close()
 # End Story 9 - Admin reviews
 
 # Story 15 - Serve proof documents from database
@@ -2071,73 +2194,96 @@ def get_all_reviews():
 @app.route('/api/tutors/<int:tutor_id>/proof-doc', methods=['GET'])
 def serve_proof_document(tutor_id):
     """
-    Serves proof documents from database to admins for viewing/downloading.
-    Files are stored as BLOB in the database.
+    Serves proof documents to admins for viewing/downloading.
+    Iteration 6 - files are streamed from proof_doc_store (or redirected to, for object storage).
+    While the store is not durable the database copy (blob_chunks) is the real one and the disk a
+    cache that is refilled when a file is missing; once it is durable, database copies are moved
+    into the store the first time they are served. Either way the copy goes a row at a time.
+    The SHA-256 is a strong ETag, so a browser that already has the file gets a 304
+    without the file being opened, and Range requests let PDF viewers load it in parts.
     """
+    conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
-        # Get proof_doc BLOB from database
-        cursor.execute("SELECT proof_doc FROM tutors WHERE tutor_id = %s", (tutor_id,))
+        cursor.execute("""
+            SELECT t.tutor_id, d.sha256, d.content_type,
+                   EXISTS (SELECT 1 FROM blob_chunks c WHERE c.handle = d.sha256 AND c.seq = 0) AS in_database
+            FROM tutors t
+            LEFT JOIN tutor_proof_docs d ON d.tutor_id = t.tutor_id
+            WHERE t.tutor_id = %s
+        """, (tutor_id,))
         tutor = cursor.fetchone()
-        conn.close()
         
         if not tutor:
             return jsonify({"error": "Tutor not found"}), 404
         
-        if not tutor["proof_doc"]:
+        if tutor["sha256"] is None:
             return jsonify({"error": "Proof document not found"}), 404
-        
-        # Get file data from database
-        proof_doc = tutor["proof_doc"]
-        
-        # Handle BLOB (bytes/memoryview) format - PostgreSQL BYTEA returns memoryview
-        if isinstance(proof_doc, (bytes, memoryview)):
-            file_data = bytes(proof_doc)
-        elif isinstance(proof_doc, str):
-            # If stored as filename string, try to read from filesystem
-            try:
-                file_path = os.path.join(UPLOADS_DIR, proof_doc)
-                if os.path.exists(file_path):
-                    with open(file_path, 'rb') as f:
-                        file_data = f.read()
-                else:
-                    return jsonify({"error": "Proof document file not found"}), 404
-            except Exception as e:
-                return jsonify({"error": f"Error reading file: {str(e)}"}), 500
-        else:
-            return jsonify({"error": "Invalid proof document format"}), 500
-        
-        # Determine content type based on file signature (first few bytes)
-        content_type = "application/octet-stream"
-        if len(file_data) >= 4:
-            if file_data[:4] == b'\x89PNG':
-                content_type = "image/png"
-            elif file_data[:4] == b'%PDF':
-                content_type = "application/pdf"
-            elif file_data[:2] == b'\xff\xd8':
-                content_type = "image/jpeg"
-            elif file_data[:4] == b'GIF8':
-                content_type = "image/gif"
-            elif file_data[:2] == b'PK' and file_data[2:4] in [b'\x03\x04', b'\x05\x06']:
-                # ZIP file (could be .docx)
-                content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        
-        
-        from flask import Response, make_response
-        # Set headers to allow embedding and proper content display
+
+        document_id = tutor["sha256"]
+        content_type = tutor["content_type"]
+        if tutor["in_database"] and (proof_doc_store.durable or not proof_doc_store.exists(document_id)):
+            # Under the file's lock and re-checked, so a concurrent request that already moved the
+            # copy into a durable store isn't followed by one reading an empty copy
+            lock_proof_doc(cursor, document_id)
+            if has_database_copy(cursor, document_id):
+                _, _, first_bytes = proof_doc_store.save_stream(DatabaseCopyReader(cursor, document_id))
+                if content_type is None:
+                    # Documents from the old column have no stored type - record it once here
+                    content_type = detect_content_type(first_bytes)
+                    cursor.execute("UPDATE tutor_proof_docs SET content_type = %s WHERE tutor_id = %s",
+                                   (content_type, tutor_id))
+                if proof_doc_store.durable:
+                    # The store now holds the only copy it needs
+                    delete_database_copy(cursor, document_id)
+            conn.commit()
+        conn.close()
+        conn = None
+
+        # Admin already has this exact file
+        if request.if_none_match.contains(document_id):
+            response = app.response_class(status=304)
+            response.set_etag(document_id)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.headers['Access-Control-Allow-Origin'] = '*'
+            return response
+
+        if not proof_doc_store.exists(document_id):
+            return jsonify({"error": "Proof document file not found"}), 404
+        
+        if not isinstance(proof_doc_store, LocalBlobStore):
+            # Object storage serves the file (and Range requests) itself
+            from flask import redirect
+            response = redirect(proof_doc_store.presigned_url(document_id, content_type or "application/octet-stream"))
+            response.headers['Cache-Control'] = 'private, no-store'
+            return response
+
+        from flask import send_file
+        # send_file streams from disk instead of reading the whole file into the worker
+        # conditional=True answers Range / If-Range requests with 206 partial content
+        response = send_file(
+            proof_doc_store.path(document_id),
+            mimetype=content_type or "application/octet-stream",
+            conditional=True,
+            etag=document_id,
+            max_age=None
+        )
         # Content-Disposition: inline allows the file to be displayed in browser
-        response = make_response(file_data)
-        response.headers['Content-Type'] = content_type
         response.headers['Content-Disposition'] = 'inline'
         response.headers['X-Content-Type-Options'] = 'nosniff'
+        # Revalidate every time (cheap 304) in case the tutor uploads a new document
+        response.headers['Cache-Control'] = 'private, no-cache'
         # Add CORS headers explicitly for cross-origin requests
         response.headers['Access-Control-Allow-Origin'] = '*'
         response.headers['Access-Control-Allow-Methods'] = 'GET'
         return response
     except Exception as e:
         return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        if conn:
+            conn.close()
 # End Story 15 - Serve proof documents
 
 ###################
@@ -2168,7 +2314,7 @@ def get_tutor_by_id(tutor_id):
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
         # Get tutor by ID (no verification filter - tutors can edit their own profile)
-        cursor.execute("SELECT * FROM tutors WHERE tutor_id = %s", (tutor_id,))
+        cursor.execute(f"SELECT {TUTOR_COLUMNS} FROM tutors WHERE tutor_id = %s", (tutor_id,))
         tutor = cursor.fetchone()
         
         if not tutor:
@@ -2186,7 +2332,7 @@ def get_tutor_by_id(tutor_id):
             "bio": tutor["bio"],
             "profile_pic": tutor["profile_pic"],
             "verified": tutor["verified"],
-            "proof_doc": "exists" if tutor["proof_doc"] else None,  # Don't return BLOB, just flag
+            "proof_doc": "exists" if tutor["has_proof_doc"] else None,  # Don't return BLOB, just flag
             "created_at": tutor["created_at"],
             "updated_at": tutor["updated_at"]
         }
@@ -2212,7 +2358,7 @@ def get_tutor_profile(tutor_id):
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
         # Get tutor information
-        cursor.execute("SELECT * FROM tutors WHERE tutor_id = %s AND verified = 1", (tutor_id,))
+        cursor.execute(f"SELECT {TUTOR_COLUMNS} FROM tutors WHERE tutor_id = %s AND verified = 1", (tutor_id,))
         tutor = cursor.fetchone()
         
         if not tutor:
@@ -2340,6 +2486,7 @@ def update_tutor_profile(tutor_id):
             conn.close()
             return jsonify({"error": "Tutor not found"}), 404
         
+        sync_tutor_modules(cursor, tutor_id, module_list)
         conn.commit()
         conn.close()
         return jsonify({"message": "Tutor profile updated successfully!"}), 200
@@ -2360,12 +2507,75 @@ def update_tutor_profile(tutor_id):
 ###################
 ###################
 
+# Iteration 6 - Availability windows
+# A tutor can have several windows per day (e.g. 09:00-12:00 and 14:00-17:00).
+# tutor_availability is unique on (tutor_id, day_of_week, start_time) - migration 10
+MAX_AVAILABILITY_WINDOWS = 70
+
+def parse_availability_windows(windows):
+    """
+    Validates a list of {day_of_week, start_time, end_time} dicts.
+    Returns (rows, error) - rows are (day_of_week, start_time, end_time) with times as HH:MM.
+    """
+    from slot_engine import to_minutes, format_minutes
+    parsed = []
+    for window in windows:
+        if not isinstance(window, dict):
+            return None, "Each window must be an object with day_of_week, start_time and end_time"
+        try:
+            day_of_week = int(window.get('day_of_week'))
+        except (ValueError, TypeError):
+            return None, "day_of_week must be a number"
+        if day_of_week < 0 or day_of_week > 6:
+            return None, "day_of_week must be between 0 (Monday) and 6 (Sunday)"
+        try:
+            start = to_minutes(datetime.strptime(str(window.get('start_time'))[:5], "%H:%M").time())
+            end = to_minutes(datetime.strptime(str(window.get('end_time'))[:5], "%H:%M").time())
+        except ValueError:
+            return None, "Times must be in HH:MM format"
+        if end <= start:
+            return None, "End time must be after start time"
+        parsed.append((day_of_week, start, end))
+
+    # Windows on the same day must not overlap
+    parsed.sort()
+    for previous, current in zip(parsed, parsed[1:]):
+        if previous[0] == current[0] and current[1] < previous[2]:
+            return None, "Availability windows on the same day must not overlap"
+    return [(day, format_minutes(start), format_minutes(end)) for day, start, end in parsed], None
+
+
+def replace_availability(cursor, tutor_id, rows, days):
+    """
+    Makes the tutor's windows on `days` exactly `rows` - one multi-row upsert plus one delete,
+    in the caller's transaction.
+    """
+    now = datetime.now()
+    if rows:
+        psycopg2.extras.execute_values(cursor, """
+            INSERT INTO tutor_availability (tutor_id, day_of_week, start_time, end_time, is_available, created_at, updated_at)
+            VALUES %s
+            ON CONFLICT (tutor_id, day_of_week, start_time) DO UPDATE
+                SET end_time = EXCLUDED.end_time, is_available = 1, updated_at = EXCLUDED.updated_at
+        """, [(tutor_id, day, start, end, 1, now, now) for day, start, end in rows])
+    # Remove windows that are no longer in the schedule
+    cursor.execute("""
+        DELETE FROM tutor_availability
+        WHERE tutor_id = %s AND day_of_week = ANY(%s)
+          AND (day_of_week, start_time) NOT IN (
+              SELECT day, start_time::time FROM unnest(%s::int[], %s::text[]) AS keep(day, start_time)
+          )
+    """, (tutor_id, list(days), [day for day, _, _ in rows], [start for _, start, _ in rows]))
+
+
 # Set tutor availability
 @app.route('/api/tutors/<int:tutor_id>/availability', methods=['POST', 'PUT'])
 def set_tutor_availability(tutor_id):
     """
-    Sets or updates tutor availability.
+    Sets or updates tutor availability for one day.
     Expects JSON with: day_of_week (0-6), start_time, end_time, is_available (1 or 0)
+    Iteration 6 - replaces that day's windows with this one (or clears the day if is_available is 0).
+    Use PUT /api/tutors/<id>/availability/weekly to save several windows or a whole week at once.
     """
     data = request.get_json()
     
@@ -2381,45 +2591,21 @@ def set_tutor_availability(tutor_id):
     if day_of_week is None or not start_time or not end_time:
         return jsonify({"error": "Missing required fields: day_of_week, start_time, end_time"}), 400
     
-    # Validate day_of_week (0-6)
-    try:
-        day_of_week = int(day_of_week)
-        if day_of_week < 0 or day_of_week > 6:
-            return jsonify({"error": "day_of_week must be between 0 (Monday) and 6 (Sunday)"}), 400
-    except (ValueError, TypeError):
-        return jsonify({"error": "day_of_week must be a number"}), 400
+    rows, error = parse_availability_windows([{"day_of_week": day_of_week, "start_time": start_time, "end_time": end_time}])
+    if error:
+        return jsonify({"error": error}), 400
     
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
-        # Check if tutor exists
-        cursor.execute("SELECT tutor_id FROM tutors WHERE tutor_id = %s", (tutor_id,))
+        # Check if tutor exists (and serialise schedule changes for this tutor)
+        cursor.execute("SELECT tutor_id FROM tutors WHERE tutor_id = %s FOR UPDATE", (tutor_id,))
         if not cursor.fetchone():
             return jsonify({"error": "Tutor not found"}), 404
         
-        # Check if availability already exists for this day
-        cursor.execute("""
-            SELECT availability_id FROM tutor_availability 
-            WHERE tutor_id = %s AND day_of_week = %s
-        """, (tutor_id, day_of_week))
-        existing = cursor.fetchone()
-        
-        now = datetime.now()
-        if existing:
-            # Update existing availability
-            cursor.execute("""
-                UPDATE tutor_availability 
-                SET start_time = %s, end_time = %s, is_available = %s, updated_at = %s
-                WHERE tutor_id = %s AND day_of_week = %s
-            """, (start_time, end_time, is_available, now, tutor_id, day_of_week))
-        else:
-            # Insert new availability
-            cursor.execute("""
-                INSERT INTO tutor_availability (tutor_id, day_of_week, start_time, end_time, is_available, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (tutor_id, day_of_week, start_time, end_time, is_available, now, now))
+        replace_availability(cursor, tutor_id, rows if int(is_available) else [], [rows[0][0]])
         
         conn.commit()
         return jsonify({"message": "Availability updated successfully"}), 200
@@ -2431,6 +2617,45 @@ def set_tutor_availability(tutor_id):
         if conn:
             conn.close()
 
+# Iteration 6 - Save a tutor's whole weekly schedule in one request
+@app.route('/api/tutors/<int:tutor_id>/availability/weekly', methods=['PUT'])
+def set_weekly_availability(tutor_id):
+    """
+    Replaces the tutor's whole weekly schedule atomically.
+    Expects JSON: {"windows": [{"day_of_week": 0-6, "start_time": "HH:MM", "end_time": "HH:MM"}, ...]}
+    Days with no windows are left unavailable.
+    """
+    data = request.get_json()
+    if not data or not isinstance(data.get('windows'), list):
+        return jsonify({"error": "Missing required field: windows (list)"}), 400
+    if len(data['windows']) > MAX_AVAILABILITY_WINDOWS:
+        return jsonify({"error": f"At most {MAX_AVAILABILITY_WINDOWS} availability windows are allowed"}), 400
+    
+    rows, error = parse_availability_windows(data['windows'])
+    if error:
+        return jsonify({"error": error}), 400
+    
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        
+        cursor.execute("SELECT tutor_id FROM tutors WHERE tutor_id = %s FOR UPDATE", (tutor_id,))
+        if not cursor.fetchone():
+            return jsonify({"error": "Tutor not found"}), 404
+        
+        replace_availability(cursor, tutor_id, rows, range(7))
+        
+        conn.commit()
+        return jsonify({"message": "Weekly availability saved", "windows": len(rows)}), 200
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        if conn:
+            conn.close()
+
 # Get tutor availability
 @app.route('/api/tutors/<int:tutor_id>/availability', methods=['GET'])
 def get_tutor_availability(tutor_id):
@@ -2468,115 +2693,100 @@ def get_tutor_availability(tutor_id):
         if conn:
             conn.close()
 
-# Get available time slots for a specific date
+# Iteration 6 - longest range one request may ask for
+MAX_SLOT_RANGE_DAYS = 62
+
+# Get available time slots for a specific date (Iteration 6 - or a date range)
 @app.route('/api/tutors/<int:tutor_id>/available-slots', methods=['GET'])
 def get_available_slots(tutor_id):
     """
-    Gets available time slots for a tutor on a specific date.
-    Takes query parameter: date (YYYY-MM-DD)
+    Gets available time slots for a tutor on a specific date, or for a range of dates.
+    Takes query parameters: date (YYYY-MM-DD), or from and to (YYYY-MM-DD, up to 62 days),
+    plus optional slot_minutes (grid step, default 30) and duration (session length, default 30).
     Returns available time slots based on:
     1. Tutor's weekly availability
-    2. Existing bookings on that date
+    2. Existing bookings on those dates
+    Iteration 6 - computed with integer minute intervals by slot_engine.py, using one
+    availability query and one bookings query for the whole range.
     """
+    from slot_engine import slots_for_range, to_minutes
+
     date_str = request.args.get('date')
-    if not date_str:
-        return jsonify({"error": "Missing required parameter: date"}), 400
+    from_str = request.args.get('from')
+    to_str = request.args.get('to')
+    if not date_str and not (from_str and to_str):
+        return jsonify({"error": "Missing required parameter: date (or from and to)"}), 400
     
     try:
-        # Parse the date and get day of week (0=Monday, 6=Sunday)
-        booking_date = datetime.strptime(date_str, "%Y-%m-%d")
-        day_of_week = booking_date.weekday()  # 0=Monday, 6=Sunday
+        if date_str:
+            start_date = end_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        else:
+            start_date = datetime.strptime(from_str, "%Y-%m-%d").date()
+            end_date = datetime.strptime(to_str, "%Y-%m-%d").date()
     except ValueError:
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    if end_date < start_date:
+        return jsonify({"error": "'to' must not be before 'from'"}), 400
+    if (end_date - start_date).days >= MAX_SLOT_RANGE_DAYS:
+        return jsonify({"error": f"Date range can be at most {MAX_SLOT_RANGE_DAYS} days"}), 400
+
+    slot_minutes = request.args.get('slot_minutes', 30, type=int)
+    duration = request.args.get('duration', slot_minutes, type=int)
+    if not slot_minutes or slot_minutes < 5 or slot_minutes > 240 or not duration or duration < 5 or duration > 480:
+        return jsonify({"error": "slot_minutes must be 5-240 and duration 5-480 minutes"}), 400
     
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
-        # Get tutor's availability for this day of week
+        # Tutor's weekly availability (0=Monday, 6=Sunday)
         cursor.execute("""
-            SELECT start_time, end_time FROM tutor_availability 
-            WHERE tutor_id = %s AND day_of_week = %s AND is_available = 1
-        """, (tutor_id, day_of_week))
-        
-        availability = cursor.fetchone()
-        if not availability:
-            return jsonify({"available_slots": [], "message": "Tutor not available on this day"}), 200
+            SELECT day_of_week, start_time, end_time FROM tutor_availability 
+            WHERE tutor_id = %s AND is_available = 1
+        """, (tutor_id,))
+        availability = cursor.fetchall()
+        weekly_windows = {}
+        for a in availability:
+            weekly_windows.setdefault(a["day_of_week"], []).append((to_minutes(a["start_time"]), to_minutes(a["end_time"])))
         
-        start_time_val = availability["start_time"]
-        end_time_val = availability["end_time"]
+        # Existing bookings in the range (plus the day before, for sessions running past midnight)
+        cursor.execute("""
+            SELECT session_date, session_time, duration FROM bookings 
+            WHERE tutor_id = %s AND session_date BETWEEN %s AND %s AND status IN ('pending', 'confirmed', 'rescheduled')
+        """, (tutor_id, start_date - timedelta(days=1), end_date))
+        bookings = [
+            (b["session_date"], to_minutes(b["session_time"]), b["duration"] or 60)
+            for b in cursor.fetchall()
+            if b["session_time"] is not None
+        ]
 
-        # PostgreSQL returns TIME columns as datetime.time objects
-        if isinstance(start_time_val, time_type):
-            start_hour, start_min = start_time_val.hour, start_time_val.minute
-            start_time_str = start_time_val.isoformat()
-        else:
-            start_parts = str(start_time_val).split(':')
-            start_hour, start_min = int(start_parts[0]), int(start_parts[1])
-            start_time_str = str(start_time_val)
+        slots = slots_for_range(start_date, end_date, weekly_windows, bookings, slot_minutes, duration)
+
+        if date_str:
+            # Single-date response (as before)
+            day_availability = [a for a in availability if a["day_of_week"] == start_date.weekday()]
+            if not day_availability:
+                return jsonify({"available_slots": [], "message": "Tutor not available on this day"}), 200
+            return jsonify({
+                "date": date_str,
+                "available_slots": slots[start_date],
+                "tutor_availability": {
+                    "start_time": min(a["start_time"] for a in day_availability).isoformat(),
+                    "end_time": max(a["end_time"] for a in day_availability).isoformat()
+                }
+            }), 200
 
-        if isinstance(end_time_val, time_type):
-            end_hour, end_min = end_time_val.hour, end_time_val.minute
-            end_time_str = end_time_val.isoformat()
-        else:
-            end_parts = str(end_time_val).split(':')
-            end_hour, end_min = int(end_parts[0]), int(end_parts[1])
-            end_time_str = str(end_time_val)
-        
-        # Get existing bookings for this date
-        cursor.execute("""
-            SELECT session_time, duration FROM bookings 
-            WHERE tutor_id = %s AND session_date = %s AND status IN ('pending', 'confirmed')
-        """, (tutor_id, date_str))
-        
-        existing_bookings = cursor.fetchall()
-        
-        # Generate 30-minute time slots
-        available_slots = []
-        current_hour = start_hour
-        current_min = start_min
-        
-        while (current_hour < end_hour) or (current_hour == end_hour and current_min < end_min):
-            slot_time = f"{current_hour:02d}:{current_min:02d}"
-            slot_datetime = datetime.strptime(f"{date_str} {slot_time}", "%Y-%m-%d %H:%M")
-            slot_end = slot_datetime + timedelta(minutes=30)
-            
-            # Check if this slot conflicts with existing bookings
-            is_available = True
-            for booking in existing_bookings:
-                booking_time_val = booking["session_time"]
-                if isinstance(booking_time_val, time_type):
-                    booking_hour, booking_min = booking_time_val.hour, booking_time_val.minute
-                elif isinstance(booking_time_val, str):
-                    booking_hour, booking_min = map(int, booking_time_val.split(':')[:2])
-                else:
-                    continue
-                booking_datetime = datetime.strptime(f"{date_str} {booking_hour:02d}:{booking_min:02d}", "%Y-%m-%d %H:%M")
-                booking_duration = booking["duration"] or 60
-                booking_end = booking_datetime + timedelta(minutes=booking_duration)
-
-                # Check for overlap
-                if not (slot_end <= booking_datetime or slot_datetime >= booking_end):
-                    is_available = False
-                    break
-            
-            if is_available:
-                available_slots.append(slot_time)
-            
-            # Move to next 30-minute slot
-            current_min += 30
-            if current_min >= 60:
-                current_min = 0
-                current_hour += 1
-        
         return jsonify({
-            "date": date_str,
-            "available_slots": available_slots,
-            "tutor_availability": {
-                "start_time": start_time_str,
-                "end_time": end_time_str
-            }
+            "from": start_date.isoformat(),
+            "to": end_date.isoformat(),
+            "slot_minutes": slot_minutes,
+            "duration": duration,
+            "days": [
+                {"date": day.isoformat(), "available_slots": day_slots}
+                for day, day_slots in slots.items()
+            ]
         }), 200
     except Exception as e:
         return jsonify({"error": f"Database error: {str(e)}"}), 500
@@ -2716,6 +2926,8 @@ def send_message(booking_id):
         """, (booking_id, sender_id, sender_role, message_text, now))
 
         message_id = cursor.fetchone()["message_id"]
+        # Iteration 6 - Pushed to the other party's open message streams once this commits
+        notify_message_event(cursor, "message", booking, message_id)
         conn.commit()
 
         return jsonify({
@@ -2737,6 +2949,7 @@ def get_booking_messages(booking_id):
     """
     Retrieves all messages for a specific booking.
     Only accessible by the learner or tutor associated with the booking.
+    Iteration 6 - With ?since=<cursor> returns {"messages", "cursor"} holding only what changed.
     """
     # Get query parameters for authorization
     user_id = request.args.get('user_id', type=int)
@@ -2747,6 +2960,14 @@ def get_booking_messages(booking_id):
     
     if user_role not in ['learner', 'tutor']:
         return jsonify({"error": "user_role must be 'learner' or 'tutor'"}), 400
+
+    # Iteration 6 - Incremental sync (message_sync.py); since=0 is the first sync
+    since = request.args.get('since')
+    incremental = bool(since)
+    try:
+        horizon = parse_message_cursor(since) if incremental else 0
+    except ValueError:
+        return jsonify({"error": "Invalid since cursor"}), 400
     
     conn = None
     try:
@@ -2768,6 +2989,13 @@ def get_booking_messages(booking_id):
             if booking["tutor_id"] != user_id:
                 return jsonify({"error": "You are not authorized to view messages for this booking"}), 403
         
+        if incremental:
+            rows, next_cursor = fetch_message_changes(cursor, [booking_id], horizon)
+            return jsonify({
+                "messages": [format_message(msg) for msg in rows],
+                "cursor": next_cursor
+            }), 200
+
         # Get all messages for this booking, ordered by creation time
         cursor.execute("""
             SELECT message_id, booking_id, sender_id, sender_role, message_text, 
@@ -2780,18 +3008,7 @@ def get_booking_messages(booking_id):
         messages = cursor.fetchall()
         
         # Convert to list of dictionaries
-        message_list = [
-            {
-                "message_id": msg["message_id"],
-                "booking_id": msg["booking_id"],
-                "sender_id": msg["sender_id"],
-                "sender_role": msg["sender_role"],
-                "message_text": msg["message_text"],
-                "read_at": msg["read_at"],
-                "created_at": msg["created_at"]
-            }
-            for msg in messages
-        ]
+        message_list = [format_message(msg) for msg in messages]
         
         return jsonify(message_list), 200
     except Exception as e:
@@ -2807,6 +3024,8 @@ def get_user_messages():
     Retrieves all confirmed bookings for a user with their messages.
     Returns all confirmed bookings even if no messages have been sent yet,
     so users can start a conversation from the Messages tab.
+    Iteration 6 - With ?since=<cursor> returns {"booking_ids", "conversations", "cursor"} where
+    conversations only hold new messages and read receipts (all of them when the cursor is 0).
     """
     conn = None
     try:
@@ -2819,75 +3038,94 @@ def get_user_messages():
         if user_role not in ['learner', 'tutor']:
             return jsonify({"error": "user_role must be 'learner' or 'tutor'"}), 400
 
+        # Iteration 6 - Incremental sync (message_sync.py); since=0 is the first sync
+        since = request.args.get('since')
+        incremental = bool(since)
+        try:
+            horizon = parse_message_cursor(since) if incremental else 0
+        except ValueError:
+            return jsonify({"error": "Invalid since cursor"}), 400
+
         conn = get_db_connection()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
+        # Iteration 6 - Two queries whatever the number of bookings: the bookings with the other
+        # party's name joined in, then every message for those bookings in one go
         # Get all confirmed bookings for this user
         if user_role == 'learner':
             cursor.execute("""
-                SELECT booking_id, tutor_id, session_date, session_time, status, module
-                FROM bookings
-                WHERE learner_id = %s AND status IN ('confirmed', 'accepted')
-                ORDER BY session_date DESC
+                SELECT b.booking_id, b.session_date, b.session_time, b.status, b.module,
+                       t.first_name, t.last_name, COALESCE(u.unread_count, 0) AS unread_count
+                FROM bookings b
+                LEFT JOIN tutors t ON t.tutor_id = b.tutor_id
+                LEFT JOIN message_unread u ON u.booking_id = b.booking_id AND u.recipient_role = 'learner'
+                WHERE b.learner_id = %s AND b.status IN ('confirmed', 'accepted')
+                ORDER BY b.session_date DESC
             """, (user_id,))
         else:
             cursor.execute("""
-                SELECT booking_id, learner_id, session_date, session_time, status, module
-                FROM bookings
-                WHERE tutor_id = %s AND status IN ('confirmed', 'accepted')
-                ORDER BY session_date DESC
+                SELECT b.booking_id, b.session_date, b.session_time, b.status, b.module,
+                       s.first_name, s.last_name, COALESCE(u.unread_count, 0) AS unread_count
+                FROM bookings b
+                LEFT JOIN students s ON s.id = b.learner_id
+                LEFT JOIN message_unread u ON u.booking_id = b.booking_id AND u.recipient_role = 'tutor'
+                WHERE b.tutor_id = %s AND b.status IN ('confirmed', 'accepted')
+                ORDER BY b.session_date DESC
             """, (user_id,))
 
         bookings = cursor.fetchall()
 
         if not bookings:
+            if incremental:
+                return jsonify({"booking_ids": [], "conversations": [], "cursor": since}), 200
             return jsonify([]), 200
 
         result = []
+        conversations = {}
         for booking in bookings:
-            booking_id = booking["booking_id"]
-
-            # Get messages for this booking
-            cursor.execute("""
-                SELECT message_id, sender_id, sender_role, message_text, read_at, created_at
-                FROM messages
-                WHERE booking_id = %s
-                ORDER BY created_at ASC
-            """, (booking_id,))
-            messages = cursor.fetchall()
-
             # Get the other party's name
-            if user_role == 'learner':
-                cursor.execute(
-                    "SELECT first_name, last_name FROM tutors WHERE tutor_id = %s",
-                    (booking["tutor_id"],)
-                )
-            else:
-                cursor.execute(
-                    "SELECT first_name, last_name FROM students WHERE id = %s",
-                    (booking["learner_id"],)
-                )
-            other_party = cursor.fetchone()
-            other_party_name = f"{other_party['first_name']} {other_party['last_name']}" if other_party else "Unknown"
-
-            result.append({
-                "booking_id": booking_id,
+            other_party_name = (
+                f"{booking['first_name']} {booking['last_name']}" if booking["first_name"] is not None else "Unknown"
+            )
+            conversation = {
+                "booking_id": booking["booking_id"],
                 "session_date": booking["session_date"],
                 "session_time": booking["session_time"],
                 "status": booking["status"],
                 "module": booking["module"] or "",
                 "other_party_name": other_party_name,
-                "messages": [
-                    {
-                        "message_id": msg["message_id"],
-                        "sender_id": msg["sender_id"],
-                        "sender_role": msg["sender_role"],
-                        "message_text": msg["message_text"],
-                        "read_at": msg["read_at"],
-                        "created_at": msg["created_at"]
-                    }
-                    for msg in messages
-                ]
+                "unread_count": booking["unread_count"],
+                "messages": []
+            }
+            conversations[booking["booking_id"]] = conversation
+            result.append(conversation)
+
+        if incremental:
+            rows, next_cursor = fetch_message_changes(cursor, list(conversations), horizon)
+            for msg in rows:
+                conversations[msg["booking_id"]]["messages"].append(format_message(msg))
+            return jsonify({
+                "booking_ids": list(conversations),
+                # Everything on the first sync, afterwards only conversations with changes
+                "conversations": result if since == '0' else [c for c in result if c["messages"]],
+                "cursor": next_cursor
+            }), 200
+
+        # Get messages for all of these bookings (idx_messages_booking_created)
+        cursor.execute("""
+            SELECT booking_id, message_id, sender_id, sender_role, message_text, read_at, created_at
+            FROM messages
+            WHERE booking_id = ANY(%s)
+            ORDER BY booking_id, created_at ASC
+        """, (list(conversations),))
+        for msg in cursor.fetchall():
+            conversations[msg["booking_id"]]["messages"].append({
+                "message_id": msg["message_id"],
+                "sender_id": msg["sender_id"],
+                "sender_role": msg["sender_role"],
+                "message_text": msg["message_text"],
+                "read_at": msg["read_at"],
+                "created_at": msg["created_at"]
             })
 
         return jsonify(result), 200
@@ -3080,32 +3318,147 @@ def get_tutor_earnings(tutor_id):
         if conn:
             conn.close()
 
+# Iteration 6 - Message stream (Server-Sent Events)
+# One long-lived connection per tab instead of polling. Events only say that something changed
+# ("message" / "read" with the booking_id and message_id); the client then asks the ?since=
+# endpoints for the changes, so a missed event is caught up by the next fetch.
+# Streams end after MESSAGE_STREAM_MAX_SECONDS and the browser's EventSource reconnects on its own.
+MESSAGE_STREAM_HEARTBEAT = 15
+MESSAGE_STREAM_MAX_SECONDS = int(os.environ.get('MESSAGE_STREAM_MAX_SECONDS', 300))
+# Streams allowed per gunicorn worker - keep well under its --threads (32 in the Procfile) so
+# ordinary API requests always have threads left. Past the limit the stream gets a 503 and the
+# page keeps polling instead.
+MESSAGE_STREAM_MAX_PER_WORKER = int(os.environ.get('MESSAGE_STREAM_MAX_PER_WORKER', 8))
+
+
+@app.route('/api/messages/stream', methods=['GET'])
+def stream_messages():
+    """
+    Streams message events for a learner or tutor as text/event-stream.
+    Optional booking_id limits the stream to one conversation.
+    """
+    user_id = request.args.get('user_id', type=int)
+    user_role = request.args.get('user_role')
+    booking_id = request.args.get('booking_id', type=int)
+
+    if not user_id or not user_role:
+        return jsonify({"error": "Missing required query parameters: user_id and user_role"}), 400
+
+    if user_role not in ['learner', 'tutor']:
+        return jsonify({"error": "user_role must be 'learner' or 'tutor'"}), 400
+
+    if booking_id is not None:
+        # Same check as get_booking_messages - the connection goes back to the pool before streaming
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor.execute("SELECT learner_id, tutor_id FROM bookings WHERE booking_id = %s", (booking_id,))
+            booking = cursor.fetchone()
+        except Exception as e:
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+        finally:
+            if conn:
+                conn.close()
+        if not booking:
+            return jsonify({"error": "Booking not found"}), 404
+        if booking["learner_id" if user_role == 'learner' else "tutor_id"] != user_id:
+            return jsonify({"error": "You are not authorized to view messages for this booking"}), 403
+
+    hub = get_message_hub()
+    subscription = hub.subscribe(user_role, user_id, booking_id, limit=MESSAGE_STREAM_MAX_PER_WORKER)
+    if subscription is None:
+        response = jsonify({"error": "Too many live message streams, please poll instead"})
+        response.headers['Retry-After'] = str(MESSAGE_STREAM_MAX_SECONDS)
+        return response, 503
+
+    def generate():
+        try:
+            # Reconnect delay for EventSource, then a first event so the client knows it is live
+            yield "retry: 5000\n\n"
+            yield "event: ready\ndata: {}\n\n"
+            deadline = time.monotonic() + MESSAGE_STREAM_MAX_SECONDS
+            while time.monotonic() < deadline:
+                try:
+                    event = subscription.events.get(timeout=MESSAGE_STREAM_HEARTBEAT)
+                except queue.Empty:
+                    # Comment line - keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # stop nginx-style proxies buffering the stream
+    })
+
 # Iteration 4 - Mark message as read
 # ChatGPT conversation reference: https://chatgpt.com/share/6984af21-d9ac-8008-a016-f00a20286dd1
 @app.route('/api/messages/<int:message_id>/read', methods=['PUT'])
 def mark_message_read(message_id):
     """
     Marks a message as read by setting read_at timestamp.
+    Iteration 6 - When the body names the reader (user_id / user_role), only the recipient can
+    mark it read, so a sender can't clear the other party's unread count. A bare PUT from older
+    clients still marks the message read without that check.
     """
+    data = request.get_json(silent=True) or {}
+    user_id = data.get('user_id')
+    user_role = data.get('user_role')
+    check_reader = user_id is not None or user_role is not None
+
+    if check_reader:
+        if not user_id or not user_role:
+            return jsonify({"error": "Send both user_id and user_role, or neither"}), 400
+        if user_role not in ['learner', 'tutor']:
+            return jsonify({"error": "user_role must be 'learner' or 'tutor'"}), 400
+
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
-        # Check if message exists
-        cursor.execute("SELECT * FROM messages WHERE message_id = %s", (message_id,))
-        message = cursor.fetchone()
-        
-        if not message:
-            return jsonify({"error": "Message not found"}), 404
-        
         # Update read_at timestamp
-        cursor.execute("""
-            UPDATE messages 
+        # Iteration 6 - One statement; a message that is already read keeps its read_at (and the
+        # unread counters, maintained by trigger in migration 15, only change on a real transition)
+        reader_filter = ""
+        params = [datetime.now(), message_id]
+        if check_reader:
+            reader_column = "learner_id" if user_role == 'learner' else "tutor_id"
+            reader_filter = f"AND m.sender_role <> %s AND b.{reader_column} = %s"
+            params += [user_role, user_id]
+        cursor.execute(f"""
+            UPDATE messages m
             SET read_at = %s
-            WHERE message_id = %s
-        """, (datetime.now(), message_id))
+            FROM bookings b
+            WHERE m.message_id = %s AND b.booking_id = m.booking_id AND m.read_at IS NULL
+              {reader_filter}
+            RETURNING m.booking_id, b.learner_id, b.tutor_id
+        """, tuple(params))
+        message = cursor.fetchone()
         
+        if not message:
+            # Check if message exists and why it wasn't marked
+            cursor.execute("""
+                SELECT m.sender_role, b.learner_id, b.tutor_id
+                FROM messages m
+                JOIN bookings b ON b.booking_id = m.booking_id
+                WHERE m.message_id = %s
+            """, (message_id,))
+            existing = cursor.fetchone()
+            if not existing:
+                return jsonify({"error": "Message not found"}), 404
+            if check_reader:
+                if existing["learner_id" if user_role == 'learner' else "tutor_id"] != user_id:
+                    return jsonify({"error": "You are not authorized to read messages for this booking"}), 403
+                if existing["sender_role"] == user_role:
+                    return jsonify({"error": "You cannot mark your own message as read"}), 400
+            # Already read
+            return jsonify({"message": "Message marked as read", "message_id": message_id}), 200
+        
+        notify_message_event(cursor, "read", message, message_id)
         conn.commit()
         return jsonify({"message": "Message marked as read", "message_id": message_id}), 200
     except Exception as e:
@@ -3116,6 +3469,101 @@ def mark_message_read(message_id):
         if conn:
             conn.close()
 
+# Iteration 6 - Mark a whole conversation read up to a message
+# One ranged UPDATE on (booking_id, message_id) instead of a PUT per message
+@app.route('/api/bookings/<int:booking_id>/messages/read', methods=['PUT'])
+def mark_conversation_read(booking_id):
+    """
+    Marks every message the other party sent in this booking, up to and including
+    up_to_message_id (all of them if omitted), as read.
+    """
+    data = request.get_json() or {}
+    user_id = data.get('user_id')
+    user_role = data.get('user_role')
+    up_to_message_id = data.get('up_to_message_id')
+
+    if not user_id or not user_role:
+        return jsonify({"error": "Missing required fields: user_id and user_role"}), 400
+
+    if user_role not in ['learner', 'tutor']:
+        return jsonify({"error": "user_role must be 'learner' or 'tutor'"}), 400
+
+    # bool is a subclass of int - true/false are not message ids
+    if up_to_message_id is not None and (not isinstance(up_to_message_id, int) or isinstance(up_to_message_id, bool)):
+        return jsonify({"error": "up_to_message_id must be a message id"}), 400
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+        cursor.execute("SELECT booking_id, learner_id, tutor_id FROM bookings WHERE booking_id = %s", (booking_id,))
+        booking = cursor.fetchone()
+
+        if not booking:
+            return jsonify({"error": "Booking not found"}), 404
+
+        # Verify user is part of this booking
+        if booking["learner_id" if user_role == 'learner' else "tutor_id"] != user_id:
+            return jsonify({"error": "You are not authorized to read messages for this booking"}), 403
+
+        query = """
+            UPDATE messages
+            SET read_at = %s
+            WHERE booking_id = %s AND read_at IS NULL AND sender_role <> %s
+        """
+        params = [datetime.now(), booking_id, user_role]
+        if up_to_message_id is not None:
+            query += " AND message_id <= %s"
+            params.append(up_to_message_id)
+        cursor.execute(query, tuple(params))
+        marked = cursor.rowcount
+
+        if marked:
+            notify_message_event(cursor, "read", booking, up_to_message_id)
+        conn.commit()
+        return jsonify({"message": "Conversation marked as read", "booking_id": booking_id, "marked_read": marked}), 200
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        if conn:
+            conn.close()
+
+
+# Iteration 6 - Unread message counts for the nav badge
+# Reads the counters kept by the migration 15 triggers - no message history is scanned
+@app.route('/api/messages/unread', methods=['GET'])
+def get_unread_counts():
+    """
+    Returns a user's total unread messages and the count per booking.
+    """
+    user_id = request.args.get('user_id', type=int)
+    user_role = request.args.get('user_role')
+
+    if not user_id or not user_role:
+        return jsonify({"error": "Missing required query parameters: user_id and user_role"}), 400
+
+    if user_role not in ['learner', 'tutor']:
+        return jsonify({"error": "user_role must be 'learner' or 'tutor'"}), 400
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cursor.execute("""
+            SELECT booking_id, unread_count FROM message_unread
+            WHERE recipient_role = %s AND recipient_id = %s AND unread_count > 0
+        """, (user_role, user_id))
+        bookings = {str(row["booking_id"]): row["unread_count"] for row in cursor.fetchall()}
+        return jsonify({"total": sum(bookings.values()), "bookings": bookings}), 200
+    except Exception as e:
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+    finally:
+        if conn:
+            conn.close()
+
 ###################
 ###################
 # End Iteration 4 - Tutor Availability, Booking Confirmation, and Messaging
@@ -3358,6 +3806,46 @@ def login_user():
 ################
 ###################
 
+# Admin metrics - connection pool statistics for sizing DB_POOL_MIN / DB_POOL_MAX under load
+@app.route('/api/admin/metrics', methods=['GET'])
+def get_admin_metrics():
+    """
+    Returns runtime statistics for this worker process.
+    Iteration 6 - Also the integration circuit breakers: this process's own, and the ones the
+    outbox dispatcher published in the last few minutes.
+    """
+    from circuit_breaker import breaker_snapshots
+
+    dispatcher_breakers = {}
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cursor.execute("""
+            SELECT process, name, snapshot, updated_at FROM integration_breakers
+            WHERE updated_at >= %s
+            ORDER BY process, name
+        """, (datetime.now() - timedelta(minutes=5),))
+        for row in cursor.fetchall():
+            dispatcher_breakers.setdefault(row["process"], {})[row["name"]] = dict(
+                row["snapshot"], updated_at=row["updated_at"].isoformat()
+            )
+    except Exception as e:
+        print(f"[WARNING] Could not load published circuit breaker state: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+    return jsonify({
+        "pid": os.getpid(),
+        "db_pool": get_pool().stats(),
+        "message_streams": get_message_hub().stats(),
+        "circuit_breakers": {
+            "web": breaker_snapshots(),
+            "dispatchers": dispatcher_breakers
+        }
+    }), 200
+
 # Health check endpoint for testing connectivity
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -3367,5 +3855,8 @@ def health_check():
 # RUN LOCALLY PORT 5000
 #app entry point
 if __name__ == '__main__':
+    # Local development - make sure the schema is current before serving
+    if not AUTO_MIGRATE:
+        init_database()
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=False, port=port, host='0.0.0.0')
@@ -0,0 +1,251 @@
+# Content-addressed file store for tutor proof documents
+# Files are written to disk in chunks while being hashed and named by their SHA-256,
+# so the same document uploaded twice is stored once and a file is never held in memory whole.
+# Layout: <root>/<first two hex chars>/<full sha256> (the same key is used in an S3 bucket)
+# A store is "durable" when files survive a redeploy and every instance sees the same files
+# (an object storage bucket, or a disk the operator marks as such). app.py keeps the database
+# copy of each document (blob_chunks, migration 21) until the store is durable.
+# references
+# https://docs.python.org/3/library/hashlib.html - incremental hashing with update()
+# https://docs.python.org/3/library/os.html#os.replace - atomic rename into place
+# https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3.html
+
+import hashlib
+import os
+import re
+import tempfile
+from contextlib import closing
+
+CHUNK_SIZE = 64 * 1024
+DB_CHUNK_SIZE = 1024 * 1024  # bytes per blob_chunks row
+
+_HANDLE_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class BlobTooLarge(Exception):
+    """Raised when a stream is longer than the store's max_size."""
+    pass
+
+
+def copy_and_hash(stream, out, max_size=None):
+    """
+    Copies a file-like object to `out` chunk by chunk while hashing it.
+    Returns (sha256 hex, size, first_bytes) - first_bytes is the start of the file for type sniffing.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    first_bytes = b''
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise BlobTooLarge(f"File exceeds {max_size} bytes")
+        if len(first_bytes) < 16:
+            first_bytes += chunk[:16 - len(first_bytes)]
+        digest.update(chunk)
+        out.write(chunk)
+    return digest.hexdigest(), size, first_bytes
+
+
+class LocalBlobStore:
+    """
+    Stores blobs under a directory on local (or mounted) disk.
+    Only durable if the operator says the directory is persistent and shared by every instance.
+    """
+
+    def __init__(self, root, max_size=None, durable=False):
+        self.root = root
+        self.max_size = max_size
+        self.durable = durable
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def is_handle(handle):
+        return bool(handle) and bool(_HANDLE_PATTERN.match(handle))
+
+    def path(self, handle):
+        if not self.is_handle(handle):
+            raise ValueError("Invalid blob handle")
+        return os.path.join(self.root, handle[:2], handle)
+
+    def exists(self, handle):
+        return self.is_handle(handle) and os.path.isfile(self.path(handle))
+
+    def size(self, handle):
+        return os.path.getsize(self.path(handle))
+
+    def open(self, handle):
+        return open(self.path(handle), 'rb')
+
+    def delete(self, handle):
+        if self.exists(handle):
+            os.remove(self.path(handle))
+
+    def save_stream(self, stream):
+        """
+        Copies a file-like object into the store chunk by chunk.
+        Returns (handle, size, first_bytes) - first_bytes is the start of the file for type sniffing.
+        """
+        # Temp file in the same directory tree so the final rename never crosses filesystems
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                handle, size, first_bytes = copy_and_hash(stream, tmp, self.max_size)
+            final_path = self.path(handle)
+            if os.path.exists(final_path):
+                # Already stored - dedupe
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+            return handle, size, first_bytes
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class S3BlobStore:
+    """
+    Stores blobs in an S3 (or S3-compatible) bucket - durable and shared by every instance.
+    Files are served with short-lived presigned URLs instead of through the web worker.
+    boto3 is only needed when this store is configured.
+    """
+
+    durable = True
+
+    def __init__(self, bucket, prefix='', max_size=None, endpoint_url=None):
+        import boto3
+        from botocore.exceptions import ClientError
+        self._client_error = ClientError
+        self.client = boto3.client('s3', endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_size = max_size
+
+    is_handle = staticmethod(LocalBlobStore.is_handle)
+
+    def key(self, handle):
+        if not self.is_handle(handle):
+            raise ValueError("Invalid blob handle")
+        return f"{self.prefix}{handle[:2]}/{handle}"
+
+    def _head(self, handle):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.key(handle))
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def exists(self, handle):
+        return self.is_handle(handle) and self._head(handle) is not None
+
+    def size(self, handle):
+        return self._head(handle)["ContentLength"]
+
+    def open(self, handle):
+        body = self.client.get_object(Bucket=self.bucket, Key=self.key(handle))["Body"]
+        return closing(body)
+
+    def delete(self, handle):
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(handle))
+
+    def presigned_url(self, handle, content_type, expires=300):
+        return self.client.generate_presigned_url('get_object', Params={
+            "Bucket": self.bucket,
+            "Key": self.key(handle),
+            "ResponseContentType": content_type,
+            "ResponseContentDisposition": 'inline'
+        }, ExpiresIn=expires)
+
+    def save_stream(self, stream):
+        # Hashed into a local temp file first - the key is the SHA-256, only known at the end
+        with tempfile.TemporaryFile() as tmp:
+            handle, size, first_bytes = copy_and_hash(stream, tmp, self.max_size)
+            if self._head(handle) is None:
+                tmp.seek(0)
+                self.client.upload_fileobj(tmp, self.bucket, self.key(handle))
+        return handle, size, first_bytes
+
+
+def store_from_env(name, local_root, max_size=None):
+    """
+    Builds the store for `name` from the environment:
+      BLOB_STORE=s3 with BLOB_STORE_BUCKET (and optional BLOB_STORE_ENDPOINT) - object storage
+      otherwise local disk under local_root; BLOB_STORE_DURABLE=true if that disk is persistent and shared
+    """
+    if os.environ.get('BLOB_STORE', 'local').lower() == 's3':
+        return S3BlobStore(os.environ['BLOB_STORE_BUCKET'], prefix=f"{name}/", max_size=max_size,
+                           endpoint_url=os.environ.get('BLOB_STORE_ENDPOINT') or None)
+    durable = os.environ.get('BLOB_STORE_DURABLE', 'false').lower() == 'true'
+    return LocalBlobStore(os.path.join(local_root, name), max_size=max_size, durable=durable)
+
+
+# Database copies
+# A file's copy in the database is split over blob_chunks rows (handle, seq, data), so copying it
+# in or out holds one row in memory rather than the whole file. These take the caller's cursor
+# and run in its transaction.
+
+def has_database_copy(cursor, handle):
+    cursor.execute("SELECT 1 FROM blob_chunks WHERE handle = %s AND seq = 0", (handle,))
+    return cursor.fetchone() is not None
+
+
+def save_database_copy(cursor, store, handle):
+    """Copies a stored file into blob_chunks, unless it is already there."""
+    if has_database_copy(cursor, handle):
+        return
+    with store.open(handle) as f:
+        # Row 0 is written even for an empty file - it marks the copy as present
+        seq = 0
+        chunk = f.read(DB_CHUNK_SIZE)
+        while True:
+            cursor.execute("INSERT INTO blob_chunks (handle, seq, data) VALUES (%s, %s, %s)", (handle, seq, chunk))
+            seq += 1
+            chunk = f.read(DB_CHUNK_SIZE)
+            if not chunk:
+                break
+
+
+def delete_database_copy(cursor, handle):
+    cursor.execute("DELETE FROM blob_chunks WHERE handle = %s", (handle,))
+
+
+class DatabaseCopyReader:
+    """
+    Read-only file-like view of a file's database copy, fetching one row at a time -
+    pass it to a store's save_stream to put the file back.
+    """
+
+    def __init__(self, cursor, handle):
+        # Own plain cursor, so rows come back as tuples whatever the caller's cursor factory is
+        self._cursor = cursor.connection.cursor()
+        self._handle = handle
+        self._seq = 0
+        self._chunk = b''
+        self._pos = 0
+        self._done = False
+
+    def _next_chunk(self):
+        self._cursor.execute("SELECT data FROM blob_chunks WHERE handle = %s AND seq = %s", (self._handle, self._seq))
+        row = self._cursor.fetchone()
+        if row is None:
+            self._done = True
+            return False
+        self._chunk = bytes(row[0])
+        self._pos = 0
+        self._seq += 1
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            return b''.join(iter(lambda: self.read(DB_CHUNK_SIZE), b''))
+        while self._pos >= len(self._chunk):
+            if self._done or not self._next_chunk():
+                return b''
+        data = self._chunk[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
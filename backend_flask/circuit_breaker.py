@@ -0,0 +1,190 @@
+# Circuit breaker for the external integrations (Google Calendar, SendGrid, WorldTimeAPI)
+# Each integration gets a breaker that remembers its recent calls. Once too many of them fail
+# it "opens" and callers get an immediate failure instead of waiting for another timeout; after
+# a cool-down one trial call is let through ("half-open") and its result decides whether the
+# breaker closes again.
+# Calls slower than the breaker's deadline count as failures, so a service that is up but
+# crawling is shed as well.
+# references
+# https://martinfowler.com/bliki/CircuitBreaker.html
+# https://learn.microsoft.com/en-us/azure/architecture/patterns/circuit-breaker
+
+import os
+import threading
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# allow() tickets - record() needs to know whether the call was the half-open trial
+NORMAL = 'normal'
+TRIAL = 'trial'
+
+BREAKER_WINDOW_SECONDS = float(os.environ.get('BREAKER_WINDOW_SECONDS', 60))  # rolling window for the error rate
+BREAKER_MIN_CALLS = int(os.environ.get('BREAKER_MIN_CALLS', 5))  # calls in the window before it can open
+BREAKER_ERROR_RATE = float(os.environ.get('BREAKER_ERROR_RATE', 0.5))  # failure share that opens the breaker
+BREAKER_OPEN_SECONDS = float(os.environ.get('BREAKER_OPEN_SECONDS', 30))  # cool-down before a trial call
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker with a rolling error-rate window.
+    `deadline` is the per-call time budget in seconds - callers pass it to their HTTP client as
+    the timeout, and calls that take longer are recorded as failures.
+    """
+
+    def __init__(self, name, deadline, window_seconds=BREAKER_WINDOW_SECONDS, min_calls=BREAKER_MIN_CALLS,
+                 error_rate=BREAKER_ERROR_RATE, open_seconds=BREAKER_OPEN_SECONDS):
+        self.name = name
+        self.deadline = deadline
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._calls = deque()  # (finished at, ok, seconds) within the window
+        self._failures = 0  # failures currently in _calls
+        self._opened_at = None
+        self._trial_in_flight = False
+
+        # Lifetime counters for the metrics endpoint
+        self._total_calls = 0
+        self._total_failures = 0
+        self._slow_calls = 0
+        self._rejected = 0
+        self._times_opened = 0
+
+    def allow(self):
+        """
+        Asks to make a call. Returns False if it must not go ahead, otherwise a ticket (NORMAL, or
+        TRIAL for the one call an open breaker lets through after the cool-down) to pass to record().
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return NORMAL
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return TRIAL
+            self._rejected += 1
+            return False
+
+    def record(self, ticket, ok, seconds):
+        """Records the outcome of a call that allow() let through, with the ticket it returned."""
+        now = time.monotonic()
+        if seconds > self.deadline:
+            ok = False
+        with self._lock:
+            self._total_calls += 1
+            if seconds > self.deadline:
+                self._slow_calls += 1
+            if not ok:
+                self._total_failures += 1
+
+            if ticket == TRIAL:
+                # Only the trial call decides how a half-open breaker goes
+                self._trial_in_flight = False
+                if ok:
+                    # Trial call worked - start again with a clean window
+                    self._state = CLOSED
+                    self._calls.clear()
+                    self._failures = 0
+                else:
+                    self._open(now)
+                return
+            if self._state != CLOSED:
+                # Admitted before the breaker opened and finished after - too late to count
+                return
+
+            self._calls.append((now, ok, seconds))
+            if not ok:
+                self._failures += 1
+            self._trim(now)
+            if (self._state == CLOSED and len(self._calls) >= self.min_calls
+                    and self._failures / len(self._calls) >= self.error_rate):
+                self._open(now)
+
+    def call(self, func, *args, **kwargs):
+        """
+        Runs func (which returns an api_integrations result dict) through the breaker.
+        Returns the fast-fail result without calling func while the breaker is open.
+        """
+        ticket = self.allow()
+        if not ticket:
+            return self.rejection()
+        start = time.monotonic()
+        ok = False
+        try:
+            result = func(*args, **kwargs)
+            ok = bool(result.get("success"))
+            return result
+        finally:
+            self.record(ticket, ok, time.monotonic() - start)
+
+    def rejection(self):
+        # Same shape as every other api_integrations failure
+        return {
+            "success": False,
+            "message": f"{self.name} is temporarily unavailable (circuit open)",
+            "circuit": OPEN
+        }
+
+    def snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            calls = len(self._calls)
+            latencies = sorted(seconds for _, _, seconds in self._calls)
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = round(max(0.0, self.open_seconds - (now - self._opened_at)), 1)
+            return {
+                "state": self._state,
+                "deadline_seconds": self.deadline,
+                "window_calls": calls,
+                "window_failures": self._failures,
+                "window_error_rate": round(self._failures / calls, 3) if calls else 0,
+                "window_p95_ms": round(latencies[int(0.95 * (calls - 1))] * 1000, 1) if calls else None,
+                "retry_in_seconds": retry_in,
+                "total_calls": self._total_calls,
+                "total_failures": self._total_failures,
+                "slow_calls": self._slow_calls,
+                "rejected": self._rejected,
+                "times_opened": self._times_opened
+            }
+
+    def _open(self, now):
+        if self._state != OPEN:
+            self._times_opened += 1
+            print(f"[WARNING] Circuit breaker '{self.name}' opened - failing fast for {self.open_seconds:.0f}s")
+        self._state = OPEN
+        self._opened_at = now
+
+    def _trim(self, now):
+        # Drops calls that have left the rolling window
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            if not self._calls.popleft()[1]:
+                self._failures -= 1
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, deadline):
+    # One breaker per integration name per process
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, deadline)
+        return _breakers[name]
+
+
+def breaker_snapshots():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
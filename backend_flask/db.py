@@ -0,0 +1,258 @@
+# Database connection pool
+# Keeps a small set of open PostgreSQL connections in each gunicorn worker so
+# requests reuse them instead of paying a TCP + TLS + auth handshake every time
+# references
+# https://www.psycopg.org/docs/connection.html - psycopg2 connection API
+# https://www.psycopg.org/docs/extensions.html#transaction-status-constants
+
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import psycopg2
+import psycopg2.extensions
+from dotenv import load_dotenv
+
+# Load .env file from backend_flask directory (so worker scripts get the same settings as app.py)
+load_dotenv(Path(__file__).resolve().parent / ".env")
+
+# Pool sizing - each gunicorn worker gets its own pool
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 1))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+DB_POOL_IDLE_CHECK = float(os.environ.get('DB_POOL_IDLE_CHECK', 30))  # ping connections idle longer than this
+DB_POOL_MAX_IDLE = float(os.environ.get('DB_POOL_MAX_IDLE', 300))  # close spare connections idle longer than this
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within DB_POOL_TIMEOUT seconds."""
+    pass
+
+
+class PooledConnection:
+    """
+    Wraps a psycopg2 connection checked out of the pool.
+    close() hands the connection back to the pool instead of closing the socket,
+    so route code that already calls conn.close() keeps working unchanged.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._returned = False
+
+    def close(self):
+        # Safe to call more than once (handler close + request teardown)
+        if not self._returned:
+            self._returned = True
+            self._pool.putconn(self._raw)
+
+    @property
+    def closed(self):
+        return 1 if self._returned else self._raw.closed
+
+    def __getattr__(self, name):
+        if self._returned:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(self._raw, name)
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool with min/max sizing.
+    Callers block for up to `timeout` seconds when every connection is in use.
+    Connections that sat idle for a while are pinged before being handed out.
+    """
+
+    def __init__(self, dsn, minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX, timeout=DB_POOL_TIMEOUT,
+                 idle_check=DB_POOL_IDLE_CHECK, max_idle=DB_POOL_MAX_IDLE):
+        self.dsn = dsn
+        self.minconn = max(0, minconn)
+        self.maxconn = max(1, maxconn, self.minconn)
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self.max_idle = max_idle
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, last_used) - most recently used on the right
+        self._size = 0  # open connections, idle + in use
+        self._in_use = 0
+        self._waiting = 0
+
+        # Statistics for sizing the pool under load
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def fill(self):
+        # Opens connections up to the minimum size (best effort, used at startup)
+        while True:
+            with self._cond:
+                if self._size >= self.minconn:
+                    return
+                self._size += 1
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+
+    def getconn(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        raw = None
+        last_used = None
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        raw, last_used = self._idle.pop()
+                        break
+                    if self._size < self.maxconn:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"No database connection available after {self.timeout}s (pool size {self.maxconn})")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_use += 1
+
+        # Connecting and validating happen outside the lock so other threads are not blocked
+        try:
+            if raw is not None and not self._is_usable(raw, last_used):
+                self._close_quietly(raw)
+                with self._cond:
+                    self._discarded += 1
+                raw = None
+            if raw is None:
+                raw = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return raw
+
+    def putconn(self, raw):
+        # Roll back anything the handler left open so the next request starts clean
+        broken = bool(raw.closed)
+        if not broken:
+            try:
+                if raw.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    raw.rollback()
+                if raw.autocommit:
+                    raw.autocommit = False
+            except psycopg2.Error:
+                broken = True
+
+        to_close = []
+        with self._cond:
+            self._in_use -= 1
+            if broken or self.pid != os.getpid():
+                self._size -= 1
+                self._discarded += 1
+                to_close.append(raw)
+            else:
+                now = time.monotonic()
+                self._idle.append((raw, now))
+                # Shrink back towards the minimum once the load has gone away
+                while self._size > self.minconn and self._idle and now - self._idle[0][1] > self.max_idle:
+                    stale, _ = self._idle.popleft()
+                    self._size -= 1
+                    to_close.append(stale)
+            self._cond.notify()
+
+        for conn in to_close:
+            self._close_quietly(conn)
+
+    def closeall(self):
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+        for conn in idle:
+            self._close_quietly(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "open": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "avg_checkout_ms": round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0,
+                "max_checkout_ms": round(self._wait_max * 1000, 3)
+            }
+
+    def _connect(self):
+        return psycopg2.connect(self.dsn)
+
+    def _is_usable(self, raw, last_used):
+        if raw.closed:
+            return False
+        if time.monotonic() - last_used < self.idle_check:
+            return True
+        # Idle long enough that the server or a proxy may have dropped it - ping first
+        try:
+            cursor = raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            raw.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    # One pool per process - gunicorn forks workers, so a pool inherited from the parent is discarded
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = ConnectionPool(os.environ.get('DATABASE_URL'))
+            try:
+                _pool.fill()
+            except Exception as e:
+                print(f"[WARNING] Could not pre-open database connections: {e}")
+        return _pool
+
+
+def get_connection():
+    # Checks out a pooled connection; calling close() on it returns it to the pool
+    pool = get_pool()
+    return PooledConnection(pool, pool.getconn())
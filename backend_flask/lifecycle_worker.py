@@ -0,0 +1,182 @@
+# Booking lifecycle worker
+# Owns the pending/confirmed -> completed transition so the bookings GET routes are pure reads
+# and the admin report's completed counts / revenue are current without anyone opening a page.
+# Run as its own process next to the web app (see Procfile "lifecycle"):
+#   python lifecycle_worker.py
+# or, where only the web process is deployed, on a background thread in each web worker
+# (LIFECYCLE_IN_WEB, started by app.py).
+# Several copies can run safely - only the one holding the advisory lock does any work.
+# references
+# https://docs.python.org/3/library/heapq.html - min-heap of upcoming session end times
+# https://www.postgresql.org/docs/current/functions-admin.html#FUNCTIONS-ADVISORY-LOCKS
+
+import heapq
+import os
+import signal
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import psycopg2
+import psycopg2.extras
+from dotenv import load_dotenv
+
+# Load .env file from backend_flask directory (for DATABASE_URL when run on its own)
+load_dotenv(Path(__file__).resolve().parent / ".env")
+
+# Arbitrary constant - the worker holding this lock is the leader
+LIFECYCLE_LOCK_ID = 741852002
+
+LIFECYCLE_BATCH_SIZE = int(os.environ.get('LIFECYCLE_BATCH_SIZE', 500))  # bookings completed per UPDATE
+LIFECYCLE_REFRESH_SECONDS = float(os.environ.get('LIFECYCLE_REFRESH_SECONDS', 60))  # reload upcoming end times
+LIFECYCLE_HORIZON_MINUTES = int(os.environ.get('LIFECYCLE_HORIZON_MINUTES', 24 * 60))  # how far ahead to schedule
+LIFECYCLE_STANDBY_SECONDS = float(os.environ.get('LIFECYCLE_STANDBY_SECONDS', 30))  # retry interval for non-leaders
+
+# Session end time - same expression as idx_bookings_active_end (migration 3)
+SESSION_END_SQL = "(session_date + session_time + duration * INTERVAL '1 minute')"
+
+stop_event = threading.Event()
+
+
+def complete_due_bookings(cursor, now, booking_ids=None, limit=LIFECYCLE_BATCH_SIZE):
+    """
+    Marks up to `limit` active bookings whose session has ended as completed.
+    The end time is re-checked in SQL so bookings cancelled or rescheduled
+    since they were scheduled are left alone.
+    Returns the number of bookings completed.
+    """
+    query = f"""
+        UPDATE bookings
+        SET status = 'completed', updated_at = %s
+        WHERE booking_id IN (
+            SELECT booking_id FROM bookings
+            WHERE status IN ('pending', 'confirmed')
+              AND {SESSION_END_SQL} <= %s
+              {"AND booking_id = ANY(%s)" if booking_ids is not None else ""}
+            ORDER BY {SESSION_END_SQL}
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+    """
+    params = [now, now]
+    if booking_ids is not None:
+        params.append(list(booking_ids))
+    params.append(limit)
+    cursor.execute(query, tuple(params))
+    # Cached admin reports see the change through the report generation trigger (migration 17)
+    return cursor.rowcount
+
+
+def load_upcoming(cursor, now):
+    # Returns a min-heap of (end_time, booking_id) for active sessions ending within the horizon
+    cursor.execute(f"""
+        SELECT booking_id, {SESSION_END_SQL} AS session_end
+        FROM bookings
+        WHERE status IN ('pending', 'confirmed')
+          AND {SESSION_END_SQL} > %s
+          AND {SESSION_END_SQL} <= %s
+        ORDER BY session_end
+        LIMIT %s
+    """, (now, now + timedelta(minutes=LIFECYCLE_HORIZON_MINUTES), LIFECYCLE_BATCH_SIZE * 10))
+    heap = [(row["session_end"], row["booking_id"]) for row in cursor.fetchall()]
+    heapq.heapify(heap)
+    return heap
+
+
+def catch_up(conn, cursor):
+    # Completes everything already overdue, one batch per transaction
+    total = 0
+    while not stop_event.is_set():
+        completed = complete_due_bookings(cursor, datetime.now())
+        conn.commit()
+        total += completed
+        if completed < LIFECYCLE_BATCH_SIZE:
+            break
+    if total:
+        print(f"[INFO] Lifecycle: completed {total} overdue booking(s)")
+
+
+def run_as_leader(conn):
+    cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    while not stop_event.is_set():
+        catch_up(conn, cursor)
+        heap = load_upcoming(cursor, datetime.now())
+        conn.commit()
+        refresh_at = datetime.now() + timedelta(seconds=LIFECYCLE_REFRESH_SECONDS)
+
+        # Sleep until the next session ends, transition it (and anything ending with it), repeat
+        # New or rescheduled bookings are picked up at the next refresh
+        while heap and not stop_event.is_set():
+            next_end = heap[0][0]
+            if next_end >= refresh_at:
+                break
+            wait = (next_end - datetime.now()).total_seconds()
+            if wait > 0 and stop_event.wait(wait):
+                return
+            now = datetime.now()
+            due = []
+            while heap and heap[0][0] <= now:
+                due.append(heapq.heappop(heap)[1])
+            for start in range(0, len(due), LIFECYCLE_BATCH_SIZE):
+                batch = due[start:start + LIFECYCLE_BATCH_SIZE]
+                completed = complete_due_bookings(cursor, now, booking_ids=batch, limit=len(batch))
+                conn.commit()
+                if completed:
+                    print(f"[INFO] Lifecycle: completed {completed} booking(s)")
+
+        wait = (refresh_at - datetime.now()).total_seconds()
+        if wait > 0 and stop_event.wait(wait):
+            return
+
+
+def run():
+    """Competes for the leader lock and runs as leader while holding it, until stop_event is set."""
+    while not stop_event.is_set():
+        conn = None
+        try:
+            # Dedicated connection outside the pool - closing it always releases the session-level
+            # lock, even if an error left it unable to run pg_advisory_unlock
+            conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
+            cursor = conn.cursor()
+            # Leader election - session-level lock, released automatically if this process dies
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (LIFECYCLE_LOCK_ID,))
+            is_leader = cursor.fetchone()[0]
+            conn.commit()
+            if is_leader:
+                print("[INFO] Lifecycle: acquired leader lock")
+                try:
+                    run_as_leader(conn)
+                finally:
+                    # A database error leaves the transaction aborted - roll back before unlocking
+                    conn.rollback()
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (LIFECYCLE_LOCK_ID,))
+                    conn.commit()
+            else:
+                conn.close()
+                conn = None
+                stop_event.wait(LIFECYCLE_STANDBY_SECONDS)
+        except psycopg2.Error as e:
+            print(f"[WARNING] Lifecycle worker database error: {e}")
+            stop_event.wait(5)
+        finally:
+            if conn:
+                conn.close()
+
+
+def start_in_background():
+    # Used by app.py (LIFECYCLE_IN_WEB) - runs the worker loop on a daemon thread
+    thread = threading.Thread(target=run, name='lifecycle', daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    print("[INFO] Booking lifecycle worker started")
+    run()
+    print("[INFO] Booking lifecycle worker stopped")
+
+
+if __name__ == '__main__':
+    main()
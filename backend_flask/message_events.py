@@ -0,0 +1,168 @@
+# Message event hub for Server-Sent Events
+# send_message and mark_message_read run pg_notify('message_events', ...) in their transaction, so
+# PostgreSQL delivers the notification once the change has committed. Each web worker process
+# keeps one LISTEN connection on a background thread and fans notifications out to the SSE
+# streams that process is serving, so a new message reaches the other party without polling.
+# references
+# https://www.postgresql.org/docs/current/sql-notify.html
+# https://www.psycopg.org/docs/advanced.html#asynchronous-notifications
+# https://html.spec.whatwg.org/multipage/server-sent-events.html
+
+import json
+import os
+import queue
+import select
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+MESSAGE_EVENTS_CHANNEL = 'message_events'
+
+
+def notify_message_event(cursor, event_type, booking, message_id):
+    """
+    Queues a message event for delivery when the current transaction commits.
+    booking needs booking_id, learner_id and tutor_id.
+    """
+    payload = json.dumps({
+        "type": event_type,
+        "booking_id": booking["booking_id"],
+        "learner_id": booking["learner_id"],
+        "tutor_id": booking["tutor_id"],
+        "message_id": message_id
+    })
+    cursor.execute("SELECT pg_notify(%s, %s)", (MESSAGE_EVENTS_CHANNEL, payload))
+
+
+class Subscription:
+    """One SSE stream - receives the events for a learner or tutor, optionally for a single booking."""
+
+    def __init__(self, user_role, user_id, booking_id=None):
+        self.user_role = user_role
+        self.user_id = user_id
+        self.booking_id = booking_id
+        self.events = queue.Queue(maxsize=100)
+
+    def wants(self, event):
+        if self.booking_id is not None and event.get("booking_id") != self.booking_id:
+            return False
+        if self.user_role == 'learner':
+            return event.get("learner_id") == self.user_id
+        return event.get("tutor_id") == self.user_id
+
+    def put(self, event):
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            # Stream isn't keeping up - the client resyncs with its since cursor anyway
+            pass
+
+
+class MessageEventHub:
+    """
+    Per-process LISTEN connection plus the subscriptions it feeds.
+    The listener thread starts with the first subscriber.
+    """
+
+    def __init__(self, dsn):
+        self.dsn = dsn
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._thread = None
+        self._delivered = 0
+        self._reconnects = 0
+        self._rejected = 0
+
+    def subscribe(self, user_role, user_id, booking_id=None, limit=None):
+        """
+        Registers a stream. Returns None when `limit` streams are already open in this process -
+        each stream holds a worker thread, so the rest must stay free for ordinary requests.
+        """
+        subscription = Subscription(user_role, user_id, booking_id)
+        with self._lock:
+            if limit is not None and len(self._subscriptions) >= limit:
+                self._rejected += 1
+                return None
+            self._subscriptions.add(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._listen, name='message-events', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscriptions),
+                "delivered": self._delivered,
+                "listener_reconnects": self._reconnects,
+                "rejected": self._rejected,
+                "listening": self._thread is not None and self._thread.is_alive()
+            }
+
+    def _dispatch(self, event):
+        with self._lock:
+            targets = [s for s in self._subscriptions if event.get("type") == "resync" or s.wants(event)]
+            self._delivered += len(targets)
+        for subscription in targets:
+            subscription.put(event)
+
+    def _listen(self):
+        first = True
+        while True:
+            with self._lock:
+                if not self._subscriptions:
+                    # Nobody left to deliver to - stop until the next subscriber
+                    self._thread = None
+                    return
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                conn.cursor().execute(f"LISTEN {MESSAGE_EVENTS_CHANNEL}")
+                if not first:
+                    # Notifications sent while reconnecting were lost - tell every stream to resync
+                    with self._lock:
+                        self._reconnects += 1
+                    self._dispatch({"type": "resync"})
+                first = False
+                while True:
+                    if select.select([conn], [], [], 30) != ([], [], []):
+                        conn.poll()
+                        while conn.notifies:
+                            notify = conn.notifies.pop(0)
+                            try:
+                                self._dispatch(json.loads(notify.payload))
+                            except ValueError:
+                                print(f"[WARNING] Ignoring malformed message event: {notify.payload}")
+                    with self._lock:
+                        if not self._subscriptions:
+                            break
+            except psycopg2.Error as e:
+                print(f"[WARNING] Message event listener error: {e}")
+                time.sleep(2)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_message_hub():
+    # One hub per process - gunicorn forks workers, so a hub inherited from the parent is replaced
+    global _hub
+    with _hub_lock:
+        if _hub is None or _hub.pid != os.getpid():
+            _hub = MessageEventHub(os.environ.get('DATABASE_URL'))
+        return _hub
@@ -0,0 +1,55 @@
+# Incremental message sync
+# The polling endpoints accept ?since=<cursor>. The cursor is a transaction horizon: every
+# transaction with a lower id had finished when the previous poll ran, so everything it wrote was
+# already returned. Each message row records the transaction that inserted it or last set its
+# read_at (messages.change_xid, migration 18), so "what changed" is one range scan on
+# (booking_id, change_xid). A send that commits long after its message_id was taken is still
+# returned, because its transaction was running - and above the horizon - when the cursor was made.
+# Rows can come back more than once; clients merge by message_id, so repeats are harmless.
+# Pure helpers - no Flask - so app.py passes its cursor in.
+# references
+# https://www.postgresql.org/docs/current/functions-info.html#FUNCTIONS-PG-SNAPSHOT
+
+
+def parse_message_cursor(value):
+    """
+    Returns the transaction horizon in a cursor. '0' means from the start.
+    Cursors from before change_xid ("<message_id>.<read marker>") also start again from the
+    beginning. Raises ValueError for anything else.
+    """
+    if value == '0' or '.' in value:
+        return 0
+    horizon = int(value)
+    if horizon < 0:
+        raise ValueError("Cursor must not be negative")
+    return horizon
+
+
+def fetch_message_changes(cursor, booking_ids, horizon):
+    """
+    Returns (rows, next_cursor): messages for the bookings written or read by a transaction at or
+    above `horizon`, ordered by booking then message_id.
+    """
+    # The next horizon is taken before the query, so a transaction that commits in between is
+    # either seen now or still at/above the horizon next time
+    cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint AS horizon")
+    next_horizon = cursor.fetchone()["horizon"]
+    cursor.execute("""
+        SELECT booking_id, message_id, sender_id, sender_role, message_text, read_at, created_at
+        FROM messages
+        WHERE booking_id = ANY(%s) AND change_xid >= %s
+        ORDER BY booking_id, message_id
+    """, (booking_ids, horizon))
+    return cursor.fetchall(), str(next_horizon)
+
+
+def format_message(msg):
+    return {
+        "message_id": msg["message_id"],
+        "booking_id": msg["booking_id"],
+        "sender_id": msg["sender_id"],
+        "sender_role": msg["sender_role"],
+        "message_text": msg["message_text"],
+        "read_at": msg["read_at"],
+        "created_at": msg["created_at"]
+    }
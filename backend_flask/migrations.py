@@ -0,0 +1,933 @@
+# Database schema migrations
+# Each migration has a version number and runs exactly once, in order.
+# Applied versions are recorded in the schema_migrations table.
+# Run once per deploy (see Procfile "release" process):
+#   python migrations.py
+# references
+# https://www.postgresql.org/docs/current/indexes.html - index types, partial and expression indexes
+# https://www.postgresql.org/docs/current/explicit-locking.html#ADVISORY-LOCKS
+
+from datetime import datetime
+
+from db import get_connection
+
+# Arbitrary constant so only one migration runner works at a time
+MIGRATION_LOCK_ID = 741852001
+
+
+def check_booking_overlaps(cursor, statuses=('pending', 'confirmed')):
+    # Migrations 11 and 19 - the exclusion constraint can't be added while overlapping active bookings exist.
+    # List them so an admin can cancel/reschedule the duplicates, rather than failing with a bare constraint error
+    cursor.execute("""
+        SELECT a.booking_id, b.booking_id, a.tutor_id, a.session_date, a.session_time, b.session_time
+        FROM bookings a
+        JOIN bookings b ON b.tutor_id = a.tutor_id AND b.booking_id > a.booking_id
+        WHERE a.status = ANY(%s) AND b.status = ANY(%s)
+          AND tsrange(a.session_date + a.session_time, a.session_date + a.session_time + a.duration * INTERVAL '1 minute')
+           && tsrange(b.session_date + b.session_time, b.session_date + b.session_time + b.duration * INTERVAL '1 minute')
+        ORDER BY a.tutor_id, a.session_date, a.session_time
+    """, (list(statuses), list(statuses)))
+    overlaps = cursor.fetchall()
+    if overlaps:
+        lines = "\n".join(
+            f"  tutor {tutor_id}: bookings {first} and {second} on {day} ({first_time} / {second_time})"
+            for first, second, tutor_id, day, first_time, second_time in overlaps
+        )
+        raise RuntimeError(
+            f"Cannot add the double-booking constraint: {len(overlaps)} pair(s) of active bookings overlap.\n"
+            f"{lines}\nCancel or reschedule one booking of each pair, then run migrations again."
+        )
+
+
+def check_rescheduled_overlaps(cursor):
+    # Migration 19 - rescheduled bookings join the constraint, so they must not overlap either
+    check_booking_overlaps(cursor, ('pending', 'confirmed', 'rescheduled'))
+
+
+###################
+# MIGRATIONS
+# (version, description, steps) - a step is an SQL string or a function taking a cursor
+# Steps must be safe to re-run (IF NOT EXISTS etc.) in case a deploy is interrupted
+###################
+
+MIGRATIONS = [
+    (1, "Create base tables", [
+        """
+        CREATE TABLE IF NOT EXISTS students (
+            id SERIAL PRIMARY KEY,
+            first_name TEXT,
+            last_name TEXT,
+            college_email TEXT,
+            modules TEXT DEFAULT '',
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tutors (
+            tutor_id SERIAL PRIMARY KEY,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            college_email TEXT UNIQUE NOT NULL,
+            modules TEXT NOT NULL,
+            hourly_rate REAL NOT NULL,
+            rating REAL DEFAULT 0,
+            bio TEXT,
+            profile_pic TEXT,
+            verified INTEGER DEFAULT 0,
+            proof_doc BYTEA,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS bookings (
+            booking_id SERIAL PRIMARY KEY,
+            learner_id INTEGER NOT NULL,
+            tutor_id INTEGER NOT NULL,
+            session_date DATE NOT NULL,
+            session_time TIME NOT NULL,
+            duration INTEGER NOT NULL DEFAULT 60,
+            status TEXT NOT NULL DEFAULT 'pending',
+            module TEXT,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP,
+            FOREIGN KEY (learner_id) REFERENCES students(id),
+            FOREIGN KEY (tutor_id) REFERENCES tutors(tutor_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS reviews (
+            review_id SERIAL PRIMARY KEY,
+            booking_id INTEGER NOT NULL,
+            learner_id INTEGER NOT NULL,
+            tutor_id INTEGER NOT NULL,
+            rating INTEGER NOT NULL CHECK (rating >= 1 AND rating <= 5),
+            comment TEXT,
+            created_at TIMESTAMP,
+            FOREIGN KEY (booking_id) REFERENCES bookings(booking_id),
+            FOREIGN KEY (learner_id) REFERENCES students(id),
+            FOREIGN KEY (tutor_id) REFERENCES tutors(tutor_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id SERIAL PRIMARY KEY,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL DEFAULT 'learner',
+            student_id INTEGER,
+            tutor_id INTEGER,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP,
+            FOREIGN KEY (student_id) REFERENCES students(id),
+            FOREIGN KEY (tutor_id) REFERENCES tutors(tutor_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tutor_availability (
+            availability_id SERIAL PRIMARY KEY,
+            tutor_id INTEGER NOT NULL,
+            day_of_week INTEGER NOT NULL CHECK (day_of_week >= 0 AND day_of_week <= 6),
+            start_time TIME NOT NULL,
+            end_time TIME NOT NULL,
+            is_available INTEGER DEFAULT 1,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP,
+            FOREIGN KEY (tutor_id) REFERENCES tutors(tutor_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS messages (
+            message_id SERIAL PRIMARY KEY,
+            booking_id INTEGER NOT NULL,
+            sender_id INTEGER NOT NULL,
+            sender_role TEXT NOT NULL,
+            message_text TEXT NOT NULL,
+            read_at TIMESTAMP,
+            created_at TIMESTAMP,
+            FOREIGN KEY (booking_id) REFERENCES bookings(booking_id)
+        );
+        """,
+    ]),
+
+    # Indexes matched to the WHERE / ORDER BY clauses the routes actually use
+    (2, "Indexes for booking, message, review, tutor and login lookups", [
+        # get_tutor_bookings / tutor earnings: WHERE tutor_id = %s ORDER BY session_date DESC, session_time DESC
+        # also serves WHERE tutor_id = %s AND session_date = %s
+        "CREATE INDEX IF NOT EXISTS idx_bookings_tutor_session ON bookings (tutor_id, session_date DESC, session_time DESC)",
+        # create_booking / available-slots conflict checks only look at active bookings
+        """CREATE INDEX IF NOT EXISTS idx_bookings_tutor_active ON bookings (tutor_id, session_date, session_time)
+           WHERE status IN ('pending', 'confirmed')""",
+        # get_learner_bookings / learner earnings: WHERE learner_id = %s ORDER BY session_date DESC, session_time DESC
+        "CREATE INDEX IF NOT EXISTS idx_bookings_learner_session ON bookings (learner_id, session_date DESC, session_time DESC)",
+        # admin bookings list, recent activity and 7/30 day trends: ORDER BY / WHERE created_at
+        "CREATE INDEX IF NOT EXISTS idx_bookings_created_at ON bookings (created_at DESC)",
+        # booking messages: WHERE booking_id = %s ORDER BY created_at
+        "CREATE INDEX IF NOT EXISTS idx_messages_booking_created ON messages (booking_id, created_at)",
+        # tutor profile reviews: WHERE tutor_id = %s ORDER BY created_at DESC
+        "CREATE INDEX IF NOT EXISTS idx_reviews_tutor_created ON reviews (tutor_id, created_at DESC)",
+        # review lookups by booking (create_review duplicate check, get_review_for_booking)
+        "CREATE INDEX IF NOT EXISTS idx_reviews_booking ON reviews (booking_id)",
+        # login / admin password change: WHERE LOWER(email) = LOWER(%s)
+        "CREATE INDEX IF NOT EXISTS idx_users_email_lower ON users (LOWER(email))",
+        # tutor linking on login: WHERE LOWER(college_email) = LOWER(%s)
+        "CREATE INDEX IF NOT EXISTS idx_tutors_email_lower ON tutors (LOWER(college_email))",
+        # learner search default order: WHERE verified = 1 ORDER BY rating DESC, hourly_rate ASC
+        "CREATE INDEX IF NOT EXISTS idx_tutors_verified_rating ON tutors (rating DESC, hourly_rate) WHERE verified = 1",
+        # admin approval queue: WHERE verified = 0
+        "CREATE INDEX IF NOT EXISTS idx_tutors_unverified ON tutors (tutor_id) WHERE verified = 0",
+        # availability: WHERE tutor_id = %s AND day_of_week = %s
+        "CREATE INDEX IF NOT EXISTS idx_availability_tutor_day ON tutor_availability (tutor_id, day_of_week)",
+    ]),
+
+    # Session end time of active bookings - lets auto-completion find due bookings without a full scan
+    (3, "Index on active booking end time", [
+        """CREATE INDEX IF NOT EXISTS idx_bookings_active_end
+           ON bookings ((session_date + session_time + duration * INTERVAL '1 minute'))
+           WHERE status IN ('pending', 'confirmed')""",
+    ]),
+
+    # Keyset pagination for the admin lists: ORDER BY (COALESCE(created_at, epoch), id) DESC
+    (4, "Keyset pagination indexes for admin lists", [
+        """CREATE INDEX IF NOT EXISTS idx_bookings_keyset
+           ON bookings ((COALESCE(created_at, TIMESTAMP '1970-01-01')) DESC, booking_id DESC)""",
+        """CREATE INDEX IF NOT EXISTS idx_bookings_status_keyset
+           ON bookings (status, (COALESCE(created_at, TIMESTAMP '1970-01-01')) DESC, booking_id DESC)""",
+        """CREATE INDEX IF NOT EXISTS idx_bookings_tutor_keyset
+           ON bookings (tutor_id, (COALESCE(created_at, TIMESTAMP '1970-01-01')) DESC, booking_id DESC)""",
+        """CREATE INDEX IF NOT EXISTS idx_users_keyset
+           ON users ((COALESCE(created_at, TIMESTAMP '1970-01-01')) DESC, user_id DESC)""",
+        """CREATE INDEX IF NOT EXISTS idx_reviews_keyset
+           ON reviews ((COALESCE(created_at, TIMESTAMP '1970-01-01')) DESC, review_id DESC)""",
+    ]),
+
+    # Counters for the admin platform report, kept current by triggers on every write path
+    # (routes, lifecycle worker, manual SQL) in the same transaction as the change itself.
+    # Keys: bookings.total, bookings.status.<status>, bookings.duration_sum, reviews.total,
+    # reviews.rating_sum, reviews.rating.<n>, tutors.total, tutors.verified.<0|1>,
+    # users.role.<role>, students.total
+    (5, "Maintained platform statistics", [
+        """
+        CREATE TABLE IF NOT EXISTS platform_stats (
+            stat_key TEXT PRIMARY KEY,
+            value NUMERIC NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP
+        )
+        """,
+        """
+        CREATE OR REPLACE FUNCTION bump_platform_stat(key TEXT, delta NUMERIC) RETURNS VOID AS $$
+        BEGIN
+            IF delta = 0 THEN
+                RETURN;
+            END IF;
+            INSERT INTO platform_stats (stat_key, value, updated_at) VALUES (key, delta, NOW())
+            ON CONFLICT (stat_key) DO UPDATE
+                SET value = platform_stats.value + EXCLUDED.value, updated_at = NOW();
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION bookings_platform_stats() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM bump_platform_stat('bookings.total', 1);
+                PERFORM bump_platform_stat('bookings.status.' || NEW.status, 1);
+                PERFORM bump_platform_stat('bookings.duration_sum', COALESCE(NEW.duration, 0));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM bump_platform_stat('bookings.total', -1);
+                PERFORM bump_platform_stat('bookings.status.' || OLD.status, -1);
+                PERFORM bump_platform_stat('bookings.duration_sum', -COALESCE(OLD.duration, 0));
+            ELSE
+                IF NEW.status IS DISTINCT FROM OLD.status THEN
+                    PERFORM bump_platform_stat('bookings.status.' || OLD.status, -1);
+                    PERFORM bump_platform_stat('bookings.status.' || NEW.status, 1);
+                END IF;
+                PERFORM bump_platform_stat('bookings.duration_sum', COALESCE(NEW.duration, 0) - COALESCE(OLD.duration, 0));
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION reviews_platform_stats() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM bump_platform_stat('reviews.rating.' || OLD.rating, -1);
+                PERFORM bump_platform_stat('reviews.rating_sum', -OLD.rating);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM bump_platform_stat('reviews.rating.' || NEW.rating, 1);
+                PERFORM bump_platform_stat('reviews.rating_sum', NEW.rating);
+            END IF;
+            IF TG_OP = 'INSERT' THEN
+                PERFORM bump_platform_stat('reviews.total', 1);
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM bump_platform_stat('reviews.total', -1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION tutors_platform_stats() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM bump_platform_stat('tutors.total', 1);
+                PERFORM bump_platform_stat('tutors.verified.' || COALESCE(NEW.verified, 0), 1);
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM bump_platform_stat('tutors.total', -1);
+                PERFORM bump_platform_stat('tutors.verified.' || COALESCE(OLD.verified, 0), -1);
+            ELSIF COALESCE(NEW.verified, 0) <> COALESCE(OLD.verified, 0) THEN
+                PERFORM bump_platform_stat('tutors.verified.' || COALESCE(OLD.verified, 0), -1);
+                PERFORM bump_platform_stat('tutors.verified.' || COALESCE(NEW.verified, 0), 1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION users_platform_stats() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM bump_platform_stat('users.role.' || OLD.role, -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM bump_platform_stat('users.role.' || NEW.role, 1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION students_platform_stats() RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM bump_platform_stat('students.total', CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS trg_bookings_platform_stats ON bookings",
+        """CREATE TRIGGER trg_bookings_platform_stats
+           AFTER INSERT OR DELETE OR UPDATE OF status, duration ON bookings
+           FOR EACH ROW EXECUTE FUNCTION bookings_platform_stats()""",
+        "DROP TRIGGER IF EXISTS trg_reviews_platform_stats ON reviews",
+        """CREATE TRIGGER trg_reviews_platform_stats
+           AFTER INSERT OR DELETE OR UPDATE OF rating ON reviews
+           FOR EACH ROW EXECUTE FUNCTION reviews_platform_stats()""",
+        "DROP TRIGGER IF EXISTS trg_tutors_platform_stats ON tutors",
+        """CREATE TRIGGER trg_tutors_platform_stats
+           AFTER INSERT OR DELETE OR UPDATE OF verified ON tutors
+           FOR EACH ROW EXECUTE FUNCTION tutors_platform_stats()""",
+        "DROP TRIGGER IF EXISTS trg_users_platform_stats ON users",
+        """CREATE TRIGGER trg_users_platform_stats
+           AFTER INSERT OR DELETE OR UPDATE OF role ON users
+           FOR EACH ROW EXECUTE FUNCTION users_platform_stats()""",
+        "DROP TRIGGER IF EXISTS trg_students_platform_stats ON students",
+        """CREATE TRIGGER trg_students_platform_stats
+           AFTER INSERT OR DELETE ON students
+           FOR EACH ROW EXECUTE FUNCTION students_platform_stats()""",
+        # Rebuilds every counter from the base tables - used for the backfill below and
+        # can be run by hand (SELECT refresh_platform_stats()) if the counters are ever in doubt
+        """
+        CREATE OR REPLACE FUNCTION refresh_platform_stats() RETURNS VOID AS $$
+        BEGIN
+            LOCK TABLE bookings, reviews, tutors, users, students IN SHARE MODE;
+            DELETE FROM platform_stats
+            WHERE stat_key LIKE 'bookings.%' OR stat_key LIKE 'reviews.%' OR stat_key LIKE 'tutors.%'
+               OR stat_key LIKE 'users.%' OR stat_key LIKE 'students.%';
+            INSERT INTO platform_stats (stat_key, value, updated_at)
+                      SELECT 'bookings.total', COUNT(*), NOW() FROM bookings
+            UNION ALL SELECT 'bookings.status.' || status, COUNT(*), NOW() FROM bookings GROUP BY status
+            UNION ALL SELECT 'bookings.duration_sum', COALESCE(SUM(duration), 0), NOW() FROM bookings
+            UNION ALL SELECT 'reviews.total', COUNT(*), NOW() FROM reviews
+            UNION ALL SELECT 'reviews.rating_sum', COALESCE(SUM(rating), 0), NOW() FROM reviews
+            UNION ALL SELECT 'reviews.rating.' || rating, COUNT(*), NOW() FROM reviews GROUP BY rating
+            UNION ALL SELECT 'tutors.total', COUNT(*), NOW() FROM tutors
+            UNION ALL SELECT 'tutors.verified.' || COALESCE(verified, 0), COUNT(*), NOW() FROM tutors GROUP BY COALESCE(verified, 0)
+            UNION ALL SELECT 'users.role.' || role, COUNT(*), NOW() FROM users GROUP BY role
+            UNION ALL SELECT 'students.total', COUNT(*), NOW() FROM students;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "SELECT refresh_platform_stats()",
+    ]),
+
+    # One row per tutor per module code, so module search is an index lookup instead of
+    # ILIKE '%code%' over tutors.modules (which also matched inside other codes).
+    # tutors.modules stays as the display copy; app.py keeps both in sync on create/update.
+    # COLLATE "C" lets the primary key index serve prefix searches (LIKE 'IS33%') as well.
+    (6, "Normalized tutor modules", [
+        """
+        CREATE TABLE IF NOT EXISTS tutor_modules (
+            module_code TEXT COLLATE "C" NOT NULL,
+            tutor_id INTEGER NOT NULL REFERENCES tutors(tutor_id) ON DELETE CASCADE,
+            PRIMARY KEY (module_code, tutor_id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_tutor_modules_tutor ON tutor_modules (tutor_id)",
+        # Backfill from the comma-separated column - codes were validated as 2 letters + 4 digits on the way in
+        """
+        INSERT INTO tutor_modules (module_code, tutor_id)
+        SELECT DISTINCT UPPER(TRIM(code)), t.tutor_id
+        FROM tutors t, unnest(string_to_array(t.modules, ',')) AS code
+        WHERE TRIM(code) ~ '^[A-Za-z]{2}[0-9]{4}$'
+        ON CONFLICT DO NOTHING
+        """,
+    ]),
+
+    # Full-text search over tutor name, modules and bio (GET /api/tutors?q=...)
+    # Generated column, so Postgres keeps it current on every insert/update of those fields.
+    # Names and module codes weigh more (A) than bio text (B) in ts_rank.
+    (7, "Tutor full-text search", [
+        """
+        ALTER TABLE tutors ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', COALESCE(first_name, '') || ' ' || COALESCE(last_name, '')), 'A') ||
+            setweight(to_tsvector('english', replace(COALESCE(modules, ''), ',', ' ')), 'A') ||
+            setweight(to_tsvector('english', COALESCE(bio, '')), 'B')
+        ) STORED
+        """,
+        # Only verified tutors are ever searched
+        "CREATE INDEX IF NOT EXISTS idx_tutors_search ON tutors USING GIN (search_vector) WHERE verified = 1",
+    ]),
+
+    # Proof documents (up to 10MB each) move out of the tutors row into their own table, so tutor
+    # list/profile queries no longer carry the BYTEA. The tutor row keeps cheap metadata instead.
+    (8, "Separate tutor proof documents", [
+        """
+        CREATE TABLE IF NOT EXISTS tutor_proof_docs (
+            tutor_id INTEGER PRIMARY KEY REFERENCES tutors(tutor_id) ON DELETE CASCADE,
+            content BYTEA NOT NULL,
+            content_type TEXT,
+            size_bytes INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            created_at TIMESTAMP
+        )
+        """,
+        "ALTER TABLE tutors ADD COLUMN IF NOT EXISTS has_proof_doc INTEGER DEFAULT 0",
+        "ALTER TABLE tutors ADD COLUMN IF NOT EXISTS proof_doc_size INTEGER",
+        "ALTER TABLE tutors ADD COLUMN IF NOT EXISTS proof_doc_sha256 TEXT",
+        # content_type is left NULL for existing documents - the serve route sniffs it from the file signature
+        """
+        INSERT INTO tutor_proof_docs (tutor_id, content, size_bytes, sha256, created_at)
+        SELECT tutor_id, proof_doc, length(proof_doc), encode(sha256(proof_doc), 'hex'), COALESCE(created_at, NOW())
+        FROM tutors
+        WHERE proof_doc IS NOT NULL AND length(proof_doc) > 0
+        ON CONFLICT (tutor_id) DO NOTHING
+        """,
+        """
+        UPDATE tutors t
+        SET has_proof_doc = 1, proof_doc_size = d.size_bytes, proof_doc_sha256 = d.sha256
+        FROM tutor_proof_docs d
+        WHERE d.tutor_id = t.tutor_id
+        """,
+        "ALTER TABLE tutors DROP COLUMN IF EXISTS proof_doc",
+    ]),
+
+    # Proof document files move to the on-disk store (blob_store.py), addressed by sha256.
+    # content is only kept for documents uploaded before this; they move to disk when first served.
+    (9, "Proof documents in blob store", [
+        "ALTER TABLE tutor_proof_docs ALTER COLUMN content DROP NOT NULL",
+    ]),
+
+    # Several availability windows per day - one row per (tutor, day, start time)
+    # so the weekly schedule can be saved with one multi-row upsert
+    (10, "Multiple availability windows per day", [
+        # Older rows were one per day; drop any accidental duplicates before adding the key
+        """
+        DELETE FROM tutor_availability a
+        USING tutor_availability newer
+        WHERE a.tutor_id = newer.tutor_id AND a.day_of_week = newer.day_of_week
+          AND a.start_time = newer.start_time AND a.availability_id < newer.availability_id
+        """,
+        """CREATE UNIQUE INDEX IF NOT EXISTS uq_availability_tutor_day_start
+           ON tutor_availability (tutor_id, day_of_week, start_time)""",
+        # Superseded by the unique index (same leading columns)
+        "DROP INDEX IF EXISTS idx_availability_tutor_day",
+    ]),
+
+    # Double-booking prevention in the database: each booking carries its time range, and an
+    # exclusion constraint rejects a pending/confirmed booking that overlaps another for the same tutor.
+    # The check and the insert are one atomic, index-backed statement, so concurrent requests can't both win.
+    (11, "Booking overlap exclusion constraint", [
+        # btree_gist lets the GiST index compare tutor_id with = alongside the range overlap
+        "CREATE EXTENSION IF NOT EXISTS btree_gist",
+        """
+        ALTER TABLE bookings ADD COLUMN IF NOT EXISTS session_range tsrange
+        GENERATED ALWAYS AS (
+            tsrange(session_date + session_time, session_date + session_time + duration * INTERVAL '1 minute')
+        ) STORED
+        """,
+        check_booking_overlaps,
+        "ALTER TABLE bookings DROP CONSTRAINT IF EXISTS bookings_no_overlap",
+        """
+        ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap
+        EXCLUDE USING gist (tutor_id WITH =, session_range WITH &&)
+        WHERE (status IN ('pending', 'confirmed'))
+        """,
+    ]),
+
+    # Transactional outbox for booking side effects (calendar event, emails, timezone lookup).
+    # Rows are written in the booking's own transaction and delivered by outbox_dispatcher.py;
+    # each integration's latest result is copied onto bookings.integration_status.
+    (12, "Booking integration outbox", [
+        """
+        CREATE TABLE IF NOT EXISTS booking_outbox (
+            outbox_id SERIAL PRIMARY KEY,
+            booking_id INTEGER NOT NULL REFERENCES bookings(booking_id) ON DELETE CASCADE,
+            integration TEXT NOT NULL,
+            payload JSONB NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            locked_until TIMESTAMP,
+            last_error TEXT,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP
+        )
+        """,
+        # Dispatcher queue scan: due pending rows, and processing rows whose lease ran out
+        """CREATE INDEX IF NOT EXISTS idx_outbox_due ON booking_outbox (next_attempt_at)
+           WHERE status = 'pending'""",
+        """CREATE INDEX IF NOT EXISTS idx_outbox_leased ON booking_outbox (locked_until)
+           WHERE status = 'processing'""",
+        "CREATE INDEX IF NOT EXISTS idx_outbox_booking ON booking_outbox (booking_id)",
+        "ALTER TABLE bookings ADD COLUMN IF NOT EXISTS integration_status JSONB NOT NULL DEFAULT '{}'::jsonb",
+    ]),
+
+    # Circuit breaker state published by the outbox dispatcher (circuit_breaker.py), so the
+    # admin metrics endpoint can show breakers living in other processes
+    (13, "Integration circuit breaker snapshots", [
+        """
+        CREATE TABLE IF NOT EXISTS integration_breakers (
+            process TEXT NOT NULL,
+            name TEXT NOT NULL,
+            snapshot JSONB NOT NULL,
+            updated_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (process, name)
+        )
+        """,
+    ]),
+
+    # Incremental message polling: new messages are message_id > cursor, changed read receipts
+    # are read_at > cursor (see fetch_message_changes in app.py)
+    (14, "Message sync cursor indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_messages_booking_id ON messages (booking_id, message_id)",
+        """CREATE INDEX IF NOT EXISTS idx_messages_booking_read ON messages (booking_id, read_at)
+           WHERE read_at IS NOT NULL""",
+    ]),
+
+    # Unread message counters per conversation and recipient, for the nav badge and the
+    # conversation list. Kept current by statement-level triggers on messages (same transaction
+    # as the change), so a bulk mark-read is one counter update per conversation, not per message.
+    # recipient_id is copied from the booking so a user's total is a lookup on one index.
+    (15, "Unread message counters", [
+        """
+        CREATE TABLE IF NOT EXISTS message_unread (
+            booking_id INTEGER NOT NULL REFERENCES bookings(booking_id) ON DELETE CASCADE,
+            recipient_role TEXT NOT NULL,
+            recipient_id INTEGER NOT NULL,
+            unread_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (booking_id, recipient_role)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_message_unread_recipient ON message_unread (recipient_role, recipient_id)",
+        """
+        CREATE OR REPLACE FUNCTION messages_unread_counts() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO message_unread (booking_id, recipient_role, recipient_id, unread_count)
+                SELECT n.booking_id,
+                       CASE WHEN n.sender_role = 'learner' THEN 'tutor' ELSE 'learner' END,
+                       CASE WHEN n.sender_role = 'learner' THEN b.tutor_id ELSE b.learner_id END,
+                       COUNT(*)
+                FROM new_rows n
+                JOIN bookings b ON b.booking_id = n.booking_id
+                WHERE n.read_at IS NULL
+                GROUP BY 1, 2, 3
+                ON CONFLICT (booking_id, recipient_role) DO UPDATE
+                    SET unread_count = message_unread.unread_count + EXCLUDED.unread_count;
+            ELSIF TG_OP = 'UPDATE' THEN
+                UPDATE message_unread u
+                SET unread_count = u.unread_count + d.delta
+                FROM (
+                    SELECT n.booking_id,
+                           CASE WHEN n.sender_role = 'learner' THEN 'tutor' ELSE 'learner' END AS recipient_role,
+                           SUM(CASE WHEN o.read_at IS NULL AND n.read_at IS NOT NULL THEN -1
+                                    WHEN o.read_at IS NOT NULL AND n.read_at IS NULL THEN 1
+                                    ELSE 0 END) AS delta
+                    FROM old_rows o
+                    JOIN new_rows n ON n.message_id = o.message_id
+                    GROUP BY 1, 2
+                ) d
+                WHERE u.booking_id = d.booking_id AND u.recipient_role = d.recipient_role AND d.delta <> 0;
+            ELSE
+                -- UPDATE rather than upsert: when a booking is deleted its counters cascade away first
+                UPDATE message_unread u
+                SET unread_count = u.unread_count - d.removed
+                FROM (
+                    SELECT booking_id,
+                           CASE WHEN sender_role = 'learner' THEN 'tutor' ELSE 'learner' END AS recipient_role,
+                           COUNT(*) AS removed
+                    FROM old_rows
+                    WHERE read_at IS NULL
+                    GROUP BY 1, 2
+                ) d
+                WHERE u.booking_id = d.booking_id AND u.recipient_role = d.recipient_role;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        # Transition tables can't be shared by a multi-event trigger, hence three triggers
+        "DROP TRIGGER IF EXISTS trg_messages_unread_insert ON messages",
+        """CREATE TRIGGER trg_messages_unread_insert
+           AFTER INSERT ON messages REFERENCING NEW TABLE AS new_rows
+           FOR EACH STATEMENT EXECUTE FUNCTION messages_unread_counts()""",
+        "DROP TRIGGER IF EXISTS trg_messages_unread_update ON messages",
+        """CREATE TRIGGER trg_messages_unread_update
+           AFTER UPDATE ON messages REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+           FOR EACH STATEMENT EXECUTE FUNCTION messages_unread_counts()""",
+        "DROP TRIGGER IF EXISTS trg_messages_unread_delete ON messages",
+        """CREATE TRIGGER trg_messages_unread_delete
+           AFTER DELETE ON messages REFERENCING OLD TABLE AS old_rows
+           FOR EACH STATEMENT EXECUTE FUNCTION messages_unread_counts()""",
+        # Rebuilds the counters from messages - backfill below, or by hand (SELECT refresh_message_unread())
+        """
+        CREATE OR REPLACE FUNCTION refresh_message_unread() RETURNS VOID AS $$
+        BEGIN
+            LOCK TABLE messages IN SHARE MODE;
+            DELETE FROM message_unread;
+            INSERT INTO message_unread (booking_id, recipient_role, recipient_id, unread_count)
+            SELECT m.booking_id,
+                   CASE WHEN m.sender_role = 'learner' THEN 'tutor' ELSE 'learner' END,
+                   CASE WHEN m.sender_role = 'learner' THEN b.tutor_id ELSE b.learner_id END,
+                   COUNT(*)
+            FROM messages m
+            JOIN bookings b ON b.booking_id = m.booking_id
+            WHERE m.read_at IS NULL
+            GROUP BY 1, 2, 3;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "SELECT refresh_message_unread()",
+    ]),
+
+    # Uploaded proof documents waiting for the signup that claims them. The upload route hands out
+    # an unguessable token instead of the file's SHA-256, so a signup can only attach its own upload.
+    # content holds the file while the blob store is not durable (see blob_store.py); unclaimed rows
+    # expire and their files are removed.
+    (16, "Proof document upload tokens", [
+        """
+        CREATE TABLE IF NOT EXISTS proof_doc_uploads (
+            token TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            content BYTEA,
+            content_type TEXT,
+            size_bytes INTEGER NOT NULL,
+            created_at TIMESTAMP NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_proof_doc_uploads_created ON proof_doc_uploads (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_proof_doc_uploads_sha256 ON proof_doc_uploads (sha256)",
+        "CREATE INDEX IF NOT EXISTS idx_tutor_proof_docs_sha256 ON tutor_proof_docs (sha256)",
+    ]),
+
+    # The admin report cache's generation is bumped by triggers on every table the report reads,
+    # so no writer (route, worker or manual SQL) can leave a stale cached report behind.
+    # The counter is split into 8 rows picked by backend pid: concurrent transactions rarely
+    # wait on each other's row lock, and the generation is the sum of all of them (it grows on
+    # every committed write, and an uncommitted one isn't counted yet).
+    (17, "Report generation triggers", [
+        """
+        CREATE OR REPLACE FUNCTION bump_report_generation() RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM bump_platform_stat('report.generation.' || (pg_backend_pid() % 8), 1);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        # Column lists are the columns the report reads, so e.g. integration_status updates don't invalidate it
+        "DROP TRIGGER IF EXISTS trg_bookings_report_generation ON bookings",
+        """CREATE TRIGGER trg_bookings_report_generation
+           AFTER INSERT OR DELETE OR UPDATE OF status, duration, session_date, module, tutor_id, learner_id, created_at
+           ON bookings FOR EACH ROW EXECUTE FUNCTION bump_report_generation()""",
+        "DROP TRIGGER IF EXISTS trg_tutors_report_generation ON tutors",
+        """CREATE TRIGGER trg_tutors_report_generation
+           AFTER INSERT OR DELETE OR UPDATE OF first_name, last_name, rating, hourly_rate, verified
+           ON tutors FOR EACH ROW EXECUTE FUNCTION bump_report_generation()""",
+        "DROP TRIGGER IF EXISTS trg_reviews_report_generation ON reviews",
+        """CREATE TRIGGER trg_reviews_report_generation
+           AFTER INSERT OR DELETE OR UPDATE OF rating
+           ON reviews FOR EACH ROW EXECUTE FUNCTION bump_report_generation()""",
+        "DROP TRIGGER IF EXISTS trg_users_report_generation ON users",
+        """CREATE TRIGGER trg_users_report_generation
+           AFTER INSERT OR DELETE OR UPDATE OF role
+           ON users FOR EACH ROW EXECUTE FUNCTION bump_report_generation()""",
+        "DROP TRIGGER IF EXISTS trg_students_report_generation ON students",
+        """CREATE TRIGGER trg_students_report_generation
+           AFTER INSERT OR DELETE OR UPDATE OF first_name, last_name
+           ON students FOR EACH ROW EXECUTE FUNCTION bump_report_generation()""",
+    ]),
+
+    # Message sync cursors become transaction horizons (message_sync.py). Each row records the
+    # transaction that inserted it or last set read_at, so a poll returns everything written by
+    # transactions that hadn't finished when the previous cursor was taken - however late they commit.
+    # Existing rows get 0, below every cursor except the first sync's.
+    (18, "Message change transaction ids", [
+        "ALTER TABLE messages ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT 0",
+        """
+        CREATE OR REPLACE FUNCTION messages_change_xid() RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.change_xid := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS trg_messages_change_xid ON messages",
+        """CREATE TRIGGER trg_messages_change_xid
+           BEFORE INSERT OR UPDATE OF read_at ON messages
+           FOR EACH ROW EXECUTE FUNCTION messages_change_xid()""",
+        "CREATE INDEX IF NOT EXISTS idx_messages_booking_change ON messages (booking_id, change_xid)",
+    ]),
+
+    # A rescheduled booking is still an upcoming session - the overlap constraint from migration 11
+    # only covered pending/confirmed, so a slot moved by reschedule_booking could be booked again
+    (19, "Overlap constraint covers rescheduled bookings", [
+        check_rescheduled_overlaps,
+        "ALTER TABLE bookings DROP CONSTRAINT IF EXISTS bookings_no_overlap",
+        """
+        ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap
+        EXCLUDE USING gist (tutor_id WITH =, session_range WITH &&)
+        WHERE (status IN ('pending', 'confirmed', 'rescheduled'))
+        """,
+        # available-slots busy query now matches rescheduled bookings too
+        """CREATE INDEX IF NOT EXISTS idx_bookings_tutor_upcoming ON bookings (tutor_id, session_date, session_time)
+           WHERE status IN ('pending', 'confirmed', 'rescheduled')""",
+        "DROP INDEX IF EXISTS idx_bookings_tutor_active",
+    ]),
+
+    # The rest of the admin report's booking figures become maintained counters too, so a report
+    # build no longer reads the whole bookings table. New platform_stats keys:
+    # bookings.completed_revenue, bookings.module.<code>; plus tutors.completed_bookings per tutor.
+    # Revenue is priced at the tutor's hourly rate when the session completes;
+    # refresh_platform_stats() re-prices everything at current rates.
+    (20, "Revenue, module and per-tutor booking counters", [
+        "ALTER TABLE tutors ADD COLUMN IF NOT EXISTS completed_bookings INTEGER NOT NULL DEFAULT 0",
+        """
+        CREATE OR REPLACE FUNCTION booking_completion_stats(tutor INTEGER, minutes INTEGER, sign INTEGER) RETURNS VOID AS $$
+        BEGIN
+            PERFORM bump_platform_stat('bookings.completed_revenue',
+                (sign * COALESCE(minutes, 0) * COALESCE((SELECT hourly_rate FROM tutors WHERE tutor_id = tutor), 0) / 60.0)::numeric);
+            UPDATE tutors SET completed_bookings = completed_bookings + sign WHERE tutor_id = tutor;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION booking_module_stat(module TEXT, sign INTEGER) RETURNS VOID AS $$
+        BEGIN
+            IF COALESCE(module, '') <> '' THEN
+                PERFORM bump_platform_stat('bookings.module.' || module, sign);
+            END IF;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE OR REPLACE FUNCTION bookings_platform_stats() RETURNS TRIGGER AS $$
+        DECLARE
+            completion_changed BOOLEAN;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM bump_platform_stat('bookings.total', 1);
+                PERFORM bump_platform_stat('bookings.status.' || NEW.status, 1);
+                PERFORM bump_platform_stat('bookings.duration_sum', COALESCE(NEW.duration, 0));
+                PERFORM booking_module_stat(NEW.module, 1);
+                IF NEW.status = 'completed' THEN
+                    PERFORM booking_completion_stats(NEW.tutor_id, NEW.duration, 1);
+                END IF;
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM bump_platform_stat('bookings.total', -1);
+                PERFORM bump_platform_stat('bookings.status.' || OLD.status, -1);
+                PERFORM bump_platform_stat('bookings.duration_sum', -COALESCE(OLD.duration, 0));
+                PERFORM booking_module_stat(OLD.module, -1);
+                IF OLD.status = 'completed' THEN
+                    PERFORM booking_completion_stats(OLD.tutor_id, OLD.duration, -1);
+                END IF;
+            ELSE
+                IF NEW.status IS DISTINCT FROM OLD.status THEN
+                    PERFORM bump_platform_stat('bookings.status.' || OLD.status, -1);
+                    PERFORM bump_platform_stat('bookings.status.' || NEW.status, 1);
+                END IF;
+                PERFORM bump_platform_stat('bookings.duration_sum', COALESCE(NEW.duration, 0) - COALESCE(OLD.duration, 0));
+                IF NEW.module IS DISTINCT FROM OLD.module THEN
+                    PERFORM booking_module_stat(OLD.module, -1);
+                    PERFORM booking_module_stat(NEW.module, 1);
+                END IF;
+                completion_changed := NEW.status IS DISTINCT FROM OLD.status
+                    OR NEW.duration IS DISTINCT FROM OLD.duration
+                    OR NEW.tutor_id IS DISTINCT FROM OLD.tutor_id;
+                IF completion_changed AND OLD.status = 'completed' THEN
+                    PERFORM booking_completion_stats(OLD.tutor_id, OLD.duration, -1);
+                END IF;
+                IF completion_changed AND NEW.status = 'completed' THEN
+                    PERFORM booking_completion_stats(NEW.tutor_id, NEW.duration, 1);
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS trg_bookings_platform_stats ON bookings",
+        """CREATE TRIGGER trg_bookings_platform_stats
+           AFTER INSERT OR DELETE OR UPDATE OF status, duration, module, tutor_id ON bookings
+           FOR EACH ROW EXECUTE FUNCTION bookings_platform_stats()""",
+        """
+        CREATE OR REPLACE FUNCTION refresh_platform_stats() RETURNS VOID AS $$
+        BEGIN
+            LOCK TABLE bookings, reviews, tutors, users, students IN SHARE MODE;
+            DELETE FROM platform_stats
+            WHERE stat_key LIKE 'bookings.%' OR stat_key LIKE 'reviews.%' OR stat_key LIKE 'tutors.%'
+               OR stat_key LIKE 'users.%' OR stat_key LIKE 'students.%';
+            INSERT INTO platform_stats (stat_key, value, updated_at)
+                      SELECT 'bookings.total', COUNT(*), NOW() FROM bookings
+            UNION ALL SELECT 'bookings.status.' || status, COUNT(*), NOW() FROM bookings GROUP BY status
+            UNION ALL SELECT 'bookings.duration_sum', COALESCE(SUM(duration), 0), NOW() FROM bookings
+            UNION ALL SELECT 'bookings.completed_revenue',
+                             COALESCE(SUM((COALESCE(b.duration, 0) * COALESCE(t.hourly_rate, 0) / 60.0)::numeric), 0), NOW()
+                      FROM bookings b LEFT JOIN tutors t ON t.tutor_id = b.tutor_id WHERE b.status = 'completed'
+            UNION ALL SELECT 'bookings.module.' || module, COUNT(*), NOW() FROM bookings
+                      WHERE COALESCE(module, '') <> '' GROUP BY module
+            UNION ALL SELECT 'reviews.total', COUNT(*), NOW() FROM reviews
+            UNION ALL SELECT 'reviews.rating_sum', COALESCE(SUM(rating), 0), NOW() FROM reviews
+            UNION ALL SELECT 'reviews.rating.' || rating, COUNT(*), NOW() FROM reviews GROUP BY rating
+            UNION ALL SELECT 'tutors.total', COUNT(*), NOW() FROM tutors
+            UNION ALL SELECT 'tutors.verified.' || COALESCE(verified, 0), COUNT(*), NOW() FROM tutors GROUP BY COALESCE(verified, 0)
+            UNION ALL SELECT 'users.role.' || role, COUNT(*), NOW() FROM users GROUP BY role
+            UNION ALL SELECT 'students.total', COUNT(*), NOW() FROM students;
+            UPDATE tutors t
+            SET completed_bookings = COALESCE(c.completed, 0)
+            FROM tutors t2
+            LEFT JOIN (
+                SELECT tutor_id, COUNT(*) AS completed FROM bookings WHERE status = 'completed' GROUP BY tutor_id
+            ) c ON c.tutor_id = t2.tutor_id
+            WHERE t2.tutor_id = t.tutor_id AND t.completed_bookings IS DISTINCT FROM COALESCE(c.completed, 0);
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "SELECT refresh_platform_stats()",
+        # Report: top tutors - WHERE verified = 1 AND rating > 0 ORDER BY rating DESC, completed_bookings DESC
+        """CREATE INDEX IF NOT EXISTS idx_tutors_verified_top ON tutors (rating DESC, completed_bookings DESC)
+           WHERE verified = 1""",
+        # Report: active bookings - upcoming sessions that are still going ahead
+        """CREATE INDEX IF NOT EXISTS idx_bookings_upcoming_session ON bookings (session_date)
+           WHERE status IN ('pending', 'confirmed', 'accepted')""",
+    ]),
+
+    # Database copies of proof documents (kept while the blob store isn't durable) move out of the
+    # BYTEA columns into 1MB rows keyed by the file's SHA-256 (blob_store.DB_CHUNK_SIZE), so uploads
+    # and restores never hold a whole file in a worker, and uploads of the same file share one copy.
+    (21, "Chunked database copies of proof documents", [
+        """
+        CREATE TABLE IF NOT EXISTS blob_chunks (
+            handle TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            data BYTEA NOT NULL,
+            PRIMARY KEY (handle, seq)
+        )
+        """,
+        # PDFs and images are already compressed - store the chunks out of line without trying again
+        "ALTER TABLE blob_chunks ALTER COLUMN data SET STORAGE EXTERNAL",
+        """
+        INSERT INTO blob_chunks (handle, seq, data)
+        SELECT d.sha256, s.seq, substring(d.content FROM s.seq * 1048576 + 1 FOR 1048576)
+        FROM (
+            SELECT DISTINCT ON (sha256) sha256, content
+            FROM (
+                SELECT sha256, content FROM tutor_proof_docs WHERE content IS NOT NULL
+                UNION ALL
+                SELECT sha256, content FROM proof_doc_uploads WHERE content IS NOT NULL
+            ) docs
+            ORDER BY sha256
+        ) d
+        CROSS JOIN LATERAL generate_series(0, GREATEST((length(d.content) - 1) / 1048576, 0)) AS s(seq)
+        ON CONFLICT DO NOTHING
+        """,
+        "ALTER TABLE tutor_proof_docs DROP COLUMN IF EXISTS content",
+        "ALTER TABLE proof_doc_uploads DROP COLUMN IF EXISTS content",
+    ]),
+]
+
+
+###################
+# RUNNER
+###################
+
+def get_applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def run_migrations(verbose=True):
+    """
+    Applies any migrations not yet recorded in schema_migrations.
+    Each migration runs in its own transaction together with its version row,
+    so a failed migration leaves nothing half-applied.
+    Returns the list of versions applied by this call.
+    """
+    applied_now = []
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP NOT NULL
+            )
+        """)
+        conn.commit()
+
+        # Session-level lock - a second deploy or worker waits here instead of racing
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        try:
+            applied = get_applied_versions(cursor)
+            conn.commit()
+            for version, description, steps in sorted(MIGRATIONS, key=lambda m: m[0]):
+                if version in applied:
+                    continue
+                if verbose:
+                    print(f"[INFO] Applying migration {version}: {description}")
+                try:
+                    for step in steps:
+                        if callable(step):
+                            step(cursor)
+                        else:
+                            cursor.execute(step)
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (version, description, applied_at) VALUES (%s, %s, %s)",
+                        (version, description, datetime.now())
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    print(f"[ERROR] Migration {version} failed - stopping")
+                    raise
+                applied_now.append(version)
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            conn.commit()
+    finally:
+        conn.close()
+
+    if verbose:
+        if applied_now:
+            print(f"[SUCCESS] Applied migrations: {', '.join(str(v) for v in applied_now)}")
+        else:
+            print("[INFO] Database schema is up to date")
+    return applied_now
+
+
+if __name__ == '__main__':
+    run_migrations()
@@ -0,0 +1,317 @@
+# Booking outbox dispatcher
+# Delivers the side effects create_booking queues in booking_outbox (migration 12): the Google
+# Calendar event and the SendGrid confirmation emails. The web request only
+# writes the outbox rows, so a slow or failing API never holds up a booking.
+# Run as its own process next to the web app (see Procfile "outbox"):
+#   python outbox_dispatcher.py
+# or, where only the web process is deployed, on a background thread in each web worker
+# (OUTBOX_IN_WEB, started by app.py).
+# Jobs are claimed with FOR UPDATE SKIP LOCKED and a lease, so several copies can run at once and
+# a job held by a crashed dispatcher is picked up again once its lease runs out.
+# references
+# https://docs.python.org/3/library/concurrent.futures.html#threadpoolexecutor
+# https://www.postgresql.org/docs/current/sql-select.html#SQL-FOR-UPDATE-SHARE - SKIP LOCKED
+# https://www.psycopg.org/docs/advanced.html#asynchronous-notifications - LISTEN/NOTIFY
+
+import os
+import select
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+
+from circuit_breaker import OPEN, BREAKER_OPEN_SECONDS, breaker_snapshots
+from db import get_connection
+
+OUTBOX_WORKERS = int(os.environ.get('OUTBOX_WORKERS', 4))  # API calls in flight at once
+OUTBOX_POLL_SECONDS = float(os.environ.get('OUTBOX_POLL_SECONDS', 5))  # queue check when no NOTIFY arrives
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 6))  # give up after this many tries
+OUTBOX_BACKOFF_SECONDS = float(os.environ.get('OUTBOX_BACKOFF_SECONDS', 30))  # first retry delay, doubled each time
+OUTBOX_BACKOFF_MAX = float(os.environ.get('OUTBOX_BACKOFF_MAX', 3600))  # longest retry delay
+OUTBOX_LEASE_SECONDS = float(os.environ.get('OUTBOX_LEASE_SECONDS', 300))  # claimed job is re-offered after this
+BREAKER_PUBLISH_SECONDS = 15  # how often circuit breaker state is written for /api/admin/metrics
+
+NOTIFY_CHANNEL = 'booking_outbox'
+
+stop_event = threading.Event()
+
+
+def send_calendar_event(payload):
+    from api_integrations import create_google_calendar_event, ENABLE_GOOGLE_CALENDAR
+    if not ENABLE_GOOGLE_CALENDAR:
+        return None
+    return create_google_calendar_event(
+        payload["booking_data"], payload["learner_email"], payload["tutor_email"],
+        payload["learner_name"], payload["tutor_name"]
+    )
+
+
+def send_confirmation_emails(payload):
+    from api_integrations import send_booking_confirmation_email, ENABLE_EMAIL_NOTIFICATIONS, SENDGRID_API_KEY
+    if not ENABLE_EMAIL_NOTIFICATIONS or not SENDGRID_API_KEY:
+        return None
+    return send_booking_confirmation_email(
+        payload["learner_email"], payload["tutor_email"], payload["learner_name"],
+        payload["tutor_name"], payload["booking_data"]
+    )
+
+
+def lookup_timezone(payload):
+    # create_booking now answers the timezone itself; kept for jobs queued before that change
+    from api_integrations import get_timezone_info, ENABLE_TIMEZONE_API
+    if not ENABLE_TIMEZONE_API:
+        return None
+    return get_timezone_info()
+
+
+# integration name (booking_outbox.integration) -> handler
+# A handler returns the api_integrations result dict, or None when the integration is switched off
+HANDLERS = {
+    'google_calendar': send_calendar_event,
+    'email': send_confirmation_emails,
+    'timezone': lookup_timezone,
+}
+
+
+def backoff_delay(attempts):
+    # 30s, 60s, 120s, ... capped at OUTBOX_BACKOFF_MAX
+    return min(OUTBOX_BACKOFF_SECONDS * (2 ** (attempts - 1)), OUTBOX_BACKOFF_MAX)
+
+
+def claim_jobs(limit):
+    """
+    Leases up to `limit` due jobs to this dispatcher and returns them.
+    Pending jobs whose retry time has come and processing jobs whose lease expired are both due.
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        now = datetime.now()
+        cursor.execute("""
+            UPDATE booking_outbox
+            SET status = 'processing', attempts = attempts + 1, locked_until = %s, updated_at = %s
+            WHERE outbox_id IN (
+                SELECT outbox_id FROM booking_outbox
+                WHERE (status = 'pending' AND next_attempt_at <= %s)
+                   OR (status = 'processing' AND locked_until <= %s)
+                ORDER BY next_attempt_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING outbox_id, booking_id, integration, payload, attempts
+        """, (now + timedelta(seconds=OUTBOX_LEASE_SECONDS), now, now, now, limit))
+        jobs = cursor.fetchall()
+        conn.commit()
+        return jobs
+    finally:
+        if conn:
+            conn.close()
+
+
+def record_result(job, outbox_status, booking_status, error=None, next_attempt_at=None, refund_attempt=False):
+    # Updates the outbox row and copies the result onto bookings.integration_status in one transaction
+    # refund_attempt gives back the attempt claim_jobs counted, for a call that was never made
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        now = datetime.now()
+        cursor.execute("""
+            UPDATE booking_outbox
+            SET status = %s, last_error = %s, next_attempt_at = COALESCE(%s, next_attempt_at),
+                attempts = attempts - %s, locked_until = NULL, updated_at = %s
+            WHERE outbox_id = %s
+        """, (outbox_status, error, next_attempt_at, 1 if refund_attempt else 0, now, job["outbox_id"]))
+        cursor.execute("""
+            UPDATE bookings
+            SET integration_status = jsonb_set(integration_status, ARRAY[%s], %s, true)
+            WHERE booking_id = %s
+        """, (job["integration"], psycopg2.extras.Json(booking_status), job["booking_id"]))
+        conn.commit()
+    finally:
+        if conn:
+            conn.close()
+
+
+def process_job(job):
+    """Runs one integration call and records its result."""
+    integration = job["integration"]
+    handler = HANDLERS.get(integration)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown integration '{integration}'")
+        result = handler(job["payload"])
+    except Exception as e:
+        result = {"success": False, "message": str(e)}
+    handle_result(job, result)
+
+
+def process_calendar_batch(jobs):
+    # Calendar jobs claimed together go to Google as one batch request
+    from api_integrations import create_google_calendar_events, ENABLE_GOOGLE_CALENDAR
+    if not ENABLE_GOOGLE_CALENDAR:
+        results = [None] * len(jobs)
+    else:
+        try:
+            results = create_google_calendar_events([job["payload"] for job in jobs])
+        except Exception as e:
+            results = [{"success": False, "message": str(e)}] * len(jobs)
+    for job, result in zip(jobs, results):
+        handle_result(job, result)
+
+
+def handle_result(job, result):
+    """Records success, a scheduled retry, or the final failure for a job."""
+    integration = job["integration"]
+    if result is None:
+        record_result(job, 'done', {"success": False, "status": "skipped", "message": "Integration is disabled"})
+        return
+    if result.get("success"):
+        record_result(job, 'done', dict(result, status="done", attempts=job["attempts"]))
+        print(f"[SUCCESS] Outbox: {integration} for booking {job['booking_id']}")
+        return
+
+    message = result.get("message", "Unknown error")
+    if result.get("circuit") == OPEN:
+        # The breaker failed it fast without calling the API - not an attempt, so a long outage
+        # can't use up OUTBOX_MAX_ATTEMPTS. Try again once the breaker may let a trial through.
+        retry_at = datetime.now() + timedelta(seconds=BREAKER_OPEN_SECONDS)
+        record_result(job, 'pending', dict(result, status="retrying", attempts=job["attempts"] - 1),
+                      error=message, next_attempt_at=retry_at, refund_attempt=True)
+        print(f"[INFO] Outbox: {integration} for booking {job['booking_id']} waiting for its circuit breaker until {retry_at:%H:%M:%S}")
+        return
+    if job["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+        record_result(job, 'failed', dict(result, status="failed", attempts=job["attempts"]), error=message)
+        print(f"[WARNING] Outbox: {integration} for booking {job['booking_id']} failed after {job['attempts']} attempt(s): {message}")
+        return
+    retry_at = datetime.now() + timedelta(seconds=backoff_delay(job["attempts"]))
+    record_result(job, 'pending', dict(result, status="retrying", attempts=job["attempts"]),
+                  error=message, next_attempt_at=retry_at)
+    print(f"[INFO] Outbox: {integration} for booking {job['booking_id']} will retry at {retry_at:%H:%M:%S}: {message}")
+
+
+def run_job(job):
+    try:
+        process_job(job)
+    except psycopg2.Error as e:
+        # Result could not be saved - the lease runs out and the job is offered again
+        print(f"[WARNING] Outbox: could not record result for job {job['outbox_id']}: {e}")
+
+
+def run_calendar_batch(jobs):
+    try:
+        process_calendar_batch(jobs)
+    except psycopg2.Error as e:
+        print(f"[WARNING] Outbox: could not record calendar batch results: {e}")
+
+
+def publish_breakers(process_name):
+    # Writes this process's circuit breaker state to integration_breakers (migration 13)
+    snapshots = breaker_snapshots()
+    if not snapshots:
+        return
+    conn = None
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        now = datetime.now()
+        psycopg2.extras.execute_values(cursor, """
+            INSERT INTO integration_breakers (process, name, snapshot, updated_at)
+            VALUES %s
+            ON CONFLICT (process, name) DO UPDATE
+            SET snapshot = EXCLUDED.snapshot, updated_at = EXCLUDED.updated_at
+        """, [(process_name, name, psycopg2.extras.Json(snapshot), now) for name, snapshot in snapshots.items()])
+        conn.commit()
+    finally:
+        if conn:
+            conn.close()
+
+
+def open_listener():
+    # Dedicated connection outside the pool - it stays in LISTEN for the life of the process
+    conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    conn.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+    return conn
+
+
+def wait_for_notify(listener, timeout):
+    # Blocks until create_booking sends NOTIFY booking_outbox or the timeout passes
+    if listener is None:
+        stop_event.wait(timeout)
+        return
+    if select.select([listener], [], [], timeout) != ([], [], []):
+        listener.poll()
+        listener.notifies.clear()
+
+
+def run():
+    """Claims due jobs and runs them on a thread pool until stop_event is set."""
+    executor = ThreadPoolExecutor(max_workers=OUTBOX_WORKERS, thread_name_prefix='outbox')
+    in_flight = set()
+    listener = None
+    process_name = f"outbox@{socket.gethostname()}:{os.getpid()}"
+    published_at = 0
+    try:
+        while not stop_event.is_set():
+            try:
+                if listener is None:
+                    listener = open_listener()
+                if time.monotonic() - published_at >= BREAKER_PUBLISH_SECONDS:
+                    publish_breakers(process_name)
+                    published_at = time.monotonic()
+
+                # Only claim as many jobs as there are free workers so leases are not wasted queueing
+                free = OUTBOX_WORKERS - len(in_flight)
+                jobs = claim_jobs(free) if free > 0 else []
+                calendar_jobs = [job for job in jobs if job["integration"] == 'google_calendar']
+                single_jobs = jobs
+                if len(calendar_jobs) > 1:
+                    in_flight.add(executor.submit(run_calendar_batch, calendar_jobs))
+                    single_jobs = [job for job in jobs if job["integration"] != 'google_calendar']
+                for job in single_jobs:
+                    in_flight.add(executor.submit(run_job, job))
+
+                if len(in_flight) >= OUTBOX_WORKERS:
+                    wait(in_flight, timeout=OUTBOX_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                elif not jobs:
+                    wait_for_notify(listener, OUTBOX_POLL_SECONDS)
+                in_flight = {future for future in in_flight if not future.done()}
+            except psycopg2.Error as e:
+                print(f"[WARNING] Outbox dispatcher database error: {e}")
+                if listener is not None:
+                    listener.close()
+                    listener = None
+                stop_event.wait(5)
+    finally:
+        # Let calls already in flight finish and record their results
+        executor.shutdown(wait=True)
+        if listener is not None:
+            listener.close()
+
+
+def start_in_background():
+    # Used by app.py (OUTBOX_IN_WEB) - runs the dispatcher loop on a daemon thread.
+    # Every web worker can run one: claim_jobs' SKIP LOCKED lease hands each job to a single worker.
+    thread = threading.Thread(target=run, name='outbox-dispatcher', daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    print(f"[INFO] Booking outbox dispatcher started ({OUTBOX_WORKERS} workers)")
+    run()
+    print("[INFO] Booking outbox dispatcher stopped")
+
+
+if __name__ == '__main__':
+    main()
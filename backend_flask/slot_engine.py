@@ -0,0 +1,118 @@
+# Slot engine for tutor availability
+# Works on (start, end) intervals in minutes since midnight, so the booking form's slot list is
+# computed with integer arithmetic: merge the tutor's availability windows, subtract booked
+# sessions in one sorted sweep, then step through what is left.
+# Pure functions - no database or Flask - so app.py does the queries and passes plain data in.
+# references
+# https://docs.python.org/3/library/datetime.html#time-objects
+
+from datetime import time as time_type, timedelta
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minutes(value):
+    """Converts a TIME value (datetime.time or 'HH:MM[:SS]' string) to minutes since midnight."""
+    if isinstance(value, time_type):
+        return value.hour * 60 + value.minute
+    hours, minutes = str(value).split(':')[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def merge_intervals(intervals):
+    """Sorts intervals and merges any that overlap or touch. Empty intervals are dropped."""
+    merged = []
+    for start, end in sorted(i for i in intervals if i[1] > i[0]):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def subtract_intervals(windows, busy):
+    """
+    Returns the parts of `windows` not covered by `busy`.
+    Both are merged first; a single pass over the two sorted lists does the subtraction.
+    """
+    windows = merge_intervals(windows)
+    busy = merge_intervals(busy)
+    free = []
+    b = 0
+    for start, end in windows:
+        # Skip bookings that finish before this window starts
+        while b < len(busy) and busy[b][1] <= start:
+            b += 1
+        cursor = start
+        i = b
+        while i < len(busy) and busy[i][0] < end:
+            if busy[i][0] > cursor:
+                free.append((cursor, busy[i][0]))
+            cursor = max(cursor, busy[i][1])
+            i += 1
+        if cursor < end:
+            free.append((cursor, end))
+    return free
+
+
+def slot_starts(windows, busy, slot_minutes=30, duration=30):
+    """
+    Start times (minutes) on a `slot_minutes` grid - anchored at each availability window's
+    start - where a session of `duration` minutes fits without touching a booking.
+    """
+    slots = []
+    free = subtract_intervals(windows, busy)
+    f = 0
+    for window_start, window_end in merge_intervals(windows):
+        while f < len(free) and free[f][0] < window_end:
+            free_start, free_end = free[f]
+            # First grid point at or after the start of this free stretch
+            offset = free_start - window_start
+            start = window_start + -(-offset // slot_minutes) * slot_minutes
+            while start + duration <= free_end:
+                slots.append(start)
+                start += slot_minutes
+            f += 1
+    return slots
+
+
+def contains(intervals, start, end):
+    """True if [start, end) lies entirely inside one of the (merged) intervals."""
+    return any(i_start <= start and end <= i_end for i_start, i_end in merge_intervals(intervals))
+
+
+def busy_by_date(bookings):
+    """
+    Groups bookings (session_date, start_min, duration_min) into busy intervals per date.
+    A session running past midnight also blocks the start of the next day.
+    """
+    busy = {}
+    for session_date, start, length in bookings:
+        end = start + length
+        busy.setdefault(session_date, []).append((start, min(end, MINUTES_PER_DAY)))
+        if end > MINUTES_PER_DAY:
+            busy.setdefault(session_date + timedelta(days=1), []).append((0, end - MINUTES_PER_DAY))
+    return busy
+
+
+def slots_for_range(start_date, end_date, weekly_windows, bookings, slot_minutes=30, duration=30):
+    """
+    Computes available slots for every date from start_date to end_date inclusive.
+    weekly_windows: {day_of_week (0=Monday): [(start_min, end_min), ...]}
+    bookings: iterable of (session_date, start_min, duration_min)
+    Returns {date: ["HH:MM", ...]}.
+    """
+    busy = busy_by_date(bookings)
+    result = {}
+    day = start_date
+    while day <= end_date:
+        windows = weekly_windows.get(day.weekday(), [])
+        starts = slot_starts(windows, busy.get(day, []), slot_minutes, duration) if windows else []
+        result[day] = [format_minutes(m) for m in starts]
+        day += timedelta(days=1)
+    return result
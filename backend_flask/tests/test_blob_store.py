@@ -0,0 +1,173 @@
+# Unit tests for blob_store.py (local disk store - S3 needs boto3 and a bucket)
+# Run from backend_flask:  python -m unittest discover -s tests -t .
+
+import hashlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from blob_store import (
+    CHUNK_SIZE, DB_CHUNK_SIZE, BlobTooLarge, DatabaseCopyReader, LocalBlobStore, delete_database_copy,
+    has_database_copy, save_database_copy, store_from_env
+)
+
+
+class LocalBlobStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = LocalBlobStore(self.tmp.name, max_size=4 * CHUNK_SIZE)
+
+    def files(self):
+        return sorted(os.path.relpath(os.path.join(root, name), self.tmp.name)
+                      for root, _, names in os.walk(self.tmp.name) for name in names)
+
+    def test_save_names_file_by_sha256(self):
+        data = b'%PDF-1.7' + os.urandom(CHUNK_SIZE * 2 + 17)
+        handle, size, first_bytes = self.store.save_stream(io.BytesIO(data))
+        self.assertEqual(handle, hashlib.sha256(data).hexdigest())
+        self.assertEqual(size, len(data))
+        self.assertEqual(first_bytes, data[:16])
+        self.assertEqual(self.files(), [os.path.join(handle[:2], handle)])
+        with self.store.open(handle) as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(self.store.size(handle), len(data))
+
+    def test_same_content_stored_once(self):
+        first, _, _ = self.store.save_stream(io.BytesIO(b'same document'))
+        second, _, _ = self.store.save_stream(io.BytesIO(b'same document'))
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.files()), 1)
+
+    def test_too_large_leaves_nothing_behind(self):
+        with self.assertRaises(BlobTooLarge):
+            self.store.save_stream(io.BytesIO(b'x' * (4 * CHUNK_SIZE + 1)))
+        self.assertEqual(self.files(), [])
+
+    def test_exactly_max_size_is_allowed(self):
+        _, size, _ = self.store.save_stream(io.BytesIO(b'x' * (4 * CHUNK_SIZE)))
+        self.assertEqual(size, 4 * CHUNK_SIZE)
+
+    def test_empty_file(self):
+        handle, size, first_bytes = self.store.save_stream(io.BytesIO(b''))
+        self.assertEqual(handle, hashlib.sha256(b'').hexdigest())
+        self.assertEqual((size, first_bytes), (0, b''))
+
+    def test_handles_are_validated(self):
+        for bad in ('', None, '../../etc/passwd', 'A' * 64, 'a' * 63):
+            self.assertFalse(self.store.is_handle(bad))
+            self.assertFalse(self.store.exists(bad))
+        with self.assertRaises(ValueError):
+            self.store.path('../secret')
+
+    def test_delete(self):
+        handle, _, _ = self.store.save_stream(io.BytesIO(b'delete me'))
+        self.store.delete(handle)
+        self.assertFalse(self.store.exists(handle))
+        # Deleting a missing blob is not an error
+        self.store.delete(handle)
+
+
+class FakeChunkTable:
+    """Stands in for the blob_chunks table behind a cursor."""
+
+    def __init__(self):
+        self.rows = {}
+        self.selects = 0
+
+    def cursor(self):
+        return FakeChunkCursor(self)
+
+
+class FakeChunkCursor:
+
+    def __init__(self, table):
+        self.connection = table
+        self.table = table
+        self.result = []
+
+    def execute(self, query, params):
+        if query.startswith("SELECT 1"):
+            self.result = [(1,)] if (params[0], 0) in self.table.rows else []
+        elif query.startswith("SELECT data"):
+            self.table.selects += 1
+            self.result = [(memoryview(self.table.rows[params]),)] if params in self.table.rows else []
+        elif query.startswith("INSERT"):
+            handle, seq, data = params
+            self.table.rows[(handle, seq)] = bytes(data)
+        elif query.startswith("DELETE"):
+            self.table.rows = {key: value for key, value in self.table.rows.items() if key[0] != params[0]}
+        else:
+            raise AssertionError(query)
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+
+class DatabaseCopyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = LocalBlobStore(os.path.join(self.tmp.name, 'a'))
+        self.table = FakeChunkTable()
+        self.cursor = self.table.cursor()
+
+    def test_copy_is_split_into_rows_and_read_back(self):
+        data = os.urandom(DB_CHUNK_SIZE * 2 + 5)
+        handle, _, _ = self.store.save_stream(io.BytesIO(data))
+        save_database_copy(self.cursor, self.store, handle)
+        self.assertEqual(sorted(seq for _, seq in self.table.rows), [0, 1, 2])
+        self.assertTrue(all(len(chunk) <= DB_CHUNK_SIZE for chunk in self.table.rows.values()))
+
+        # Restore into an empty store (a wiped disk)
+        other = LocalBlobStore(os.path.join(self.tmp.name, 'b'))
+        restored, size, _ = other.save_stream(DatabaseCopyReader(self.cursor, handle))
+        self.assertEqual((restored, size), (handle, len(data)))
+        # One row fetched at a time, plus the query that finds the end
+        self.assertEqual(self.table.selects, 4)
+
+    def test_second_copy_of_same_file_is_skipped(self):
+        handle, _, _ = self.store.save_stream(io.BytesIO(b'shared'))
+        save_database_copy(self.cursor, self.store, handle)
+        self.table.rows[(handle, 0)] = b'marker'
+        save_database_copy(self.cursor, self.store, handle)
+        self.assertEqual(self.table.rows[(handle, 0)], b'marker')
+
+    def test_empty_file_still_has_a_copy(self):
+        handle, _, _ = self.store.save_stream(io.BytesIO(b''))
+        save_database_copy(self.cursor, self.store, handle)
+        self.assertTrue(has_database_copy(self.cursor, handle))
+        self.assertEqual(DatabaseCopyReader(self.cursor, handle).read(), b'')
+
+    def test_read_all_and_delete(self):
+        handle, _, _ = self.store.save_stream(io.BytesIO(b'x' * (DB_CHUNK_SIZE + 1)))
+        save_database_copy(self.cursor, self.store, handle)
+        self.assertEqual(DatabaseCopyReader(self.cursor, handle).read(), b'x' * (DB_CHUNK_SIZE + 1))
+        delete_database_copy(self.cursor, handle)
+        self.assertFalse(has_database_copy(self.cursor, handle))
+
+
+class StoreFromEnvTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_local_disk_is_not_durable_by_default(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            store = store_from_env('proof_docs', self.tmp.name)
+        self.assertIsInstance(store, LocalBlobStore)
+        self.assertFalse(store.durable)
+        self.assertEqual(store.root, os.path.join(self.tmp.name, 'proof_docs'))
+
+    def test_operator_can_mark_local_disk_durable(self):
+        with mock.patch.dict(os.environ, {'BLOB_STORE_DURABLE': 'true'}, clear=True):
+            self.assertTrue(store_from_env('proof_docs', self.tmp.name).durable)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+# Unit tests for circuit_breaker.py
+# Run from backend_flask:  python -m unittest discover -s tests -t .
+
+import unittest
+from unittest import mock
+
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, NORMAL, OPEN, TRIAL
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(circuit_breaker.time, 'monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker('test', deadline=1.0, window_seconds=60, min_calls=4,
+                                      error_rate=0.5, open_seconds=30)
+
+    def fail(self, count=1):
+        for _ in range(count):
+            self.breaker.record(self.breaker.allow(), False, 0.1)
+
+    def succeed(self, count=1):
+        for _ in range(count):
+            self.breaker.record(self.breaker.allow(), True, 0.1)
+
+    def state(self):
+        return self.breaker.snapshot()["state"]
+
+    def test_needs_min_calls_before_opening(self):
+        self.fail(3)
+        self.assertEqual(self.state(), CLOSED)
+        self.fail()
+        self.assertEqual(self.state(), OPEN)
+
+    def test_error_rate_below_threshold_stays_closed(self):
+        self.succeed(3)
+        self.fail(2)
+        self.assertEqual(self.state(), CLOSED)
+
+    def test_slow_calls_count_as_failures(self):
+        for _ in range(4):
+            self.breaker.record(self.breaker.allow(), True, 2.0)
+        snapshot = self.breaker.snapshot()
+        self.assertEqual(snapshot["state"], OPEN)
+        self.assertEqual(snapshot["slow_calls"], 4)
+
+    def test_old_failures_leave_the_window(self):
+        self.fail(3)
+        self.clock.now += 61
+        self.fail()
+        self.assertEqual(self.state(), CLOSED)
+        self.assertEqual(self.breaker.snapshot()["window_failures"], 1)
+
+    def test_open_rejects_until_cool_down(self):
+        self.fail(4)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.snapshot()["rejected"], 1)
+        self.assertEqual(self.breaker.call(lambda: {"success": True})["circuit"], OPEN)
+
+        self.clock.now += 30
+        self.assertEqual(self.breaker.allow(), TRIAL)
+        self.assertEqual(self.state(), HALF_OPEN)
+        # Only one trial at a time
+        self.assertFalse(self.breaker.allow())
+
+    def test_successful_trial_closes_with_clean_window(self):
+        self.fail(4)
+        self.clock.now += 30
+        self.breaker.record(self.breaker.allow(), True, 0.1)
+        snapshot = self.breaker.snapshot()
+        self.assertEqual(snapshot["state"], CLOSED)
+        self.assertEqual(snapshot["window_calls"], 0)
+        self.assertEqual(self.breaker.allow(), NORMAL)
+
+    def test_failed_trial_reopens(self):
+        self.fail(4)
+        self.clock.now += 30
+        self.breaker.record(self.breaker.allow(), False, 0.1)
+        self.assertEqual(self.state(), OPEN)
+        self.assertEqual(self.breaker.snapshot()["times_opened"], 2)
+        self.assertFalse(self.breaker.allow())
+
+    def test_late_normal_call_does_not_resolve_half_open(self):
+        # Admitted while closed, still running when the breaker opens and goes half-open
+        slow_ticket = self.breaker.allow()
+        self.fail(4)
+        self.clock.now += 30
+        trial_ticket = self.breaker.allow()
+        self.assertEqual(trial_ticket, TRIAL)
+
+        self.breaker.record(slow_ticket, True, 0.5)
+        self.assertEqual(self.state(), HALF_OPEN)
+        self.assertFalse(self.breaker.allow())  # the trial is still in flight
+
+        self.breaker.record(trial_ticket, True, 0.1)
+        self.assertEqual(self.state(), CLOSED)
+
+    def test_call_records_result_and_exceptions(self):
+        self.assertEqual(self.breaker.call(lambda: {"success": True}), {"success": True})
+
+        def boom():
+            raise RuntimeError("down")
+        for _ in range(3):
+            with self.assertRaises(RuntimeError):
+                self.breaker.call(boom)
+        snapshot = self.breaker.snapshot()
+        self.assertEqual(snapshot["total_calls"], 4)
+        self.assertEqual(snapshot["total_failures"], 3)
+        self.assertEqual(snapshot["state"], OPEN)
+        # Open now - boom is not called again
+        self.assertEqual(self.breaker.call(boom), self.breaker.rejection())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# Unit tests for message_sync.py
+# Run from backend_flask:  python -m unittest discover -s tests -t .
+
+import unittest
+
+from message_sync import fetch_message_changes, format_message, parse_message_cursor
+
+
+class FakeCursor:
+    """Answers the horizon query and then the messages query, recording what was asked."""
+
+    def __init__(self, horizon, rows):
+        self.results = [[{"horizon": horizon}], rows]
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+        self._current = self.results.pop(0)
+
+    def fetchone(self):
+        return self._current[0]
+
+    def fetchall(self):
+        return self._current
+
+
+def message(message_id, booking_id=1, read_at=None):
+    return {
+        "booking_id": booking_id, "message_id": message_id, "sender_id": 7, "sender_role": "learner",
+        "message_text": f"message {message_id}", "read_at": read_at, "created_at": None
+    }
+
+
+class ParseMessageCursorTest(unittest.TestCase):
+
+    def test_first_sync(self):
+        self.assertEqual(parse_message_cursor('0'), 0)
+
+    def test_horizon(self):
+        self.assertEqual(parse_message_cursor('48213'), 48213)
+
+    def test_old_dotted_cursor_starts_again(self):
+        self.assertEqual(parse_message_cursor('512.1760000000000000'), 0)
+
+    def test_invalid(self):
+        for bad in ('abc', '-5', '1e3', ' '):
+            with self.assertRaises(ValueError):
+                parse_message_cursor(bad)
+
+
+class FetchMessageChangesTest(unittest.TestCase):
+
+    def test_horizon_is_taken_before_the_query(self):
+        cursor = FakeCursor(900, [message(5)])
+        rows, next_cursor = fetch_message_changes(cursor, [1, 2], 850)
+        self.assertEqual(next_cursor, '900')
+        self.assertEqual(rows, [message(5)])
+        self.assertIn("pg_snapshot_xmin", cursor.executed[0][0])
+        self.assertIn("change_xid >= %s", cursor.executed[1][0])
+        self.assertEqual(cursor.executed[1][1], ([1, 2], 850))
+
+    def test_cursor_never_skips_a_late_commit(self):
+        # Message 10 commits after message 11 (its transaction stayed open). The first poll sees
+        # only 11; the horizon it returns is below the open transaction, so the next poll still
+        # asks for everything that transaction wrote.
+        open_transaction = 700
+        cursor = FakeCursor(open_transaction, [message(11)])
+        _, next_cursor = fetch_message_changes(cursor, [1], 0)
+        self.assertLessEqual(int(next_cursor), open_transaction)
+
+        cursor = FakeCursor(950, [message(10), message(11)])
+        rows, _ = fetch_message_changes(cursor, [1], parse_message_cursor(next_cursor))
+        self.assertEqual([r["message_id"] for r in rows], [10, 11])
+
+    def test_no_changes_keeps_moving_the_horizon(self):
+        rows, next_cursor = fetch_message_changes(FakeCursor(1200, []), [1], 1100)
+        self.assertEqual((rows, next_cursor), ([], '1200'))
+
+    def test_format_message(self):
+        self.assertEqual(format_message(dict(message(3), change_xid=99)), message(3))
+
+
+if __name__ == '__main__':
+    unittest.main()
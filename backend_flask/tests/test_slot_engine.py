@@ -0,0 +1,95 @@
+# Unit tests for slot_engine.py
+# Run from backend_flask:  python -m unittest discover -s tests -t .
+
+import unittest
+from datetime import date, time
+
+from slot_engine import (
+    busy_by_date, contains, format_minutes, merge_intervals, slot_starts, slots_for_range,
+    subtract_intervals, to_minutes
+)
+
+
+class ToMinutesTest(unittest.TestCase):
+
+    def test_time_and_strings(self):
+        self.assertEqual(to_minutes(time(9, 30)), 570)
+        self.assertEqual(to_minutes("09:30"), 570)
+        self.assertEqual(to_minutes("09:30:59"), 570)
+        self.assertEqual(format_minutes(570), "09:30")
+
+
+class MergeIntervalsTest(unittest.TestCase):
+
+    def test_overlapping_and_touching_windows_merge(self):
+        self.assertEqual(merge_intervals([(600, 720), (540, 630), (720, 780)]), [(540, 780)])
+
+    def test_contained_window_does_not_shrink(self):
+        self.assertEqual(merge_intervals([(540, 780), (600, 660)]), [(540, 780)])
+
+    def test_empty_intervals_dropped(self):
+        self.assertEqual(merge_intervals([(600, 600), (700, 650), (540, 560)]), [(540, 560)])
+
+
+class SubtractIntervalsTest(unittest.TestCase):
+
+    def test_booking_in_the_middle_splits_window(self):
+        self.assertEqual(subtract_intervals([(540, 720)], [(600, 660)]), [(540, 600), (660, 720)])
+
+    def test_overlapping_bookings_and_windows(self):
+        windows = [(540, 660), (630, 780)]  # overlap - merged to 540-780
+        busy = [(600, 650), (640, 700)]  # overlap - merged to 600-700
+        self.assertEqual(subtract_intervals(windows, busy), [(540, 600), (700, 780)])
+
+    def test_booking_spanning_two_windows(self):
+        self.assertEqual(subtract_intervals([(540, 600), (660, 720)], [(570, 690)]), [(540, 570), (690, 720)])
+
+    def test_booking_covering_everything(self):
+        self.assertEqual(subtract_intervals([(540, 600)], [(0, 1440)]), [])
+
+
+class SlotStartsTest(unittest.TestCase):
+
+    def test_grid_anchored_at_window_start(self):
+        # 09:15-11:00 window, 30 minute slots of 30 minutes
+        self.assertEqual(slot_starts([(555, 660)], [], 30, 30), [555, 585, 615])
+
+    def test_slot_after_booking_snaps_to_grid(self):
+        # Booking 09:00-09:45 - next grid point is 10:00, not 09:45
+        self.assertEqual(slot_starts([(540, 660)], [(540, 585)], 30, 30), [600, 630])
+
+    def test_long_session_needs_room(self):
+        # 09:00-10:00 fits an hour; 10:30-11:00 does not
+        self.assertEqual(slot_starts([(540, 660)], [(600, 630)], 30, 60), [540])
+        self.assertEqual(slot_starts([(540, 720)], [(600, 630)], 30, 60), [540, 630, 660])
+        self.assertEqual(slot_starts([(540, 630)], [(570, 600)], 30, 60), [])
+
+    def test_contains(self):
+        self.assertTrue(contains([(540, 600), (600, 660)], 570, 630))
+        self.assertFalse(contains([(540, 600), (610, 660)], 570, 630))
+
+
+class SlotsForRangeTest(unittest.TestCase):
+
+    def test_session_past_midnight_blocks_next_day(self):
+        busy = busy_by_date([(date(2026, 3, 2), 23 * 60, 90)])
+        self.assertEqual(busy[date(2026, 3, 2)], [(1380, 1440)])
+        self.assertEqual(busy[date(2026, 3, 3)], [(0, 30)])
+
+        weekly = {1: [(0, 120)]}  # Tuesday 00:00-02:00
+        slots = slots_for_range(date(2026, 3, 3), date(2026, 3, 3), weekly, [(date(2026, 3, 2), 23 * 60, 90)])
+        self.assertEqual(slots[date(2026, 3, 3)], ["00:30", "01:00", "01:30"])
+
+    def test_dst_change_keeps_wall_clock_grid(self):
+        # Clocks go forward on Sunday 29 March 2026 in Ireland/UK - slots are wall-clock times,
+        # so the short day still gets the same grid as the Sunday before
+        weekly = {6: [(60, 180)]}  # Sunday 01:00-03:00
+        slots = slots_for_range(date(2026, 3, 22), date(2026, 3, 29), weekly, [])
+        self.assertEqual(slots[date(2026, 3, 22)], slots[date(2026, 3, 29)])
+        self.assertEqual(slots[date(2026, 3, 29)], ["01:00", "01:30", "02:00", "02:30"])
+        self.assertEqual(len(slots), 8)
+        self.assertEqual(slots[date(2026, 3, 23)], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
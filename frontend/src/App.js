@@ -198,6 +198,32 @@ function App() {
     setInitialUserCheck(true);
   }, []);
 
+  // Iteration 6 - Unread message count for the Messages nav badge
+  // One lookup on the server's maintained counters, refreshed every 30 seconds
+  const [unreadTotal, setUnreadTotal] = useState(0);
+  useEffect(() => {
+    const role = currentUser?.role;
+    const userId = role === 'tutor' ? currentUser?.tutor_id : role === 'learner' ? currentUser?.student_id : null;
+    if (!userId) {
+      setUnreadTotal(0);
+      return;
+    }
+    const fetchUnread = async () => {
+      try {
+        const res = await fetch(`${process.env.REACT_APP_API_URL}/api/messages/unread?user_id=${userId}&user_role=${role}`);
+        if (res.ok) {
+          const data = await res.json();
+          setUnreadTotal(data.total);
+        }
+      } catch (error) {
+        console.error("Error fetching unread messages:", error);
+      }
+    };
+    fetchUnread();
+    const interval = setInterval(fetchUnread, 30000);
+    return () => clearInterval(interval);
+  }, [currentUser]);
+
   // Iteration 5 - Save current page to localStorage so it survives a refresh
   // ChatGPT — https://chatgpt.com/share/6998ce9c-0db0-8008-9560-18ad8cb86d32
   useEffect(() => {
@@ -537,6 +563,9 @@ function App() {
                   <i className={`bi ${pageInfo.icon} me-2`}></i>
                   <span className="d-none d-lg-inline">{pageInfo.label}</span>
                   <span className="d-lg-none">{pageInfo.label.split(' ')[0]}</span>
+                  {page === "messages" && unreadTotal > 0 && (
+                    <span className="badge bg-danger rounded-pill ms-1">{unreadTotal}</span>
+                  )}
           </button>
               );
             })}
@@ -101,6 +101,8 @@ function AdminDashboard({ onLogout, currentUser }) {
   const [users, setUsers] = useState([]);
   const [loadingUsers, setLoadingUsers] = useState(false);
   const [usersError, setUsersError] = useState("");
+  // Iteration 6 - Keyset pagination cursor for loading the next page from the server
+  const [usersNextCursor, setUsersNextCursor] = useState(null);
 
   // Iteration 5 - Pagination for users table
   const [usersCurrentPage, setUsersCurrentPage] = useState(1);
@@ -153,7 +155,7 @@ function AdminDashboard({ onLogout, currentUser }) {
         alert("Tutor approved!");
       }
       fetchTutors();//updates after either action
-      generateReport(); // Refresh stats
+      generateReport(true); // Refresh stats
     } catch (error) {
       console.error("Error approving tutor:", error);
       if (window.showToast) {
@@ -173,7 +175,7 @@ function AdminDashboard({ onLogout, currentUser }) {
         alert("Tutor rejected and removed!");
       }
       fetchTutors();//updates after either action
-      generateReport(); // Refresh stats
+      generateReport(true); // Refresh stats
     } catch (error) {
       console.error("Error rejecting tutor:", error);
       if (window.showToast) {
@@ -183,10 +185,13 @@ function AdminDashboard({ onLogout, currentUser }) {
   };
 
   // Iteration 4 - Generate platform report
-  const generateReport = async () => {
+  // forceRefresh skips the server-side report cache (after an admin action or the Refresh button)
+  const generateReport = async (forceRefresh = false) => {
     setLoadingReport(true);
     try {
-      const response = await axios.get(`${process.env.REACT_APP_API_URL}/api/admin/report`);
+      const response = await axios.get(`${process.env.REACT_APP_API_URL}/api/admin/report`, {
+        params: forceRefresh ? { refresh: true } : {}
+      });
       setReport(response.data);
     } catch (error) {
       console.error("Error generating report:", error);
@@ -211,13 +216,17 @@ function AdminDashboard({ onLogout, currentUser }) {
     URL.revokeObjectURL(url);
   };
 
-  // Iteration 4 - Fetch all users for management
-  const fetchUsers = async () => {
+  // Iteration 4 - Fetch users for management
+  // Iteration 6 - Server returns one page at a time; passing a cursor appends the next page
+  const fetchUsers = async (cursor = null) => {
     setLoadingUsers(true);
     setUsersError("");
     try {
-      const response = await axios.get(`${process.env.REACT_APP_API_URL}/api/admin/users`);
-      setUsers(response.data);
+      const response = await axios.get(`${process.env.REACT_APP_API_URL}/api/admin/users`, {
+        params: { limit: 100, cursor: cursor || undefined }
+      });
+      setUsers(prev => (cursor ? [...prev, ...response.data.items] : response.data.items));
+      setUsersNextCursor(response.data.next_cursor);
     } catch (error) {
       setUsersError(error?.response?.data?.error || "Failed to load users. Please try again.");
       console.error("Error fetching users:", error);
@@ -980,6 +989,15 @@ function AdminDashboard({ onLogout, currentUser }) {
                       </ul>
                     </nav>
                   )}
+
+                  {/* Iteration 6 - Load the next page from the server */}
+                  {usersNextCursor && (
+                    <div className="text-center mt-2">
+                      <button className="btn btn-outline-primary btn-sm" onClick={() => fetchUsers(usersNextCursor)} disabled={loadingUsers}>
+                        Load more users
+                      </button>
+                    </div>
+                  )}
                   </>
                 )}
                 </CCardBody>
@@ -998,7 +1016,7 @@ function AdminDashboard({ onLogout, currentUser }) {
                 <div className="d-flex gap-2">
                   <button 
                     className="btn btn-outline-primary btn-sm" 
-                    onClick={generateReport}
+                    onClick={() => generateReport(true)}
                     disabled={loadingReport}
                   >
                     {loadingReport ? (
@@ -1107,7 +1125,7 @@ function AdminDashboard({ onLogout, currentUser }) {
                   <p className="text-muted mb-4">Click "Refresh" to generate a platform report.</p>
                   <button 
                     className="btn btn-primary"
-                    onClick={generateReport}
+                    onClick={() => generateReport(true)}
                     disabled={loadingReport}
                   >
                     {loadingReport ? (
@@ -1456,6 +1474,7 @@ const AdminAllBookings = () => {
   const [bookings, setBookings] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
+  const [nextCursor, setNextCursor] = useState(null);
 
   // Iteration 5 - Pagination
   const [currentPage, setCurrentPage] = useState(1);
@@ -1465,12 +1484,16 @@ const AdminAllBookings = () => {
     fetchAllBookings();
   }, []);
 
-  const fetchAllBookings = async () => {
+  // Iteration 6 - Server returns one page at a time; passing a cursor appends the next page
+  const fetchAllBookings = async (cursor = null) => {
     setLoading(true);
     setError("");
     try {
-      const res = await axios.get(`${process.env.REACT_APP_API_URL}/api/admin/bookings`);
-      setBookings(res.data);
+      const res = await axios.get(`${process.env.REACT_APP_API_URL}/api/admin/bookings`, {
+        params: { limit: 100, cursor: cursor || undefined }
+      });
+      setBookings(prev => (cursor ? [...prev, ...res.data.items] : res.data.items));
+      setNextCursor(res.data.next_cursor);
     } catch (err) {
       setError(err?.response?.data?.error || "Failed to load bookings");
     } finally {
@@ -1607,6 +1630,15 @@ const AdminAllBookings = () => {
             </ul>
           </nav>
         )}
+
+        {/* Iteration 6 - Load the next page from the server */}
+        {nextCursor && (
+          <div className="text-center mt-2">
+            <button className="btn btn-outline-primary btn-sm" onClick={() => fetchAllBookings(nextCursor)} disabled={loading}>
+              Load more bookings
+            </button>
+          </div>
+        )}
         </>
       )}
     </div>
@@ -1636,6 +1668,7 @@ const AdminAllReviews = () => {
   const [reviews, setReviews] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
+  const [nextCursor, setNextCursor] = useState(null);
 
   // Iteration 5 - Pagination
   const [currentPage, setCurrentPage] = useState(1);
@@ -1645,12 +1678,16 @@ const AdminAllReviews = () => {
     fetchAllReviews();
   }, []);
 
-  const fetchAllReviews = async () => {
+  // Iteration 6 - Server returns one page at a time; passing a cursor appends the next page
+  const fetchAllReviews = async (cursor = null) => {
     setLoading(true);
     setError("");
     try {
-      const res = await axios.get(`${process.env.REACT_APP_API_URL}/api/admin/reviews`);
-      setReviews(res.data);
+      const res = await axios.get(`${process.env.REACT_APP_API_URL}/api/admin/reviews`, {
+        params: { limit: 100, cursor: cursor || undefined }
+      });
+      setReviews(prev => (cursor ? [...prev, ...res.data.items] : res.data.items));
+      setNextCursor(res.data.next_cursor);
     } catch (err) {
       setError(err?.response?.data?.error || "Failed to load reviews");
     } finally {
@@ -1751,6 +1788,15 @@ const AdminAllReviews = () => {
             </ul>
           </nav>
         )}
+
+        {/* Iteration 6 - Load the next page from the server */}
+        {nextCursor && (
+          <div className="text-center mt-2">
+            <button className="btn btn-outline-primary btn-sm" onClick={() => fetchAllReviews(nextCursor)} disabled={loading}>
+              Load more reviews
+            </button>
+          </div>
+        )}
         </>
       )}
     </div>
@@ -1,7 +1,35 @@
 // Iteration 2 / Iteration 4 - Modal form for booking a tutoring session
-import React, { useState, useEffect, useCallback, useMemo } from "react";
+import React, { useState, useEffect, useCallback, useMemo, useRef } from "react";
 import axios from "axios";
 
+// Iteration 6 - What to say about each queued integration, by its status in api_integrations
+// (integrations that are switched off come back "skipped" and aren't mentioned)
+const INTEGRATION_MESSAGES = {
+  google_calendar: {
+    pending: "Calendar invite is on its way.",
+    done: "Calendar invite sent.",
+    failed: "Calendar invite could not be created.",
+  },
+  email: {
+    pending: "Confirmation emails are on their way.",
+    done: "Confirmation emails sent.",
+    failed: "Confirmation emails could not be sent.",
+  },
+};
+
+const describeIntegrations = (results) => {
+  if (!results) return "";
+  return Object.entries(INTEGRATION_MESSAGES)
+    .map(([name, messages]) => {
+      const result = results[name];
+      if (!result || result.status === "skipped") return null;
+      if (result.status === "pending" || result.status === "retrying") return messages.pending;
+      return result.success ? messages.done : messages.failed;
+    })
+    .filter(Boolean)
+    .join(" ");
+};
+
 const BookingForm = ({ tutor, learnerId, onClose, onSuccess }) => {
   // form state
   const [formState, setFormState] = useState({
@@ -46,6 +74,42 @@ const BookingForm = ({ tutor, learnerId, onClose, onSuccess }) => {
   // FUNCTIONS
   // 
   
+  // Iteration 6 - Slots for four weeks come back in one request and are kept here,
+  // so picking another date in that range doesn't call the backend again
+  const slotCache = useRef({ duration: null, days: {} });
+
+  // Iteration 6 - Timers are cleared when the modal unmounts so nothing updates it afterwards
+  const mountedRef = useRef(true);
+  const pollTimerRef = useRef(null);
+  const closeTimerRef = useRef(null);
+  useEffect(() => {
+    mountedRef.current = true;
+    return () => {
+      mountedRef.current = false;
+      clearTimeout(pollTimerRef.current);
+      clearTimeout(closeTimerRef.current);
+    };
+  }, []);
+
+  // Iteration 6 - Polls the booking's integration results until the outbox dispatcher has sent them
+  // (every 2 seconds, at most 5 times - the modal closes after 10 seconds anyway)
+  const pollIntegrations = useCallback((bookingId, attempt = 1) => {
+    pollTimerRef.current = setTimeout(async () => {
+      try {
+        const response = await axios.get(`${process.env.REACT_APP_API_URL}/api/bookings/${bookingId}/integrations`);
+        if (!mountedRef.current) return;
+        setApiResults(response.data.api_integrations);
+        if (response.data.pending && attempt < 5) {
+          pollIntegrations(bookingId, attempt + 1);
+        }
+      } catch (error) {
+        console.error("Error fetching integration results:", error);
+      }
+    }, 2000);
+  }, []);
+
+  const integrationSummary = useMemo(() => describeIntegrations(apiResults), [apiResults]);
+
   // Iteration 4 - Function to fetch available time slots from backend
   const fetchAvailableSlots = useCallback(async () => {
     if (!formState.session_date) return;
@@ -56,12 +120,23 @@ const BookingForm = ({ tutor, learnerId, onClose, onSuccess }) => {
     setFormState(prev => ({ ...prev, session_time: "" })); // Clear selected time
     
     try {
-      const response = await axios.get(
-        `${process.env.REACT_APP_API_URL}/api/tutors/${tutor.tutor_id}/available-slots?date=${formState.session_date}`
-      );
-      
-      if (response.data.available_slots && response.data.available_slots.length > 0) {
-        setAvailableSlots(response.data.available_slots);
+      const duration = Number(formState.duration) || 60;
+      if (slotCache.current.duration !== duration || !(formState.session_date in slotCache.current.days)) {
+        const to = new Date(`${formState.session_date}T00:00:00`);
+        to.setDate(to.getDate() + 27);
+        const toStr = `${to.getFullYear()}-${String(to.getMonth() + 1).padStart(2, "0")}-${String(to.getDate()).padStart(2, "0")}`;
+        const response = await axios.get(
+          `${process.env.REACT_APP_API_URL}/api/tutors/${tutor.tutor_id}/available-slots`,
+          { params: { from: formState.session_date, to: toStr, duration } }
+        );
+        const days = slotCache.current.duration === duration ? { ...slotCache.current.days } : {};
+        response.data.days.forEach(day => { days[day.date] = day.available_slots; });
+        slotCache.current = { duration, days };
+      }
+
+      const slots = slotCache.current.days[formState.session_date] || [];
+      if (slots.length > 0) {
+        setAvailableSlots(slots);
       } else {
         setSlotsError("No available time slots for this date. Please select another date.");
       }
@@ -72,7 +147,7 @@ const BookingForm = ({ tutor, learnerId, onClose, onSuccess }) => {
     } finally {
       setLoadingSlots(false);
     }
-  }, [formState.session_date, tutor.tutor_id]);
+  }, [formState.session_date, formState.duration, tutor.tutor_id]);
   
   // Iteration 4 - Fetch available time slots when date changes
   useEffect(() => {
@@ -133,25 +208,16 @@ const BookingForm = ({ tutor, learnerId, onClose, onSuccess }) => {
       });
 
       // Iteration 4 - Capture API integration results
+      // Iteration 6 - The backend queues these and replies straight away, so they start as "pending"
+      // and the results are polled for below
       if (response.data.api_integrations) {
         setApiResults(response.data.api_integrations);
-        console.log("API Integration Results:", response.data.api_integrations);
+        pollIntegrations(response.data.booking_id);
       }
 
       // If successful, show success message
-      let successMessage = "Booking created successfully!";
-
-      // Add API status to message only on success
-      if (response.data.api_integrations) {
-        const calendar = response.data.api_integrations.google_calendar;
-        if (calendar && calendar.success) {
-          successMessage += " Calendar event created!";
-        }
-        const email = response.data.api_integrations.email;
-        if (email && email.success) {
-          successMessage += " Confirmation email sent!";
-        }
-      }
+      // Iteration 6 - What happened to the calendar invite and emails is added from api_integrations
+      const successMessage = "Booking created successfully!";
 
       setStatus({ type: "success", message: successMessage });
       
@@ -162,7 +228,7 @@ const BookingForm = ({ tutor, learnerId, onClose, onSuccess }) => {
       
       // UX Improvement - Wait longer to show API results, then close modal
       // Increased timeout to 10 seconds so user can see and click "View Calendar" link
-      setTimeout(() => {
+      closeTimerRef.current = setTimeout(() => {
         if (onSuccess) {
           onSuccess(); // Close the modal
         }
@@ -391,6 +457,7 @@ const BookingForm = ({ tutor, learnerId, onClose, onSuccess }) => {
               {status.message && (
                 <div className={`alert alert-dismissible fade show ${status.type === "success" ? "alert-success" : "alert-danger"}`} role="alert">
                   {status.message}
+                  {status.type === "success" && integrationSummary && ` ${integrationSummary}`}
                   {/* Close button to dismiss the message */}
                   <button type="button" className="btn-close" onClick={() => setStatus({ type: "", message: "" })} aria-label="Close"></button>
                 </div>
@@ -13,6 +13,10 @@ const BookingMessages = ({ bookingId, userId, userRole, bookingStatus }) => {
   const [sending, setSending] = useState(false);
   const [error, setError] = useState("");
   const messagesEndRef = useRef(null);
+  // Iteration 6 - Sync cursor from the last poll; only new messages / read receipts come back
+  const cursorRef = useRef("0");
+  const markedUpToRef = useRef(0); // highest message id already sent to the bulk mark-read endpoint
+  const [streaming, setStreaming] = useState(false);
 
   // Iteration 4 - Scroll to bottom when new messages arrive
   const scrollToBottom = () => {
@@ -38,12 +42,22 @@ const BookingMessages = ({ bookingId, userId, userRole, bookingStatus }) => {
           params: {
             user_id: userId,
             user_role: userRole,
+            since: cursorRef.current,
           },
         }
       );
-      setMessages(response.data);
-      // Scroll to bottom after loading messages
-      setTimeout(scrollToBottom, 100);
+      const changes = response.data.messages;
+      cursorRef.current = response.data.cursor;
+      if (changes.length > 0) {
+        // Merge by message_id - a changed message replaces the copy we already have
+        setMessages((prev) => {
+          const byId = new Map(prev.map((msg) => [msg.message_id, msg]));
+          changes.forEach((msg) => byId.set(msg.message_id, msg));
+          return Array.from(byId.values()).sort((a, b) => a.message_id - b.message_id);
+        });
+        // Scroll to bottom after loading messages
+        setTimeout(scrollToBottom, 100);
+      }
     } catch (err) {
       const message =
         err?.response?.data?.error || err?.message || "Failed to load messages.";
@@ -83,18 +97,62 @@ const BookingMessages = ({ bookingId, userId, userRole, bookingStatus }) => {
     }
   };
 
-  // Iteration 4 - Auto-refresh messages every 5 seconds
   useEffect(() => {
+    // Start from scratch when switching to another booking
+    cursorRef.current = "0";
+    markedUpToRef.current = 0;
+    setMessages([]);
     fetchMessages();
-    const interval = setInterval(fetchMessages, 5000);
-    return () => clearInterval(interval);
   }, [fetchMessages]);
 
+  // Iteration 6 - Live updates over Server-Sent Events; each event triggers a since-cursor fetch
+  useEffect(() => {
+    if (!bookingId || !userId || !userRole || typeof EventSource === "undefined") return;
+    if (bookingStatus !== "confirmed" && bookingStatus !== "accepted") return;
+
+    const params = new URLSearchParams({ user_id: userId, user_role: userRole, booking_id: bookingId });
+    const source = new EventSource(`${process.env.REACT_APP_API_URL}/api/messages/stream?${params}`);
+    source.addEventListener("ready", () => setStreaming(true));
+    ["message", "read", "resync"].forEach((type) => source.addEventListener(type, () => fetchMessages()));
+    // EventSource reconnects by itself - fall back to normal polling until it does.
+    // A 503 (server at its stream limit) closes the source for good and the page just keeps polling.
+    source.onerror = () => setStreaming(false);
+    return () => {
+      source.close();
+      setStreaming(false);
+    };
+  }, [bookingId, userId, userRole, bookingStatus, fetchMessages]);
+
+  // Iteration 4 - Auto-refresh messages every 5 seconds
+  // Iteration 6 - Only once a minute, as a safety net, while the stream is connected
+  useEffect(() => {
+    const interval = setInterval(fetchMessages, streaming ? 60000 : 5000);
+    return () => clearInterval(interval);
+  }, [fetchMessages, streaming]);
+
   // Iteration 4 - Scroll to bottom when messages change
   useEffect(() => {
     scrollToBottom();
   }, [messages]);
 
+  // Iteration 6 - Mark the other party's messages read with one request for the whole thread
+  useEffect(() => {
+    const unreadIds = messages
+      .filter((msg) => !msg.read_at && msg.sender_role !== userRole)
+      .map((msg) => msg.message_id);
+    if (unreadIds.length === 0) return;
+    const upTo = Math.max(...unreadIds);
+    if (upTo <= markedUpToRef.current) return;
+    markedUpToRef.current = upTo;
+    axios
+      .put(`${process.env.REACT_APP_API_URL}/api/bookings/${bookingId}/messages/read`, {
+        user_id: userId,
+        user_role: userRole,
+        up_to_message_id: upTo,
+      })
+      .catch((err) => console.error("Error marking messages as read:", err));
+  }, [messages, bookingId, userId, userRole]);
+
   // Don't show messaging if booking is not confirmed/accepted
   if (bookingStatus !== "confirmed" && bookingStatus !== "accepted") {
     return (
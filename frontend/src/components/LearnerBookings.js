@@ -35,7 +35,11 @@ const LearnerBookings = ({ learnerId, onNavigateToTutors }) => {
     rating: "",
     comment: "",
   });
-  const [reviewedBookings, setReviewedBookings] = useState(new Set());
+  // Iteration 6 - has_review comes with each booking, so no per-booking review lookups
+  const reviewedBookings = useMemo(
+    () => new Set(bookings.filter((booking) => booking.has_review).map((booking) => booking.booking_id)),
+    [bookings]
+  );
   
   // Iteration 4 - State for showing messages
   const [showMessagesForBooking, setShowMessagesForBooking] = useState(null);
@@ -110,21 +114,6 @@ const LearnerBookings = ({ learnerId, onNavigateToTutors }) => {
     }
   };
 
-  // Story 12 - check which bookings have reviews
-  // file reference: https://react.dev/reference/react/useCallback (line 124)
-  // file reference: https://axios-http.com/docs/intro (line 130)
-  const checkExistingReviews = useCallback(async () => {
-    if (!learnerId || bookings.length === 0) return;
-    const results = await Promise.all(
-      bookings.map(booking =>
-        axios.get(`${process.env.REACT_APP_API_URL}/api/reviews/booking/${booking.booking_id}`)
-          .then(res => res.data.exists ? booking.booking_id : null)
-          .catch(() => null)
-      )
-    );
-    setReviewedBookings(new Set(results.filter(Boolean)));
-  }, [bookings, learnerId]);
-
   // Story 12 - Opens the review form for a specific booking
   const handleStartReview = (booking) => {
     setActionMessage({ type: "", text: "" });
@@ -159,8 +148,8 @@ const LearnerBookings = ({ learnerId, onNavigateToTutors }) => {
       setReviewBookingId(null);
       setReviewForm({ rating: "", comment: "" });
       
+      // Reload bookings - has_review is now set on this one
       await fetchBookings();
-      setTimeout(() => checkExistingReviews(), 500);
     } catch (err) {
       console.error("Review submission error:", err);
       const message =
@@ -242,14 +231,6 @@ const LearnerBookings = ({ learnerId, onNavigateToTutors }) => {
     fetchBookings();
   }, [learnerId, fetchBookings]);  // Include both learnerId and fetchBookings in dependencies
 
-  // Story 12 - check reviews when bookings load
-  // file reference: https://react.dev/reference/react/useEffect (line 258)
-  useEffect(() => {
-    if (bookings.length > 0) {
-      checkExistingReviews();
-    }
-  }, [bookings, checkExistingReviews]);
-
   // UX Improvement - Calculate quick stats
   const stats = useMemo(() => {
     if (!bookings.length) return null;
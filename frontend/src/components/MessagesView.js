@@ -6,7 +6,7 @@
 // Reference: Bootstrap 5.3 Documentation (2025) "Pagination" — https://getbootstrap.com/docs/5.3/components/pagination/
 // Used to split the message conversation list across multiple pages (10 items per page).
 
-import React, { useState, useEffect, useCallback } from "react";
+import React, { useState, useEffect, useCallback, useRef } from "react";
 import axios from "axios";
 import BookingMessages from "./BookingMessages";
 
@@ -19,20 +19,58 @@ const MessagesView = ({ userId, userRole }) => {
   const [currentPage, setCurrentPage] = useState(1);
   const ITEMS_PER_PAGE = 10;
 
+  // Iteration 6 - Sync cursor and the booking ids the conversation list was built from
+  const cursorRef = useRef("0");
+  const bookingIdsRef = useRef("");
+  const [streaming, setStreaming] = useState(false);
+
   // Iteration 4 - Fetch all messages for this user
-  const fetchMessages = useCallback(async () => {
+  // Iteration 6 - Polls only fetch what changed since the last cursor; a full reload happens
+  // on the first load, on Refresh, and when the set of conversations changes
+  const fetchMessages = useCallback(async (fullReload = false) => {
     if (!userId || !userRole) return;
 
     setLoading(true);
     setError("");
     try {
+      if (fullReload) {
+        cursorRef.current = "0";
+      }
       const response = await axios.get(`${process.env.REACT_APP_API_URL}/api/messages`, {
         params: {
           user_id: userId,
           user_role: userRole,
+          since: cursorRef.current,
         },
       });
-      setMessageGroups(response.data);
+      const { booking_ids, conversations, cursor } = response.data;
+      const bookingIds = booking_ids.join(",");
+
+      if (cursorRef.current === "0") {
+        setMessageGroups(conversations);
+      } else if (bookingIds !== bookingIdsRef.current) {
+        // A booking was confirmed or closed - rebuild the list
+        bookingIdsRef.current = bookingIds;
+        await fetchMessages(true);
+        return;
+      } else if (conversations.length > 0) {
+        // Merge the changed messages into their conversations by message_id
+        setMessageGroups((prev) =>
+          prev.map((group) => {
+            const changed = conversations.find((c) => c.booking_id === group.booking_id);
+            if (!changed) return group;
+            const byId = new Map(group.messages.map((msg) => [msg.message_id, msg]));
+            changed.messages.forEach((msg) => byId.set(msg.message_id, msg));
+            return {
+              ...group,
+              unread_count: changed.unread_count,
+              messages: Array.from(byId.values()).sort((a, b) => a.message_id - b.message_id),
+            };
+          })
+        );
+      }
+      bookingIdsRef.current = bookingIds;
+      cursorRef.current = cursor;
     } catch (err) {
       const message =
         err?.response?.data?.error || err?.message || "Failed to load messages.";
@@ -43,16 +81,39 @@ const MessagesView = ({ userId, userRole }) => {
     }
   }, [userId, userRole]);
 
+  useEffect(() => {
+    fetchMessages(true);
+  }, [fetchMessages]);
+
+  // Iteration 6 - Live updates over Server-Sent Events; each event triggers a since-cursor fetch
+  useEffect(() => {
+    if (!userId || !userRole || typeof EventSource === "undefined") return;
+
+    const params = new URLSearchParams({ user_id: userId, user_role: userRole });
+    const source = new EventSource(`${process.env.REACT_APP_API_URL}/api/messages/stream?${params}`);
+    source.addEventListener("ready", () => setStreaming(true));
+    ["message", "read", "resync"].forEach((type) => source.addEventListener(type, () => fetchMessages()));
+    // EventSource reconnects by itself - fall back to normal polling until it does.
+    // A 503 (server at its stream limit) closes the source for good and the page just keeps polling.
+    source.onerror = () => setStreaming(false);
+    return () => {
+      source.close();
+      setStreaming(false);
+    };
+  }, [userId, userRole, fetchMessages]);
+
   // Iteration 4 - Auto-refresh messages every 10 seconds
+  // Iteration 6 - Only once a minute, as a safety net, while the stream is connected
   useEffect(() => {
-    fetchMessages();
-    const interval = setInterval(fetchMessages, 10000);
+    const interval = setInterval(() => fetchMessages(), streaming ? 60000 : 10000);
     return () => clearInterval(interval);
-  }, [fetchMessages]);
+  }, [fetchMessages, streaming]);
 
   // Iteration 4 - Get unread count for a booking
-  const getUnreadCount = (messages) => {
-    return messages.filter((msg) => !msg.read_at && msg.sender_role !== userRole).length;
+  // Iteration 6 - The server sends the maintained counter; counting is the fallback
+  const getUnreadCount = (group) => {
+    if (group.unread_count !== undefined) return group.unread_count;
+    return group.messages.filter((msg) => !msg.read_at && msg.sender_role !== userRole).length;
   };
 
   // Iteration 4 - Get last message preview
@@ -127,7 +188,7 @@ const MessagesView = ({ userId, userRole }) => {
             </div>
             <button
               className="btn btn-outline-secondary btn-sm"
-              onClick={fetchMessages}
+              onClick={() => fetchMessages(true)}
               disabled={loading}
               title="Refresh messages"
             >
@@ -155,7 +216,7 @@ const MessagesView = ({ userId, userRole }) => {
 
         <div className="message-groups">
           {messageGroups.slice((currentPage - 1) * ITEMS_PER_PAGE, currentPage * ITEMS_PER_PAGE).map((group) => {
-            const unreadCount = getUnreadCount(group.messages);
+            const unreadCount = getUnreadCount(group);
             const lastMessage = getLastMessage(group.messages);
             const isExpanded = expandedBooking === group.booking_id;
 
@@ -11,7 +11,8 @@ const TutorAvailability = ({ tutorId }) => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
   const [message, setMessage] = useState({ type: "", text: "" });
-  const [editingDay, setEditingDay] = useState(null);
+  // Iteration 6 - Changes are made to this local copy of the week and saved together
+  const [unsavedChanges, setUnsavedChanges] = useState(false);
   
   // Iteration 4 - Days of the week (0=Monday, 6=Sunday)
   const daysOfWeek = [
@@ -28,8 +29,7 @@ const TutorAvailability = ({ tutorId }) => {
   const [formData, setFormData] = useState({
     day_of_week: "",
     start_time: "09:00",
-    end_time: "17:00",
-    is_available: 1
+    end_time: "17:00"
   });
   
   // Iteration 4 - Fetch tutor's current availability
@@ -41,7 +41,12 @@ const TutorAvailability = ({ tutorId }) => {
     
     try {
       const response = await axios.get(`${process.env.REACT_APP_API_URL}/api/tutors/${tutorId}/availability`);
-      setAvailability(response.data);
+      setAvailability(response.data.map(a => ({
+        day_of_week: a.day_of_week,
+        start_time: a.start_time.substring(0, 5), // Remove seconds
+        end_time: a.end_time.substring(0, 5)
+      })));
+      setUnsavedChanges(false);
     } catch (error) {
       const errorMsg = error?.response?.data?.error || error?.message || "Failed to load availability";
       setError(errorMsg);
@@ -60,17 +65,14 @@ const TutorAvailability = ({ tutorId }) => {
   // Iteration 4 - Handle form input changes
   const handleChange = (e) => {
     const { name, value } = e.target;
-    setFormData(prev => ({
-      ...prev,
-      [name]: name === "is_available" ? parseInt(value) : value
-    }));
+    setFormData(prev => ({ ...prev, [name]: value }));
   };
   
-  // Iteration 4 - Handle form submission (add or update availability)
-  const handleSubmit = async (e) => {
+  // Iteration 6 - Add a window to the local schedule (a day can have several)
+  const handleSubmit = (e) => {
     e.preventDefault();
     
-    if (!formData.day_of_week) {
+    if (formData.day_of_week === "") {
       setMessage({ type: "error", text: "Please select a day of the week" });
       return;
     }
@@ -79,30 +81,49 @@ const TutorAvailability = ({ tutorId }) => {
       setMessage({ type: "error", text: "End time must be after start time" });
       return;
     }
+
+    const dayOfWeek = parseInt(formData.day_of_week);
+    const clash = availability.some(a =>
+      a.day_of_week === dayOfWeek && formData.start_time < a.end_time && a.start_time < formData.end_time
+    );
+    if (clash) {
+      setMessage({ type: "error", text: "This time overlaps another window on the same day" });
+      return;
+    }
     
+    setAvailability(prev => [...prev, { day_of_week: dayOfWeek, start_time: formData.start_time, end_time: formData.end_time }]
+      .sort((a, b) => a.day_of_week - b.day_of_week || a.start_time.localeCompare(b.start_time)));
+    setUnsavedChanges(true);
+    setMessage({ type: "", text: "" });
+  };
+
+  // Iteration 6 - Remove a window from the local schedule
+  const handleRemove = (timeWindow) => {
+    setAvailability(prev => prev.filter(a => a !== timeWindow));
+    setUnsavedChanges(true);
+  };
+
+  // Iteration 6 - Edit = take the window out and put its times back in the form
+  const handleEdit = (timeWindow) => {
+    setFormData({
+      day_of_week: timeWindow.day_of_week.toString(),
+      start_time: timeWindow.start_time,
+      end_time: timeWindow.end_time
+    });
+    handleRemove(timeWindow);
+  };
+
+  // Iteration 6 - Save the whole week in one request
+  const handleSave = async () => {
     setLoading(true);
     setMessage({ type: "", text: "" });
     
     try {
-      // Format time to HH:MM:SS
-      const startTimeFormatted = formData.start_time + ":00";
-      const endTimeFormatted = formData.end_time + ":00";
-      
-      await axios.post(`${process.env.REACT_APP_API_URL}/api/tutors/${tutorId}/availability`, {
-        day_of_week: parseInt(formData.day_of_week),
-        start_time: startTimeFormatted,
-        end_time: endTimeFormatted,
-        is_available: formData.is_available
+      await axios.put(`${process.env.REACT_APP_API_URL}/api/tutors/${tutorId}/availability/weekly`, {
+        windows: availability
       });
       
       setMessage({ type: "success", text: "Availability updated successfully!" });
-      setFormData({
-        day_of_week: "",
-        start_time: "09:00",
-        end_time: "17:00",
-        is_available: 1
-      });
-      setEditingDay(null);
       fetchAvailability(); // Refresh the list
       
       // Clear message after 3 seconds
@@ -116,22 +137,9 @@ const TutorAvailability = ({ tutorId }) => {
   };
   
   // Iteration 4 - Get availability for a specific day
+  // Iteration 6 - a day can have several windows
   const getAvailabilityForDay = (dayOfWeek) => {
-    return availability.find(a => a.day_of_week === dayOfWeek);
-  };
-  
-  // Iteration 4 - Edit existing availability
-  const handleEdit = (dayOfWeek) => {
-    const dayAvailability = getAvailabilityForDay(dayOfWeek);
-    if (dayAvailability) {
-      setFormData({
-        day_of_week: dayAvailability.day_of_week.toString(),
-        start_time: dayAvailability.start_time.substring(0, 5), // Remove seconds
-        end_time: dayAvailability.end_time.substring(0, 5),
-        is_available: dayAvailability.is_available
-      });
-      setEditingDay(dayOfWeek);
-    }
+    return availability.filter(a => a.day_of_week === dayOfWeek);
   };
   
   return (
@@ -207,47 +215,40 @@ const TutorAvailability = ({ tutorId }) => {
             <div className="col-md-3 d-flex align-items-end">
               <button
                 type="submit"
-                className="btn btn-primary w-100"
+                className="btn btn-outline-primary w-100"
                 disabled={loading}
               >
-                {loading ? (
-                  <>
-                    <span className="spinner-border spinner-border-sm me-2"></span>
-                    Saving...
-                  </>
-                ) : editingDay !== null ? (
-                  "Update"
-                ) : (
-                  "Add Availability"
-                )}
+                Add Time Window
               </button>
             </div>
           </div>
-          
-          {editingDay !== null && (
-            <div className="mt-2">
-              <button
-                type="button"
-                className="btn btn-sm btn-secondary"
-                onClick={() => {
-                  setEditingDay(null);
-                  setFormData({
-                    day_of_week: "",
-                    start_time: "09:00",
-                    end_time: "17:00",
-                    is_available: 1
-                  });
-                }}
-              >
-                Cancel Edit
-              </button>
-            </div>
-          )}
         </form>
         
         {/* Iteration 4 - Current availability list */}
+        {/* Iteration 6 - one row per window, saved for the whole week with one button */}
         <div>
-          <h5 className="mb-3">Current Availability</h5>
+          <div className="d-flex justify-content-between align-items-center mb-3">
+            <h5 className="mb-0">Weekly Availability</h5>
+            <button
+              className="btn btn-primary"
+              onClick={handleSave}
+              disabled={loading || !unsavedChanges}
+            >
+              {loading && unsavedChanges ? (
+                <>
+                  <span className="spinner-border spinner-border-sm me-2"></span>
+                  Saving...
+                </>
+              ) : (
+                "Save Weekly Schedule"
+              )}
+            </button>
+          </div>
+          {unsavedChanges && (
+            <div className="alert alert-warning py-2">
+              You have unsaved changes.
+            </div>
+          )}
           {loading && availability.length === 0 ? (
             <div className="text-center py-3">
               <div className="spinner-border spinner-border-sm me-2"></div>
@@ -265,43 +266,42 @@ const TutorAvailability = ({ tutorId }) => {
                     <th>Day</th>
                     <th>Start Time</th>
                     <th>End Time</th>
-                    <th>Status</th>
                     <th>Actions</th>
                   </tr>
                 </thead>
                 <tbody>
                   {daysOfWeek.map(day => {
-                    const dayAvailability = getAvailabilityForDay(day.value);
-                    return (
-                      <tr key={day.value}>
-                        <td><strong>{day.label}</strong></td>
-                        {dayAvailability ? (
-                          <>
-                            <td>{dayAvailability.start_time.substring(0, 5)}</td>
-                            <td>{dayAvailability.end_time.substring(0, 5)}</td>
-                            <td>
-                              <span className={`badge ${dayAvailability.is_available ? "bg-success" : "bg-secondary"}`}>
-                                {dayAvailability.is_available ? "Available" : "Unavailable"}
-                              </span>
-                            </td>
-                            <td>
-                              <button
-                                className="btn btn-sm btn-outline-primary"
-                                onClick={() => handleEdit(day.value)}
-                                disabled={editingDay === day.value}
-                              >
-                                Edit
-                              </button>
-                            </td>
-                          </>
-                        ) : (
-                          <>
-                            <td colSpan="3" className="text-muted">Not set</td>
-                            <td>-</td>
-                          </>
-                        )}
+                    const dayWindows = getAvailabilityForDay(day.value);
+                    if (dayWindows.length === 0) {
+                      return (
+                        <tr key={day.value}>
+                          <td><strong>{day.label}</strong></td>
+                          <td colSpan="2" className="text-muted">Not set</td>
+                          <td>-</td>
+                        </tr>
+                      );
+                    }
+                    return dayWindows.map((timeWindow, index) => (
+                      <tr key={`${day.value}-${timeWindow.start_time}`}>
+                        <td>{index === 0 && <strong>{day.label}</strong>}</td>
+                        <td>{timeWindow.start_time}</td>
+                        <td>{timeWindow.end_time}</td>
+                        <td>
+                          <button
+                            className="btn btn-sm btn-outline-primary me-2"
+                            onClick={() => handleEdit(timeWindow)}
+                          >
+                            Edit
+                          </button>
+                          <button
+                            className="btn btn-sm btn-outline-danger"
+                            onClick={() => handleRemove(timeWindow)}
+                          >
+                            Remove
+                          </button>
+                        </td>
                       </tr>
-                    );
+                    ));
                   })}
                 </tbody>
               </table>
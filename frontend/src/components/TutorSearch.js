@@ -121,7 +121,12 @@ const TutorSearch = ({ learnerId }) => {
     setError("");
     try {  //this calls the flask route . then it returns all verified tutors
       // Iteration 4 - Build query string with filters
-      let queryParams = `module=${encodeURIComponent(searchModule)}`;
+      // Iteration 6 - Module codes (e.g. IS3312, or the start of one like IS33) search by module,
+      // anything else is a free-text search. Same pattern as MODULE_SEARCH_PATTERN in app.py
+      const isModuleCode = /^[A-Za-z]{2}\d{1,4}$/.test(searchModule.trim());
+      let queryParams = isModuleCode
+        ? `module=${encodeURIComponent(searchModule.trim())}`
+        : `q=${encodeURIComponent(searchModule.trim())}`;
       
       if (filters.minPrice) {
         queryParams += `&min_price=${filters.minPrice}`;
@@ -265,7 +270,7 @@ const TutorSearch = ({ learnerId }) => {
                 className="form-control"
                 value={module}
                 onChange={(e) => setModule(e.target.value)}
-                placeholder="Enter module name (e.g. Accounting, Mathematics, Physics)"
+                placeholder="Enter a module code or topic (e.g. IS3312, statistics python)"
                 autoFocus
               />
               <button
@@ -87,27 +87,20 @@ const TutorSignup = () => {
         return;
       }
       
-      // Story 15 - Convert file to base64 for database storage
-      let proofDocBase64 = '';
+      // Story 15 - Upload proof document
+      // Iteration 6 - The file is uploaded on its own (multipart) and only its document id is sent with the form
+      let proofDocId = '';
       if (proofFile) {
         setUploadingFile(true);
         
         try {
-          // Convert file to base64 string for database storage
-          const reader = new FileReader();
-          await new Promise((resolve, reject) => {
-            reader.onload = (e) => {
-              // Remove data URL prefix (e.g., "data:image/png;base64,")
-              const base64String = e.target.result.split(',')[1] || e.target.result;
-              proofDocBase64 = base64String;
-              resolve();
-            };
-            reader.onerror = reject;
-            reader.readAsDataURL(proofFile);
-          });
+          const uploadData = new FormData();
+          uploadData.append('file', proofFile);
+          const uploadResponse = await axios.post(`${process.env.REACT_APP_API_URL}/api/tutors/upload-proof`, uploadData);
+          proofDocId = uploadResponse.data.document_id;
         } catch (fileError) {
-          // Don't block form submission if file conversion fails
-          proofDocBase64 = ''; // Submit without file
+          // Don't block form submission if the upload fails
+          proofDocId = ''; // Submit without file
         } finally {
           setUploadingFile(false);
         }
@@ -122,7 +115,7 @@ const TutorSignup = () => {
         rating: 0,  // Default rating, not from form
         bio: formData.bio ? formData.bio.trim() : '',
         verified: 0, // tutors start unverified , admin must approve
-        proof_doc: proofDocBase64,  // Story 15 - Base64 encoded file data stored in database
+        proof_doc_id: proofDocId,  // Story 15 - Handle of the uploaded proof document
       };
       
       // Validate hourly_rate is a valid number